@@ -0,0 +1,6 @@
+"""
+Benchmarks offline do roteirista bíblico.
+
+Rodam sem OpenAI e sem acesso à bibliaonline.com.br: o modelo é substituído por
+um falso determinístico e as páginas dos capítulos vêm de ``benchmarks/fixtures``.
+"""
@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks: parsing de referências, extração de versículos e persistência.
+"""
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.harness import medir
+from benchmarks.paginas import carregar_pagina
+from src import serialization
+from src.bible_tool import BibleLookupTool
+from src.models import RoteiroBiblico, DetailVideoYouTube, TipoRoteiro
+from src.utils import save_roteiro_json, save_roteiro_sqlite, save_info_video_sqlite
+
+REFERENCIAS = ["rm 8", "sl 23:1", "rm 8:28-39", "1co 13:4-7", "ap 21:4", "Sl 119 : 105 - 112"]
+
+
+def _roteiro_longo() -> RoteiroBiblico:
+    pagina = carregar_pagina("ntlh_sl_119.html")
+    blocos = [f"Salmos 119:{v['number']}\n{v['text']}"
+              for v in BibleLookupTool._extract_verses(pagina, None, None)]
+    return RoteiroBiblico(
+        tema="Palavra de Deus",
+        roteiro="\n\n".join(blocos),
+        versiculos_utilizados=[f"Salmos 119:{i}" for i in range(1, len(blocos) + 1)],
+        tipo=TipoRoteiro.LONGO,
+        referencias=["sl 119"],
+        postagem_comunidade="🙏 Novo vídeo! Qual versículo mais fala com você? ✨"
+    )
+
+
+def executar(repeticoes: int = 50) -> List[Dict[str, Any]]:
+    resultados = []
+
+    def parse_todas():
+        for ref in REFERENCIAS:
+            BibleLookupTool._parse_ref(ref)
+
+    resultados.append(medir("parse_ref", parse_todas, repeticoes * 10))
+
+    for nome, pagina, v_ini, v_fim in (
+            ("extract_verses_sl23_capitulo", "ntlh_sl_23.html", None, None),
+            ("extract_verses_rm8_intervalo", "ntlh_rm_8.html", 28, 39),
+            ("extract_verses_sl119_capitulo", "ntlh_sl_119.html", None, None),
+    ):
+        html = carregar_pagina(pagina)
+        resultados.append(medir(nome, lambda: BibleLookupTool._extract_verses(html, v_ini, v_fim), repeticoes))
+
+    roteiro = _roteiro_longo()
+    info = DetailVideoYouTube(
+        titulo="A Palavra que ilumina", descricao="Descrição " * 80,
+        tags=["bíblia", "salmos", "palavra", "fé"] * 5, hashtags=["#biblia", "#salmos"],
+        thumbnail_prompt="Bíblia aberta com luz"
+    )
+
+    def serializar_modelo_dump():
+        # Caminho anterior: um dict intermediário para o arquivo e um json.dumps por coluna de lista
+        json.dumps(roteiro.model_dump(mode="json"), ensure_ascii=False, indent=2)
+        json.dumps(roteiro.versiculos_utilizados, ensure_ascii=False)
+        json.dumps(roteiro.referencias, ensure_ascii=False)
+
+    def serializar_uma_vez(compacto):
+        # Modelo novo a cada repetição para não medir só o acerto no cache
+        copia = roteiro.model_copy()
+        serialization.colunas_lista(copia, "versiculos_utilizados", "referencias")
+        serialization.para_json(copia, compacto)
+
+    resultados.append(medir("serializar_longo_model_dump", serializar_modelo_dump, repeticoes))
+    resultados.append(medir("serializar_longo_indentado", lambda: serializar_uma_vez(False), repeticoes))
+    resultados.append(medir("serializar_longo_compacto", lambda: serializar_uma_vez(True), repeticoes))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.sqlite3")
+        roteiro_id = save_roteiro_sqlite(roteiro, db_path)
+        resultados.append(medir("save_roteiro_sqlite_longo", lambda: save_roteiro_sqlite(roteiro, db_path), repeticoes))
+        resultados.append(
+            medir("save_info_video_sqlite", lambda: save_info_video_sqlite(info, roteiro_id, db_path), repeticoes))
+        with patch("src.utils.OUT_DIR", Path(tmp)):
+            resultados.append(medir("save_roteiro_json_longo", lambda: save_roteiro_json(roteiro), repeticoes))
+    return resultados
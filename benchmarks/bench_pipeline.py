@@ -0,0 +1,51 @@
+"""
+Benchmark ponta a ponta: ``gerar_roteiro`` → ``gerar_detail_video_youtube`` contra o
+modelo falso, com páginas gravadas e persistência num diretório temporário.
+"""
+import os
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from benchmarks.fake_model import FakeCompletions, FakeOpenAIChat
+from benchmarks.harness import medir
+from benchmarks.paginas import download_gravado
+from src.accounting import registrador
+from src.agents import roteiro_agent, youtube_detail_agent
+from src.bible_tool import BibleLookupTool
+from src.models import TipoRoteiro
+
+
+def executar(
+        repeticoes: int = 10,
+        latencia: float = 0.0,
+        turnos_ferramenta: int = 1,
+        chamadas_por_turno: int = 3
+) -> List[Dict[str, Any]]:
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        tmp_path = Path(tmp)
+        # Grava as execuções enfileiradas antes de o diretório temporário sumir
+        stack.callback(registrador.flush)
+        stack.enter_context(patch("src.utils.DB_PATH", tmp_path / "roteiros.sqlite3"))
+        stack.enter_context(patch("src.utils.OUT_DIR", tmp_path))
+        stack.enter_context(patch.object(BibleLookupTool, "_download_condicional", staticmethod(download_gravado)))
+        # Antes de construir qualquer agente: o SqliteStorage cria o arquivo de sessões na hora
+        stack.enter_context(patch.dict(os.environ, {"DB_NAME": str(tmp_path / "sessions")}))
+        for modulo in (roteiro_agent, youtube_detail_agent):
+            agente = modulo.criar_agente()
+            agente.model = FakeOpenAIChat(fake=FakeCompletions(latencia, turnos_ferramenta, chamadas_por_turno))
+            stack.enter_context(patch.object(modulo, "agent", agente))
+
+        for tipo in (TipoRoteiro.LONGO, TipoRoteiro.SHORT):
+            def pipeline():
+                roteiro, roteiro_id = roteiro_agent.gerar_roteiro("Ansiedade e fé", tipo)
+                youtube_detail_agent.gerar_detail_video_youtube(roteiro, roteiro_id)
+
+            resultado = medir(f"pipeline_{tipo.value.lower()}", pipeline, repeticoes, aquecimento=1)
+            # Chamadas ao modelo por pipeline: turnos de ferramenta + resposta final + agente de detalhes
+            resultado["latencia_modelo_por_pipeline"] = latencia * (turnos_ferramenta + 2)
+            resultados.append(resultado)
+    return resultados
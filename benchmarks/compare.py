@@ -0,0 +1,43 @@
+"""
+Compara dois arquivos de resultados e aponta regressões.
+
+    python -m benchmarks.compare benchmarks/results/antes.json benchmarks/results/depois.json --limite 0.10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def comparar(antes: dict, depois: dict, limite: float) -> list[tuple[str, float, float, float, bool]]:
+    base = {r["nome"]: r for r in antes["resultados"]}
+    linhas = []
+    for r in depois["resultados"]:
+        if r["nome"] not in base:
+            continue
+        t0, t1 = base[r["nome"]]["mediana"], r["mediana"]
+        variacao = (t1 - t0) / t0 if t0 else 0.0
+        linhas.append((r["nome"], t0, t1, variacao, variacao > limite))
+    return linhas
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmarks")
+    parser.add_argument("antes")
+    parser.add_argument("depois")
+    parser.add_argument("--limite", type=float, default=0.10, help="Variação da mediana considerada regressão")
+    args = parser.parse_args(argv)
+
+    antes = json.loads(Path(args.antes).read_text(encoding="utf-8"))
+    depois = json.loads(Path(args.depois).read_text(encoding="utf-8"))
+    print(f"{antes['commit']} → {depois['commit']}")
+    regressoes = 0
+    for nome, t0, t1, variacao, regressao in comparar(antes, depois, args.limite):
+        regressoes += regressao
+        marca = "  REGRESSÃO" if regressao else ""
+        print(f"{nome:<36} {t0 * 1000:10.3f} ms → {t1 * 1000:10.3f} ms  {variacao:+7.1%}{marca}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Modelo falso e determinístico para benchmarks.
+
+Substitui o cliente da OpenAI dentro do ``OpenAIChat`` do agno, de modo que todo o
+laço do agente (chamadas de ferramenta, parsing da saída estruturada, storage)
+roda de verdade, mas sem rede e sem custo. A latência de cada chamada é configurável.
+As respostas vêm do mesmo sintetizador do servidor ``src.mock_openai``.
+"""
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from agno.models.openai import OpenAIChat
+from openai.types.chat import ChatCompletion
+
+from src.mock_openai import montar_completion, sintetizar_mensagem
+
+
+class FakeCompletions:
+    """
+    Imita ``client.chat.completions`` da OpenAI, em memória.
+
+    No(s) primeiro(s) turno(s), quando ``lookup_verse`` está disponível, emite chamadas
+    à ferramenta; depois devolve a saída estruturada para o ``response_format`` pedido.
+    """
+
+    def __init__(
+            self,
+            latencia: float = 0.0,
+            turnos_ferramenta: int = 1,
+            chamadas_por_turno: int = 3,
+            referencias: Optional[List[str]] = None
+    ):
+        self.latencia = latencia
+        self.turnos_ferramenta = turnos_ferramenta
+        self.chamadas_por_turno = chamadas_por_turno
+        self.referencias = referencias
+        self.chamadas = 0
+
+    def create(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> ChatCompletion:
+        self.chamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        corpo = dict(kwargs, model=model, messages=messages)
+        mensagem, finish_reason = sintetizar_mensagem(
+            corpo, self.turnos_ferramenta, self.chamadas_por_turno, self.referencias
+        )
+        return ChatCompletion.model_validate(montar_completion(corpo, mensagem, finish_reason))
+
+
+@dataclass
+class FakeOpenAIChat(OpenAIChat):
+    """``OpenAIChat`` cujo cliente é um ``FakeCompletions`` em memória."""
+
+    id: str = "fake-gpt-4o-mini"
+    fake: Optional[FakeCompletions] = None
+
+    def get_client(self):
+        if self.fake is None:
+            self.fake = FakeCompletions()
+        return SimpleNamespace(chat=SimpleNamespace(completions=self.fake))
@@ -0,0 +1,69 @@
+"""
+Medição e persistência dos resultados dos benchmarks.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def medir(nome: str, fn: Callable[[], Any], repeticoes: int = 50, aquecimento: int = 3) -> Dict[str, Any]:
+    """
+    Executa ``fn`` ``repeticoes`` vezes (após ``aquecimento`` execuções descartadas)
+    e devolve estatísticas em segundos.
+    """
+    for _ in range(aquecimento):
+        fn()
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    tempos.sort()
+    media = statistics.fmean(tempos)
+    return {
+        "nome": nome,
+        "repeticoes": repeticoes,
+        "media": media,
+        "mediana": statistics.median(tempos),
+        "p95": tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+        "minimo": tempos[0],
+        "desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        "ops_por_segundo": 1 / media if media else None,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def salvar_resultados(resultados: List[Dict[str, Any]], parametros: Dict[str, Any], destino: Path = None) -> Path:
+    """
+    Grava os resultados em JSON junto com metadados do ambiente (commit, Python, máquina).
+    """
+    commit = _git_commit()
+    destino = destino or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{commit}.json"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "commit": commit,
+        "data": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    destino.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return destino
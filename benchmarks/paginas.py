@@ -0,0 +1,54 @@
+"""
+Páginas de capítulos gravadas para rodar a ferramenta bíblica offline.
+
+As páginas ficam em ``benchmarks/fixtures/{traducao}_{livro}_{capitulo}.html``. As que
+acompanham o repositório reproduzem o markup do site (spans ``v``/``t`` no meio de
+navegação, scripts etc.) com texto sintético. Para gravar páginas reais, com rede:
+
+    python -m benchmarks.paginas sl 23 rm 8
+"""
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import requests
+
+from src.bible_tool import BASE_URL, Pagina
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+PAGINA_PADRAO = "ntlh_rm_8.html"
+
+
+@lru_cache(maxsize=None)
+def carregar_pagina(nome: str) -> str:
+    return (FIXTURES_DIR / nome).read_text(encoding="utf-8")
+
+
+def download_gravado(url: str, etag: str = None, last_modified: str = None) -> Pagina:
+    """
+    Substituto de ``BibleLookupTool._download_condicional``: devolve a página gravada da URL.
+    Capítulos sem gravação caem numa página padrão, para que o custo de parsing
+    continue realista.
+    """
+    translation, slug, chapter = url.rstrip("/").split("/")[-3:]
+    nome = f"{translation}_{slug}_{chapter}.html"
+    if not (FIXTURES_DIR / nome).exists():
+        nome = PAGINA_PADRAO
+    return Pagina(carregar_pagina(nome))
+
+
+def gravar(slug: str, chapter: str, translation: str = "ntlh") -> Path:
+    url = BASE_URL.format(translation=translation, slug=slug, chapter=chapter)
+    resp = requests.get(url, timeout=10)
+    resp.raise_for_status()
+    destino = FIXTURES_DIR / f"{translation}_{slug}_{chapter}.html"
+    destino.write_text(resp.text, encoding="utf-8")
+    return destino
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        sys.exit("Uso: python -m benchmarks.paginas <livro> <capítulo> [<livro> <capítulo> ...]")
+    for livro, capitulo in zip(args[::2], args[1::2]):
+        print(f"Gravado: {gravar(livro, capitulo)}")
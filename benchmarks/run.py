@@ -0,0 +1,47 @@
+"""
+Executa os benchmarks e grava os resultados em ``benchmarks/results``.
+
+    python -m benchmarks.run                      # micro + ponta a ponta
+    python -m benchmarks.run --suite micro
+    python -m benchmarks.run --latencia 0.2 --repeticoes 5
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks import bench_micro, bench_pipeline
+from benchmarks.harness import salvar_resultados
+from src.logging_config import configurar_logging
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline do roteirista bíblico")
+    parser.add_argument("--suite", choices=["micro", "pipeline", "todas"], default="todas")
+    parser.add_argument("--repeticoes", type=int, default=None, help="Repetições por benchmark")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Latência simulada por chamada ao modelo (s)")
+    parser.add_argument("--turnos-ferramenta", type=int, default=1)
+    parser.add_argument("--chamadas-por-turno", type=int, default=3)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    configurar_logging(args.log_level, enqueue=False)
+
+    resultados = []
+    if args.suite in ("micro", "todas"):
+        resultados += bench_micro.executar(args.repeticoes or 50)
+    if args.suite in ("pipeline", "todas"):
+        resultados += bench_pipeline.executar(
+            args.repeticoes or 10, args.latencia, args.turnos_ferramenta, args.chamadas_por_turno
+        )
+
+    for r in resultados:
+        print(f"{r['nome']:<36} média {r['media'] * 1000:10.3f} ms   p95 {r['p95'] * 1000:10.3f} ms")
+
+    destino = salvar_resultados(resultados, vars(args), Path(args.saida) if args.saida else None)
+    print(f"\nResultados gravados em {destino}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
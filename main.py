@@ -1,14 +1,24 @@
+import argparse
+
 from dotenv import load_dotenv, find_dotenv
 
+# Carregar variáveis de ambiente do arquivo .env antes de construir os agentes,
+# que leem DB_NAME e OPENAI_BASE_URL na importação
+load_dotenv(find_dotenv())
 
+from src import profiling
 from src.agents.roteiro_agent import gerar_roteiro
 from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+from src.logging_config import configurar_logging
 from src.models import TipoRoteiro
 
-# Carregar variáveis de ambiente do arquivo .env
-load_dotenv(find_dotenv())
-
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um roteiro de exemplo e as informações do vídeo")
+    parser.add_argument("--profile", action="store_true", help="Grava cProfile/tracemalloc de cada geração em profiles/")
+    if parser.parse_args().profile:
+        profiling.ativar()
+    configurar_logging()
+
     # Gerar roteiro bíblico
     roteiro, roteiro_id = gerar_roteiro("Deus não espera que você volte perfeito, ele só quer que você volte", TipoRoteiro.LONGO)
 
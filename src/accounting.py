@@ -0,0 +1,280 @@
+"""
+Contabilidade de tokens e custo por execução dos agentes.
+
+Cada ``agent.run`` gera um registro na tabela ``generation_runs`` (ligada a
+``roteiros_biblicos.id``). As gravações são enfileiradas e feitas em lote por uma
+thread em segundo plano, para não somar latência à geração.
+
+    python -m src.accounting --por tema
+"""
+import argparse
+import atexit
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field, astuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src import utils
+
+# Preço em USD por milhão de tokens: (entrada, entrada em cache, saída)
+PRECOS_POR_MILHAO: Dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+CREATE_TABLE_GENERATION_RUNS = '''
+    CREATE TABLE IF NOT EXISTS generation_runs
+    (
+        id                INTEGER PRIMARY KEY AUTOINCREMENT,
+        roteiro_id        INTEGER,
+        etapa             TEXT,
+        model_id          TEXT,
+        prompt_tokens     INTEGER,
+        completion_tokens INTEGER,
+        cached_tokens     INTEGER,
+        tool_calls        INTEGER,
+        tool_time         REAL,
+        wall_time         REAL,
+        custo_usd         REAL,
+        criado_em         TEXT,
+        FOREIGN KEY (roteiro_id) REFERENCES roteiros_biblicos (id)
+    )
+'''
+
+
+def calcular_custo(model_id: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Custo em USD de uma execução. Modelos sem preço conhecido custam 0."""
+    preco = PRECOS_POR_MILHAO.get(model_id)
+    if preco is None:
+        return 0.0
+    entrada, entrada_cache, saida = preco
+    nao_cacheados = max(prompt_tokens - cached_tokens, 0)
+    return (nao_cacheados * entrada + cached_tokens * entrada_cache + completion_tokens * saida) / 1_000_000
+
+
+@dataclass
+class ExecucaoGeracao:
+    roteiro_id: Optional[int]
+    etapa: str
+    model_id: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    tool_calls: int = 0
+    tool_time: float = 0.0
+    wall_time: float = 0.0
+    custo_usd: float = 0.0
+    criado_em: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+def extrair_execucao(
+        run_response: Any,
+        etapa: str,
+        roteiro_id: Optional[int],
+        wall_time: float,
+        model_id: str
+) -> ExecucaoGeracao:
+    """
+    Monta o registro a partir do ``RunResponse`` do agno (métricas agregadas por
+    mensagem do assistente e métricas de cada chamada de ferramenta).
+    """
+    metrics = getattr(run_response, "metrics", None)
+    metrics = metrics if isinstance(metrics, dict) else {}
+
+    def total(chave: str) -> int:
+        valores = metrics.get(chave) or []
+        return int(sum(v for v in valores if isinstance(v, (int, float))))
+
+    tools = getattr(run_response, "tools", None)
+    tools = tools if isinstance(tools, list) else []
+    tool_time = sum((t.metrics.time or 0.0) for t in tools if getattr(t, "metrics", None) is not None)
+
+    modelo = getattr(run_response, "model", None)
+    model_id = modelo if isinstance(modelo, str) and modelo else model_id
+    prompt_tokens = total("input_tokens")
+    completion_tokens = total("output_tokens")
+    cached_tokens = total("cached_tokens")
+    return ExecucaoGeracao(
+        roteiro_id=roteiro_id,
+        etapa=etapa,
+        model_id=model_id,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cached_tokens=cached_tokens,
+        tool_calls=len(tools),
+        tool_time=tool_time,
+        wall_time=wall_time,
+        custo_usd=calcular_custo(model_id, prompt_tokens, completion_tokens, cached_tokens),
+    )
+
+
+class RegistradorExecucoes:
+    """
+    Fila de registros gravada em lote por uma thread daemon. Um lote é gravado quando
+    acumula ``tamanho_lote`` registros ou a cada ``intervalo`` segundos; o restante é
+    gravado na saída do processo. Quem usa um banco temporário deve chamar ``flush``
+    antes de apagá-lo: cada registro guarda o caminho do banco vigente ao ser enfileirado.
+    """
+
+    def __init__(self, tamanho_lote: int = 50, intervalo: float = 2.0):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._fila: "queue.Queue[tuple[str, ExecucaoGeracao]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._gravando = threading.Lock()
+        self._lote_cheio = threading.Event()
+
+    def registrar(self, execucao: ExecucaoGeracao, db_path: str = None) -> None:
+        """Enfileira o registro; o caminho do banco é resolvido na hora da chamada."""
+        self._fila.put((db_path or str(utils.DB_PATH), execucao))
+        if self._fila.qsize() >= self.tamanho_lote:
+            self._lote_cheio.set()
+        self._iniciar()
+
+    def flush(self) -> int:
+        """Grava imediatamente tudo o que estiver na fila. Retorna o número de registros gravados."""
+        with self._gravando:
+            pendentes: List[tuple[str, ExecucaoGeracao]] = []
+            while True:
+                try:
+                    pendentes.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            por_banco: Dict[str, List[ExecucaoGeracao]] = defaultdict(list)
+            for db_path, execucao in pendentes:
+                por_banco[db_path].append(execucao)
+            gravados = 0
+            for db_path, execucoes in por_banco.items():
+                try:
+                    gravar_execucoes(db_path, execucoes)
+                    gravados += len(execucoes)
+                except sqlite3.Error as e:
+                    logger.error("{} execuções descartadas: erro ao gravar em {}: {}", len(execucoes), db_path, e)
+            return gravados
+
+    def _iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="generation-runs-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _loop(self) -> None:
+        while True:
+            self._lote_cheio.wait(self.intervalo)
+            self._lote_cheio.clear()
+            if not self._fila.empty():
+                self.flush()
+
+
+def gravar_execucoes(db_path: str, execucoes: List[ExecucaoGeracao]) -> None:
+    """Grava um lote de execuções numa única transação."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute(CREATE_TABLE_GENERATION_RUNS)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_generation_runs_roteiro ON generation_runs (roteiro_id)")
+        cur.executemany('''
+                        INSERT INTO generation_runs (roteiro_id, etapa, model_id, prompt_tokens, completion_tokens,
+                                                     cached_tokens, tool_calls, tool_time, wall_time, custo_usd,
+                                                     criado_em)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', [astuple(e) for e in execucoes])
+        conn.commit()
+    finally:
+        conn.close()
+    logger.debug("{} execuções gravadas em generation_runs", len(execucoes))
+
+
+registrador = RegistradorExecucoes()
+
+
+def registrar_execucao(
+        run_response: Any,
+        etapa: str,
+        roteiro_id: Optional[int],
+        wall_time: float,
+        model_id: str
+) -> ExecucaoGeracao:
+    """Extrai as métricas de um ``agent.run`` e enfileira o registro para gravação em lote."""
+    execucao = extrair_execucao(run_response, etapa, roteiro_id, wall_time, model_id)
+    registrador.registrar(execucao)
+    return execucao
+
+
+# ------------------------------------------------------------------------- #
+# Consultas agregadas
+# ------------------------------------------------------------------------- #
+_AGRUPAMENTOS = {
+    "tema": "r.tema",
+    "tipo": "r.tipo",
+    "dia": "substr(g.criado_em, 1, 10)",
+    "modelo": "g.model_id",
+}
+
+
+def custos_agregados(por: str, db_path: str = None) -> List[Dict[str, Any]]:
+    """
+    Soma tokens, chamadas de ferramenta e custo agrupando por 'tema', 'tipo' (TipoRoteiro),
+    'dia' ou 'modelo'. Ordena pelo custo total, do maior para o menor.
+    """
+    if por not in _AGRUPAMENTOS:
+        raise ValueError(f"Agrupamento inválido: {por}. Use um de {sorted(_AGRUPAMENTOS)}")
+    registrador.flush()
+    conn = sqlite3.connect(db_path or str(utils.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute(CREATE_TABLE_GENERATION_RUNS)
+        conn.execute(utils.CREATE_TABLE_ROTEIROS_BIBLICOS)
+        rows = conn.execute(f'''
+            SELECT {_AGRUPAMENTOS[por]}           AS chave,
+                   COUNT(*)                       AS execucoes,
+                   COUNT(DISTINCT g.roteiro_id)   AS roteiros,
+                   SUM(g.prompt_tokens)           AS prompt_tokens,
+                   SUM(g.completion_tokens)       AS completion_tokens,
+                   SUM(g.cached_tokens)           AS cached_tokens,
+                   SUM(g.tool_calls)              AS tool_calls,
+                   SUM(g.wall_time)               AS wall_time,
+                   SUM(g.custo_usd)               AS custo_usd
+            FROM generation_runs g
+                     LEFT JOIN roteiros_biblicos r ON r.id = g.roteiro_id
+            GROUP BY chave
+            ORDER BY custo_usd DESC
+        ''').fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def custo_por_tema(db_path: str = None) -> List[Dict[str, Any]]:
+    return custos_agregados("tema", db_path)
+
+
+def custo_por_tipo(db_path: str = None) -> List[Dict[str, Any]]:
+    return custos_agregados("tipo", db_path)
+
+
+def custo_por_dia(db_path: str = None) -> List[Dict[str, Any]]:
+    return custos_agregados("dia", db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Custos de geração agregados")
+    parser.add_argument("--por", choices=sorted(_AGRUPAMENTOS), default="tema")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+    for linha in custos_agregados(args.por, args.db):
+        print(f"{str(linha['chave']):<40} {linha['execucoes']:>5} execuções  "
+              f"{linha['prompt_tokens'] or 0:>9} in  {linha['completion_tokens'] or 0:>8} out  "
+              f"US$ {linha['custo_usd'] or 0:.4f}")
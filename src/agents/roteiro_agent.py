@@ -1,17 +1,38 @@
 import os
+import threading
 from datetime import datetime
+from typing import Optional
 
-from agno.agent import Agent
+from agno.agent import Agent, RunResponse
 from agno.models.openai import OpenAIChat
 from agno.storage.sqlite import SqliteStorage
 from loguru import logger
 
+from src import profiling, repair, script_length, topic_index, validation
+from src.accounting import registrar_execucao
 from src.bible_tool import BibleLookupTool
-from src.models import RoteiroBiblico, TipoRoteiro
+from src.models import ContinuacaoRoteiro, RoteiroBiblico, TipoRoteiro
+from src.model_router import TIMEOUT_MODELO, modelo_usado, roteador
+from src.rate_limiter import estimar_tokens
 from src.utils import save_roteiro_json, save_roteiro_sqlite
 
 MODEL_ID = "gpt-4o-mini"
 
+# Estimativa para o limitador de taxa: um turno com chamadas de ferramenta e o turno final,
+# ambos reenviando o contexto, mais a saída estruturada e o texto dos versículos
+REQUISICOES_POR_ROTEIRO = 2
+TOKENS_SAIDA_ESTIMADOS = {TipoRoteiro.LONGO: 5000, TipoRoteiro.SHORT: 1200}
+
+# Conferência dos versículos com a NTLH após a geração: "corrigir" troca o texto dos blocos
+# divergentes, "marcar" só registra os problemas no log; vazio desliga
+VALIDAR_VERSICULOS = os.getenv("VALIDAR_VERSICULOS", "").lower()
+
+# Completa roteiros abaixo da extensão pedida com blocos adicionais (até N pedidos de continuação)
+COMPLETAR_EXTENSAO = int(os.getenv("COMPLETAR_EXTENSAO", "0"))
+
+# Grava as sessões dos agentes no SQLite; os workers do lote desligam (ver ``src.batch``)
+ARMAZENAR_SESSOES = True
+
 system_prompt = """
 Você é um especialista em pesquisa bíblica com profundo conhecimento das escrituras. Sua missão é identificar e juntar versículos bíblicos relevantes que se relacionem com temas específicos para criar conteúdo para vídeos do YouTube.
 
@@ -65,39 +86,100 @@ Ao utilizar a ferramenta de busca bíblica:
 4. Confirme a precisão das referências antes de incluí-las
 """
 
-bible_tool = BibleLookupTool()
+# Criados na primeira geração que não recebe um agente do chamador, não na importação:
+# o modo em lote, a fila e o serviço HTTP constroem os seus por worker/thread
+bible_tool: Optional[BibleLookupTool] = None
+agent: Optional[Agent] = None
+_lock_padrao = threading.Lock()
+
+
+def ferramenta_biblica() -> BibleLookupTool:
+    """A ``BibleLookupTool`` compartilhada pelos agentes deste módulo."""
+    global bible_tool
+    with _lock_padrao:
+        if bible_tool is None:
+            bible_tool = BibleLookupTool()
+        return bible_tool
 
-agent = Agent(
-    model=OpenAIChat(id=MODEL_ID, temperature=0.3),
-    description="Agente gerador de roteiros bíblicos para YouTube",
-    tools=[bible_tool],
-    response_model=RoteiroBiblico,
-    storage=SqliteStorage(
+
+def _criar_storage() -> SqliteStorage:
+    return SqliteStorage(
         table_name="roteiros_sessions",
         db_file=f"{os.environ.get('DB_NAME', 'roteiros')}.sqlite3",
         auto_upgrade_schema=True
-    ),
-    instructions=[system_prompt],
-    show_tool_calls=False
-)
+    )
 
 
-def gerar_roteiro(titulo: str, tipo: TipoRoteiro = TipoRoteiro, referencias: list[str] = None) -> tuple[
-    RoteiroBiblico, int]:
+def criar_agente(modelo: str = None) -> Agent:
     """
-    Gera um roteiro bíblico baseado no tema e tipo especificados
+    Constrói um agente de roteiros novo. O ``Agent`` do agno guarda o estado da execução
+    em si mesmo, então cada thread ou processo concorrente precisa do seu.
+    ``modelo`` substitui ``MODEL_ID`` (usado pelo roteador de modelos).
+    """
+    return Agent(
+        model=OpenAIChat(id=modelo or MODEL_ID, temperature=0.3, timeout=TIMEOUT_MODELO,
+                         base_url=os.environ.get("OPENAI_BASE_URL") or None),
+        description="Agente gerador de roteiros bíblicos para YouTube",
+        tools=[ferramenta_biblica()],
+        response_model=RoteiroBiblico,
+        storage=_criar_storage() if ARMAZENAR_SESSOES else None,
+        instructions=[system_prompt],
+        show_tool_calls=False
+    )
 
-    Args:
-        titulo (str): Tema do roteiro
-        tipo (TipoRoteiro): Tipo do roteiro (LONGO ou SHORT)
-        referencias (list[str], opcional): Referências sugeridas para o agente usar
+
+def agente_padrao() -> Agent:
+    """O agente do módulo, usado quando o chamador não passa um; criado no primeiro uso."""
+    global agent
+    if agent is None:
+        novo = criar_agente()
+        with _lock_padrao:
+            if agent is None:
+                agent = novo
+    return agent
+
+
+def criar_agente_continuacao(modelo: str = None) -> Agent:
+    """Agente enxuto, sem histórico, que só devolve blocos adicionais para um roteiro curto."""
+    return Agent(
+        model=OpenAIChat(id=modelo or MODEL_ID, temperature=0.3, timeout=TIMEOUT_MODELO,
+                         base_url=os.environ.get("OPENAI_BASE_URL") or None),
+        description="Agente que acrescenta blocos de versículos a roteiros bíblicos",
+        tools=[ferramenta_biblica()],
+        response_model=ContinuacaoRoteiro,
+        instructions=["Você acrescenta blocos de versículos bíblicos (NTLH) a um roteiro existente, "
+                      "sem repetir os versículos já utilizados e sem nenhum texto além dos versículos."],
+        show_tool_calls=False
+    )
+
+
+def preparar_storage() -> None:
+    """
+    Cria as tabelas de sessão antes de execuções concorrentes: o ``SqliteStorage`` do agno
+    as cria sob demanda, e duas execuções simultâneas podem colidir ao criar os índices.
+    """
+    # Storage novo, para usar a configuração (DB_NAME) vigente e não a da importação
+    _criar_storage().create()
+
+
+def executar_roteiro(titulo: str, tipo: TipoRoteiro = TipoRoteiro, referencias: list[str] = None,
+                     agente: Agent = None) -> tuple[RoteiroBiblico, RunResponse, float]:
+    """
+    Executa o agente e monta o roteiro, sem gravar nada (usado também pelo modo em lote,
+    em que a gravação fica a cargo de um único escritor no processo principal).
+    Recebe os mesmos argumentos de ``gerar_roteiro``.
 
     Returns:
-        tuple[RoteiroBiblico, int]: Objeto com o roteiro gerado e ID do roteiro no banco
+        tuple[RoteiroBiblico, RunResponse, float]: Roteiro, resposta do agente e duração da execução
     """
-    logger.info(f"Iniciando geração de roteiro: titulo='{titulo}', tipo='{tipo}', referencias={referencias}")
-    referencias = referencias or []
-    referencias_str = f" Considere utilizar as seguintes referências bíblicas: {', '.join(referencias)}." if referencias else ""
+    logger.info("Iniciando geração de roteiro: titulo='{}', tipo='{}', referencias={}", titulo, tipo, referencias)
+    sugeridas = referencias
+    if not referencias:
+        # Sugestões do índice de temas (opcional): só vão ao prompt, não para roteiro.referencias
+        sugeridas = topic_index.sugerir_referencias(titulo)
+        if sugeridas:
+            logger.info("Referências sugeridas pelo índice de temas: {}", sugeridas)
+    referencias_str = f" Considere utilizar as seguintes referências bíblicas: {', '.join(sugeridas)}." if sugeridas else ""
     prompt = (
         f"Gere um roteiro {tipo.value} sobre o tema '{titulo}' seguindo estas diretrizes:\n\n"
 
@@ -140,13 +222,79 @@ def gerar_roteiro(titulo: str, tipo: TipoRoteiro = TipoRoteiro, referencias: lis
         f"REFERÊNCIAS SUGERIDAS:\n{referencias_str if referencias_str else '- Use as referências mais adequadas ao tema'}"
     )
 
-    roteiro: RoteiroBiblico = agent.run(prompt).content
-    roteiro.referencias = referencias
+    tokens_estimados = (estimar_tokens(system_prompt, prompt) * REQUISICOES_POR_ROTEIRO
+                        + TOKENS_SAIDA_ESTIMADOS.get(tipo, 5000))
+    with BibleLookupTool.orcamento():
+        resposta, duracao = roteador.executar("roteiro", prompt, criar_agente, MODEL_ID, tipo=tipo,
+                                              agente=agente or agente_padrao(), tokens=tokens_estimados,
+                                              requisicoes=REQUISICOES_POR_ROTEIRO)
+    roteiro: RoteiroBiblico = repair.garantir_modelo(resposta.content, RoteiroBiblico,
+                                                     padroes={"tema": titulo, "tipo": tipo},
+                                                     derivar=repair.derivar_roteiro)
+    resposta.content = roteiro
+    roteiro.referencias = referencias or []
     roteiro.tema = titulo  # Garantir que o tema seja definido corretamente
-    logger.debug(f"Roteiro gerado: {roteiro}")
+    if VALIDAR_VERSICULOS in ("corrigir", "marcar"):
+        resultado = validation.validar_roteiro(roteiro, corrigir=VALIDAR_VERSICULOS == "corrigir")
+        if resultado.roteiro_corrigido is not None:
+            roteiro.roteiro = resultado.roteiro_corrigido.roteiro
+    logger.debug("Roteiro gerado: {}", roteiro)
     roteiro.data_criacao = datetime.now()
+    return roteiro, resposta, duracao
+
+
+def completar_extensao(roteiro: RoteiroBiblico, agente: Agent = None,
+                       max_rodadas: int = 2) -> list[tuple[RunResponse, float]]:
+    """
+    Enquanto o roteiro estiver abaixo da extensão mínima do tipo, pede só os blocos que
+    faltam (com um resumo, não o texto inteiro) e os insere no roteiro.
+
+    Returns:
+        list[tuple[RunResponse, float]]: Resposta e duração de cada pedido de continuação
+    """
+    execucoes = []
+    for _ in range(max_rodadas):
+        extensao = script_length.medir(roteiro)
+        if not extensao.faltam:
+            break
+        logger.info("Roteiro '{}' com {} palavras ({:.1f} min); pedindo mais {}",
+                    roteiro.tema, extensao.palavras, extensao.minutos, extensao.faltam)
+        prompt = script_length.prompt_continuacao(roteiro, extensao)
+        tokens_estimados = estimar_tokens(prompt) * REQUISICOES_POR_ROTEIRO + extensao.faltam * 2
+        with BibleLookupTool.orcamento():
+            resposta, duracao = roteador.executar("continuacao", prompt, criar_agente_continuacao, MODEL_ID,
+                                                  tipo=roteiro.tipo, agente=agente, tokens=tokens_estimados,
+                                                  requisicoes=REQUISICOES_POR_ROTEIRO)
+        execucoes.append((resposta, duracao))
+        continuacao = repair.garantir_modelo(resposta.content, ContinuacaoRoteiro, derivar=repair.derivar_roteiro)
+        script_length.anexar(roteiro, continuacao)
+    return execucoes
+
+
+@profiling.perfilado("roteiro")
+def gerar_roteiro(titulo: str, tipo: TipoRoteiro = TipoRoteiro, referencias: list[str] = None,
+                  agente: Agent = None) -> tuple[RoteiroBiblico, int]:
+    """
+    Gera um roteiro bíblico baseado no tema e tipo especificados
+
+    Args:
+        titulo (str): Tema do roteiro
+        tipo (TipoRoteiro): Tipo do roteiro (LONGO ou SHORT)
+        referencias (list[str], opcional): Referências sugeridas para o agente usar
+        agente (Agent, opcional): Agente a usar no lugar do agente do módulo (ex.: um por thread)
+
+    Returns:
+        tuple[RoteiroBiblico, int]: Objeto com o roteiro gerado e ID do roteiro no banco
+    """
+    roteiro, resposta, duracao = executar_roteiro(titulo, tipo, referencias, agente)
+    continuacoes = completar_extensao(roteiro, max_rodadas=COMPLETAR_EXTENSAO) if COMPLETAR_EXTENSAO else []
     roteiro_id = save_roteiro_sqlite(roteiro)
+    topic_index.registrar_roteiro(roteiro.tema, roteiro.versiculos_utilizados)
+    registrar_execucao(resposta, "roteiro", roteiro_id, duracao, modelo_usado(resposta, MODEL_ID))
+    for resposta_continuacao, duracao_continuacao in continuacoes:
+        registrar_execucao(resposta_continuacao, "continuacao", roteiro_id, duracao_continuacao,
+                           modelo_usado(resposta_continuacao, MODEL_ID))
 
     path = save_roteiro_json(roteiro)
-    logger.success(f"Roteiro salvo em {path} e no banco SQLite com ID {roteiro_id}")
+    logger.success("Roteiro salvo em {} e no banco SQLite com ID {}", path, roteiro_id)
     return roteiro, roteiro_id
@@ -1,14 +1,29 @@
 import os
+import sqlite3
+import threading
+from typing import Optional
 
-from agno.agent import Agent
+from agno.agent import Agent, RunResponse
 from agno.models.openai import OpenAIChat
 from agno.storage.sqlite import SqliteStorage
 from loguru import logger
 
-from src.models import DetailVideoYouTube, RoteiroBiblico
-from src.utils import save_info_video_sqlite
+from src import profiling, repair, tag_stats, title_ranking
+from src.accounting import registrar_execucao
+from src.models import DetailVideoYouTube, DetailVideoYouTubeCandidatos, RoteiroBiblico
+from src.model_router import TIMEOUT_MODELO, modelo_usado, roteador
+from src.rate_limiter import estimar_tokens
+from src.utils import get_titulos_existentes, save_candidatos_titulo_sqlite, save_info_video_sqlite
 
 MODEL_ID = "gpt-4o-mini"
+TOKENS_SAIDA_ESTIMADOS = 800
+TOKENS_POR_CANDIDATO = 80
+
+# Quantas variações de título/thumbnail pedir numa única chamada (1 = modo simples)
+CANDIDATOS_TITULO = int(os.getenv("CANDIDATOS_TITULO", "1"))
+
+# Grava as sessões dos agentes no SQLite; os workers do lote desligam (ver ``src.batch``)
+ARMAZENAR_SESSOES = True
 
 system_prompt = """
 Você é um especialista em marketing digital e SEO para YouTube, focado em conteúdo cristão e bíblico. 
@@ -24,57 +39,186 @@ Siga estas diretrizes:
 7) Crie descrições que incentivem inscrições e engajamento
 """
 
-agent = Agent(
-    model=OpenAIChat(id=MODEL_ID, temperature=0.7),
-    description="Agente gerador de informações para vídeos do YouTube",
-    response_model=DetailVideoYouTube,
-    storage=SqliteStorage(
+
+def _criar_storage() -> SqliteStorage:
+    return SqliteStorage(
         table_name="youtube_video_details_sessions",
         db_file=f"{os.environ.get('DB_NAME', 'roteiros')}.sqlite3",
         auto_upgrade_schema=True
-    ),
-    instructions=[system_prompt]
-)
+    )
 
 
-def gerar_detail_video_youtube(roteiro: RoteiroBiblico, roteiro_id: int = None) -> DetailVideoYouTube:
+def criar_agente(candidatos: bool = False, modelo: str = None) -> Agent:
     """
-    Gera informações otimizadas para vídeo do YouTube baseadas no roteiro bíblico.
+    Constrói um agente de detalhes novo (um por thread ou processo concorrente).
+    Com ``candidatos=True`` a saída traz várias variações de título/thumbnail;
+    ``modelo`` substitui ``MODEL_ID`` (usado pelo roteador de modelos).
+    """
+    return Agent(
+        model=OpenAIChat(id=modelo or MODEL_ID, temperature=0.7, timeout=TIMEOUT_MODELO,
+                         base_url=os.environ.get("OPENAI_BASE_URL") or None),
+        description="Agente gerador de informações para vídeos do YouTube",
+        response_model=DetailVideoYouTubeCandidatos if candidatos else DetailVideoYouTube,
+        storage=_criar_storage() if ARMAZENAR_SESSOES else None,
+        instructions=[system_prompt]
+    )
 
-    Args:
-        roteiro (RoteiroBiblico): Roteiro bíblico para gerar as informações
-        roteiro_id (int, opcional): ID do roteiro no banco de dados
 
-    Returns:
-        DetailVideoYouTube: Objeto com as informações do vídeo
-    """
-    logger.info(f"Gerando informações do vídeo para roteiro: tema='{roteiro.tema}', tipo='{roteiro.tipo}'")
+# Criado na primeira geração que não recebe um agente do chamador, não na importação
+agent: Optional[Agent] = None
+_lock_padrao = threading.Lock()
 
-    prompt = f"""
+
+def agente_padrao() -> Agent:
+    """O agente do módulo, usado quando o chamador não passa um; criado no primeiro uso."""
+    global agent
+    if agent is None:
+        novo = criar_agente()
+        with _lock_padrao:
+            if agent is None:
+                agent = novo
+    return agent
+
+
+def preparar_storage() -> None:
+    """
+    Cria as tabelas de sessão antes de execuções concorrentes: o ``SqliteStorage`` do agno
+    as cria sob demanda, e duas execuções simultâneas podem colidir ao criar os índices.
+    """
+    # Storage novo, para usar a configuração (DB_NAME) vigente e não a da importação
+    _criar_storage().create()
+
+
+def _tags_do_canal(tema: str) -> str:
+    """Tags e hashtags já publicadas mais relevantes para o tema, como bloco do prompt (ou vazio)."""
+    try:
+        tags = tag_stats.sugerir(tema, tag_stats.TAG)
+        hashtags = tag_stats.sugerir(tema, tag_stats.HASHTAG)
+    except sqlite3.Error as e:
+        logger.warning("Estatísticas de tags indisponíveis: {}", e)
+        return ""
+    if not tags and not hashtags:
+        return ""
+    return ("\n    TAGS JÁ USADAS NO CANAL (reaproveite as pertinentes e complete só com o que faltar):\n"
+            f"    Tags: {', '.join(tags) or '-'}\n"
+            f"    Hashtags: {' '.join(hashtags) or '-'}\n")
+
+
+def _prompt(roteiro: RoteiroBiblico, candidatos: int = 1) -> str:
+    if candidatos > 1:
+        titulo = (f"1) {candidatos} variações DIFERENTES entre si, cada uma com um título chamativo e otimizado "
+                  "para SEO e o prompt de thumbnail que combina com ele (campo candidatos)")
+        thumbnail = ""
+    else:
+        titulo = "1) Um título chamativo e otimizado para SEO que chame a atenção do público"
+        thumbnail = "\n    5) Um prompt para gerar uma thumbnail atrativa"
+    return f"""
     Com base no seguinte roteiro bíblico, crie informações otimizadas para um vídeo do YouTube:
 
     TEMA: {roteiro.tema}
     TIPO: {roteiro.tipo.value}
     VERSÍCULOS: {', '.join(roteiro.versiculos_utilizados)}
-    
+    {_tags_do_canal(roteiro.tema)}
     ROTEIRO:
     {roteiro.roteiro}
 
     Crie:
-    1) Um título chamativo e otimizado para SEO que chame a atenção do público
+    {titulo}
     2) Uma descrição completa que incentive inscrições
     3) Tags relevantes para o nicho cristão
-    4) Hashtags populares para redes sociais
-    5) Um prompt para gerar uma thumbnail atrativa
+    4) Hashtags populares para redes sociais{thumbnail}
 
     Foque em engajamento e conversão para inscritos no canal.
     """
 
-    info_video: DetailVideoYouTube = agent.run(prompt).content
-    logger.debug(f"Informações do vídeo geradas: {info_video}")
+
+def executar_detail_video_youtube(roteiro: RoteiroBiblico,
+                                  agente: Agent = None) -> tuple[DetailVideoYouTube, RunResponse, float]:
+    """
+    Executa o agente sem gravar nada. Recebe os mesmos argumentos de ``gerar_detail_video_youtube``.
+
+    Returns:
+        tuple[DetailVideoYouTube, RunResponse, float]: Informações, resposta do agente e duração da execução
+    """
+    logger.info("Gerando informações do vídeo para roteiro: tema='{}', tipo='{}'", roteiro.tema, roteiro.tipo)
+    prompt = _prompt(roteiro)
+    tokens_estimados = estimar_tokens(system_prompt, prompt) + TOKENS_SAIDA_ESTIMADOS
+    resposta, duracao = roteador.executar("detalhes", prompt, lambda modelo: criar_agente(modelo=modelo), MODEL_ID,
+                                          tipo=roteiro.tipo,
+                                          agente=agente or agente_padrao(), tokens=tokens_estimados)
+    info_video: DetailVideoYouTube = repair.garantir_modelo(resposta.content, DetailVideoYouTube,
+                                                            derivar=repair.derivar_detalhes)
+    resposta.content = info_video
+    logger.debug("Informações do vídeo geradas: {}", info_video)
+    return info_video, resposta, duracao
+
+
+def executar_candidatos(roteiro: RoteiroBiblico, candidatos: int,
+                        agente: Agent = None) -> tuple[DetailVideoYouTubeCandidatos, RunResponse, float]:
+    """
+    Pede ``candidatos`` variações de título/thumbnail numa única chamada, sem gravar nada.
+
+    Returns:
+        tuple[DetailVideoYouTubeCandidatos, RunResponse, float]: Saída, resposta do agente e duração
+    """
+    logger.info("Gerando {} candidatos de título para roteiro: tema='{}'", candidatos, roteiro.tema)
+    if agente is None or agente.response_model is not DetailVideoYouTubeCandidatos:
+        # O agente do chamador (ex.: um por thread no servidor) é do modo simples
+        agente = criar_agente(candidatos=True)
+    prompt = _prompt(roteiro, candidatos)
+    tokens_estimados = estimar_tokens(system_prompt, prompt) + TOKENS_SAIDA_ESTIMADOS + TOKENS_POR_CANDIDATO * candidatos
+    resposta, duracao = roteador.executar("detalhes", prompt, lambda modelo: criar_agente(True, modelo), MODEL_ID,
+                                          tipo=roteiro.tipo, agente=agente, tokens=tokens_estimados)
+    saida = repair.garantir_modelo(resposta.content, DetailVideoYouTubeCandidatos, derivar=repair.derivar_detalhes)
+    resposta.content = saida
+    return saida, resposta, duracao
+
+
+@profiling.perfilado("detalhes")
+def gerar_detail_video_youtube(roteiro: RoteiroBiblico, roteiro_id: int = None,
+                               agente: Agent = None, candidatos: int = None) -> DetailVideoYouTube:
+    """
+    Gera informações otimizadas para vídeo do YouTube baseadas no roteiro bíblico.
+
+    Args:
+        roteiro (RoteiroBiblico): Roteiro bíblico para gerar as informações
+        roteiro_id (int, opcional): ID do roteiro no banco de dados
+        agente (Agent, opcional): Agente a usar no lugar do agente do módulo (ex.: um por thread);
+            no modo de candidatos só é usado se criado com ``criar_agente(candidatos=True)``
+        candidatos (int, opcional): Variações de título/thumbnail pedidas na mesma chamada e
+            ranqueadas localmente (padrão: ``CANDIDATOS_TITULO``). Todas ficam em ``candidatos_titulo``.
+
+    Returns:
+        DetailVideoYouTube: Objeto com as informações do vídeo (com o candidato mais bem colocado)
+    """
+    candidatos = candidatos or CANDIDATOS_TITULO
+    if candidatos > 1:
+        return _gerar_com_candidatos(roteiro, roteiro_id, agente, candidatos)
+
+    info_video, resposta, duracao = executar_detail_video_youtube(roteiro, agente)
+    registrar_execucao(resposta, "detalhes", roteiro_id, duracao, modelo_usado(resposta, MODEL_ID))
 
     if roteiro_id:
         save_info_video_sqlite(info_video, roteiro_id)
-        logger.success(f"Informações do vídeo salvas no banco SQLite")
+        logger.success("Informações do vídeo salvas no banco SQLite")
+
+    return info_video
+
+
+def _gerar_com_candidatos(roteiro: RoteiroBiblico, roteiro_id: int, agente: Agent,
+                          candidatos: int) -> DetailVideoYouTube:
+    saida, resposta, duracao = executar_candidatos(roteiro, candidatos, agente)
+    registrar_execucao(resposta, "detalhes", roteiro_id, duracao, modelo_usado(resposta, MODEL_ID))
+    if not saida.candidatos:
+        raise ValueError("O agente não devolveu nenhum candidato de título")
 
+    ranking = title_ranking.ranquear(saida.candidatos, roteiro.tema, saida.tags, get_titulos_existentes())
+    melhor = ranking[0][0]
+    logger.info("Título escolhido entre {} candidatos: '{}' ({:.2f})", len(ranking), melhor.titulo, ranking[0][1])
+    info_video = DetailVideoYouTube(titulo=melhor.titulo, descricao=saida.descricao, tags=saida.tags,
+                                    hashtags=saida.hashtags, thumbnail_prompt=melhor.thumbnail_prompt)
+    if roteiro_id:
+        save_info_video_sqlite(info_video, roteiro_id)
+        save_candidatos_titulo_sqlite(roteiro_id, ranking)
+        logger.success("Informações do vídeo e candidatos salvos no banco SQLite")
     return info_video
@@ -0,0 +1,251 @@
+"""
+Arquivamento do diretório ``roteiros_json``.
+
+``compactar`` move os JSONs mais antigos para um zip por mês (``arquivo/roteiros_AAAA-MM.zip``)
+e mantém dois índices ao lado, com registros de tamanho fixo ordenados por nome do
+arquivo e por ``roteiro_id`` (descoberto no SQLite pelo tema + data de criação).
+``ArquivoRoteiros`` abre os índices por ``mmap``, faz busca binária e lê só os bytes do
+membro dentro do zip, sem abrir o diretório central nem extrair o arquivo inteiro.
+
+    python -m src.archive compactar --dias 30
+    python -m src.archive ler 20250101T100000Z_Video_Fé.json
+    python -m src.archive ler --id 42
+"""
+import argparse
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import zipfile
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from src import utils
+from src.models import RoteiroBiblico
+
+# roteiro_id, offset do cabeçalho local, tamanho comprimido, método, mês (AAAA-MM), nome
+_REGISTRO = struct.Struct("<qQQH7s256s")
+_CABECALHO_LOCAL = struct.Struct("<4s5H3L2H")
+INDICE_NOME = "por_nome.idx"
+INDICE_ID = "por_id.idx"
+_TS_NOME = re.compile(r"^(\d{8}T\d{6})Z_")
+
+
+@dataclass(frozen=True)
+class Registro:
+    roteiro_id: int
+    offset: int
+    tamanho: int
+    metodo: int
+    mes: str
+    nome: str
+
+    def empacotar(self) -> bytes:
+        return _REGISTRO.pack(self.roteiro_id, self.offset, self.tamanho, self.metodo,
+                              self.mes.encode("ascii"), self.nome.encode("utf-8"))
+
+    @classmethod
+    def desempacotar(cls, dados: bytes) -> "Registro":
+        roteiro_id, offset, tamanho, metodo, mes, nome = _REGISTRO.unpack(dados)
+        return cls(roteiro_id, offset, tamanho, metodo, mes.decode("ascii"), nome.rstrip(b"\0").decode("utf-8"))
+
+
+def _diretorio_arquivo() -> Path:
+    return Path(utils.OUT_DIR) / "arquivo"
+
+
+def _data_do_arquivo(caminho: Path) -> datetime:
+    """Data de criação pelo prefixo do nome (``AAAAMMDDTHHMMSSZ_``) ou, sem ele, pela mtime."""
+    m = _TS_NOME.match(caminho.name)
+    if m:
+        return datetime.strptime(m.group(1), "%Y%m%dT%H%M%S")
+    return datetime.fromtimestamp(caminho.stat().st_mtime)
+
+
+def _ids_por_tema_e_data(db_path: str = None) -> Dict[tuple[str, str], int]:
+    """(tema, data_criacao normalizada) -> id, para ligar cada JSON à sua linha no banco."""
+    conn = sqlite3.connect(db_path or str(utils.DB_PATH))
+    try:
+        conn.execute(utils.CREATE_TABLE_ROTEIROS_BIBLICOS)
+        return {(tema, datetime.fromisoformat(data).isoformat()): roteiro_id
+                for roteiro_id, tema, data in conn.execute("SELECT id, tema, data_criacao FROM roteiros_biblicos")
+                if data}
+    finally:
+        conn.close()
+
+
+def _ler_indice(caminho: Path) -> List[Registro]:
+    if not caminho.exists():
+        return []
+    dados = caminho.read_bytes()
+    return [Registro.desempacotar(dados[i:i + _REGISTRO.size]) for i in range(0, len(dados), _REGISTRO.size)]
+
+
+def _gravar_indices(diretorio: Path, registros: List[Registro]) -> None:
+    for nome, chave in ((INDICE_NOME, lambda r: r.nome.encode("utf-8")), (INDICE_ID, lambda r: r.roteiro_id)):
+        tmp = diretorio / f"{nome}.tmp"
+        tmp.write_bytes(b"".join(r.empacotar() for r in sorted(registros, key=chave)))
+        os.replace(tmp, diretorio / nome)
+
+
+def compactar(dias: int = 30, agora: datetime = None, db_path: str = None) -> int:
+    """
+    Move para os zips mensais os JSONs de ``roteiros_json`` com mais de ``dias`` dias.
+    Retorna quantos arquivos foram arquivados.
+    """
+    origem = Path(utils.OUT_DIR)
+    destino = _diretorio_arquivo()
+    destino.mkdir(parents=True, exist_ok=True)
+    limite = (agora or datetime.now()) - timedelta(days=dias)
+
+    por_mes: Dict[str, List[Path]] = defaultdict(list)
+    for caminho in origem.glob("*.json"):
+        data = _data_do_arquivo(caminho)
+        if data < limite:
+            por_mes[data.strftime("%Y-%m")].append(caminho)
+    if not por_mes:
+        return 0
+
+    registros = _ler_indice(destino / INDICE_NOME)
+    ja_arquivados = {r.nome for r in registros}
+    ids = _ids_por_tema_e_data(db_path)
+    arquivados: List[Path] = []
+    try:
+        for mes, caminhos in sorted(por_mes.items()):
+            zip_path = destino / f"roteiros_{mes}.zip"
+            novos = {}
+            with zipfile.ZipFile(zip_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+                no_zip = set(zf.namelist())
+                for caminho in sorted(caminhos):
+                    # Um arquivo já arquivado (compactação anterior interrompida) só é removido
+                    if caminho.name in ja_arquivados:
+                        arquivados.append(caminho)
+                        continue
+                    try:
+                        roteiro = RoteiroBiblico.model_validate_json(caminho.read_bytes())
+                    except ValueError as e:
+                        logger.warning("{} ignorado (JSON inválido): {}", caminho.name, e)
+                        continue
+                    # Já no zip mas fora dos índices: a compactação anterior parou antes de gravá-los
+                    if caminho.name not in no_zip:
+                        zf.write(caminho, caminho.name)
+                    novos[caminho.name] = ids.get((roteiro.tema, roteiro.data_criacao.isoformat()), -1)
+                    arquivados.append(caminho)
+            with zipfile.ZipFile(zip_path) as zf:
+                for info in zf.infolist():
+                    if info.filename in novos:
+                        registros.append(Registro(novos[info.filename], info.header_offset, info.compress_size,
+                                                  info.compress_type, mes, info.filename))
+            logger.info("{} roteiros arquivados em {}", len(novos), zip_path.name)
+    finally:
+        # Mesmo com erro no meio, os membros já gravados e registrados entram nos índices
+        _gravar_indices(destino, registros)
+
+    for caminho in arquivados:
+        caminho.unlink()
+    logger.success("Compactação concluída: {} arquivos movidos para {}", len(arquivados), destino)
+    return len(arquivados)
+
+
+class ArquivoRoteiros:
+    """Leitura aleatória dos roteiros arquivados, via índices mapeados em memória."""
+
+    def __init__(self, diretorio: Path = None):
+        self.diretorio = Path(diretorio) if diretorio else _diretorio_arquivo()
+        self._mapas: Dict[str, Optional[mmap.mmap]] = {}
+
+    def _mapa(self, nome: str) -> Optional[mmap.mmap]:
+        if nome not in self._mapas:
+            caminho = self.diretorio / nome
+            if not caminho.exists() or caminho.stat().st_size == 0:
+                self._mapas[nome] = None
+            else:
+                with caminho.open("rb") as f:
+                    self._mapas[nome] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapas[nome]
+
+    def _buscar(self, indice: str, chave, extrair) -> Optional[Registro]:
+        mapa = self._mapa(indice)
+        if mapa is None:
+            return None
+        baixo, alto = 0, len(mapa) // _REGISTRO.size
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            valor = extrair(mapa, meio * _REGISTRO.size)
+            if valor < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        if baixo * _REGISTRO.size < len(mapa) and extrair(mapa, baixo * _REGISTRO.size) == chave:
+            inicio = baixo * _REGISTRO.size
+            return Registro.desempacotar(mapa[inicio:inicio + _REGISTRO.size])
+        return None
+
+    def buscar_nome(self, nome: str) -> Optional[Registro]:
+        inicio_nome = _REGISTRO.size - 256
+        return self._buscar(INDICE_NOME, nome.encode("utf-8"),
+                            lambda m, i: m[i + inicio_nome:i + _REGISTRO.size].rstrip(b"\0"))
+
+    def buscar_id(self, roteiro_id: int) -> Optional[Registro]:
+        return self._buscar(INDICE_ID, roteiro_id, lambda m, i: struct.unpack_from("<q", m, i)[0])
+
+    def ler_bytes(self, registro: Registro) -> bytes:
+        with (self.diretorio / f"roteiros_{registro.mes}.zip").open("rb") as f:
+            f.seek(registro.offset)
+            cabecalho = _CABECALHO_LOCAL.unpack(f.read(_CABECALHO_LOCAL.size))
+            tamanho_nome, tamanho_extra = cabecalho[-2:]
+            f.seek(tamanho_nome + tamanho_extra, os.SEEK_CUR)
+            dados = f.read(registro.tamanho)
+        if registro.metodo == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(dados, -15)
+        return dados
+
+    def ler(self, nome: str = None, roteiro_id: int = None) -> Optional[RoteiroBiblico]:
+        registro = self.buscar_nome(nome) if nome is not None else self.buscar_id(roteiro_id)
+        if registro is None:
+            return None
+        return RoteiroBiblico.model_validate_json(self.ler_bytes(registro))
+
+    def registros(self) -> Iterator[Registro]:
+        yield from _ler_indice(self.diretorio / INDICE_NOME)
+
+    def fechar(self) -> None:
+        for mapa in self._mapas.values():
+            if mapa is not None:
+                mapa.close()
+        self._mapas.clear()
+
+
+def carregar_roteiro_json(nome: str = None, roteiro_id: int = None) -> Optional[RoteiroBiblico]:
+    """Lê um roteiro salvo em JSON pelo nome do arquivo ou pelo ID, no diretório vivo ou no arquivo."""
+    if nome is not None and (Path(utils.OUT_DIR) / nome).exists():
+        return RoteiroBiblico.model_validate_json((Path(utils.OUT_DIR) / nome).read_bytes())
+    arquivo = ArquivoRoteiros()
+    try:
+        return arquivo.ler(nome, roteiro_id)
+    finally:
+        arquivo.fechar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquivamento de roteiros_json")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_comp = sub.add_parser("compactar", help="Move JSONs antigos para os zips mensais")
+    p_comp.add_argument("--dias", type=int, default=30)
+    p_ler = sub.add_parser("ler", help="Mostra um roteiro arquivado")
+    p_ler.add_argument("nome", nargs="?")
+    p_ler.add_argument("--id", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.comando == "compactar":
+        print(compactar(args.dias))
+    else:
+        roteiro = carregar_roteiro_json(args.nome, args.id)
+        print(roteiro.model_dump_json(indent=2) if roteiro else "Roteiro não encontrado")
@@ -0,0 +1,215 @@
+"""
+Geração em lote com um pool de processos.
+
+O parsing das páginas (BeautifulSoup) e a validação dos roteiros (pydantic) são
+limitados pelo GIL quando rodam em threads; aqui cada pedido roda num processo
+worker. Cada worker constrói seus agentes uma única vez no inicializador e usa o
+cache de capítulos em disco compartilhado por todos. Os workers não tocam no banco,
+nem para as sessões dos agentes (construídos sem storage, então o histórico de sessões
+do agno não guarda as gerações do lote): devolvem o resultado ao processo principal,
+onde uma única thread escritora grava roteiros, informações de vídeo e execuções em
+sequência.
+
+    python -m src.batch pedidos.jsonl --processos 4
+
+Cada linha de ``pedidos.jsonl``: ``{"tema": "...", "tipo": "Short", "referencias": ["..."]}``.
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from loguru import logger
+
+from src import profiling, utils
+from src.accounting import ExecucaoGeracao, extrair_execucao, gravar_execucoes
+from src.bible_tool import BibleLookupTool
+from src.chapter_cache import ChapterCache, diretorio_padrao
+from src.logging_config import configurar_logging
+from src.models import DetailVideoYouTube, RoteiroBiblico, TipoRoteiro
+
+
+@dataclass
+class Pedido:
+    tema: str
+    tipo: TipoRoteiro = TipoRoteiro.LONGO
+    referencias: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ResultadoLote:
+    pedido: Pedido
+    roteiro: Optional[RoteiroBiblico] = None
+    info_video: Optional[DetailVideoYouTube] = None
+    roteiro_id: Optional[int] = None
+    erro: Optional[str] = None
+
+
+# ------------------------------------------------------------------------- #
+# Processo worker
+# ------------------------------------------------------------------------- #
+_agentes = None
+
+
+def _inicializar_worker(cache_dir: str, nivel_log: str) -> None:
+    """Roda uma vez em cada processo do pool."""
+    global _agentes
+    configurar_logging(nivel_log)
+    BibleLookupTool.usar_cache(ChapterCache(cache_dir))
+
+    from src.agents import roteiro_agent, youtube_detail_agent
+    # Sem storage, inclusive nos agentes que o roteador criar: as sessões iriam direto para
+    # o SQLite compartilhado, fora da escritora única
+    roteiro_agent.ARMAZENAR_SESSOES = youtube_detail_agent.ARMAZENAR_SESSOES = False
+    _agentes = (roteiro_agent.criar_agente(), youtube_detail_agent.criar_agente())
+
+
+def _gerar(pedido: Pedido) -> tuple[RoteiroBiblico, DetailVideoYouTube, List[ExecucaoGeracao]]:
+    with profiling.perfilar(f"lote_{pedido.tema}"):
+        return _executar_pedido(pedido)
+
+
+def _executar_pedido(pedido: Pedido) -> tuple[RoteiroBiblico, DetailVideoYouTube, List[ExecucaoGeracao]]:
+    from src.agents import roteiro_agent, youtube_detail_agent
+    from src.model_router import modelo_usado
+
+    agente_roteiro, agente_detalhes = _agentes
+    roteiro, resposta, duracao = roteiro_agent.executar_roteiro(
+        pedido.tema, pedido.tipo, pedido.referencias, agente=agente_roteiro
+    )
+    execucoes = [extrair_execucao(resposta, "roteiro", None, duracao,
+                                  modelo_usado(resposta, roteiro_agent.MODEL_ID))]
+    if roteiro_agent.COMPLETAR_EXTENSAO:
+        for resposta, duracao in roteiro_agent.completar_extensao(roteiro, max_rodadas=roteiro_agent.COMPLETAR_EXTENSAO):
+            execucoes.append(extrair_execucao(resposta, "continuacao", None, duracao,
+                                              modelo_usado(resposta, roteiro_agent.MODEL_ID)))
+    info_video, resposta, duracao = youtube_detail_agent.executar_detail_video_youtube(roteiro, agente=agente_detalhes)
+    execucoes.append(extrair_execucao(resposta, "detalhes", None, duracao,
+                                       modelo_usado(resposta, youtube_detail_agent.MODEL_ID)))
+    return roteiro, info_video, execucoes
+
+
+# ------------------------------------------------------------------------- #
+# Processo principal
+# ------------------------------------------------------------------------- #
+class EscritorSQLite(threading.Thread):
+    """Única thread que grava no banco; os resultados chegam por uma fila."""
+
+    def __init__(self, db_path: str = None):
+        super().__init__(name="batch-sqlite-writer", daemon=True)
+        self.db_path = db_path or str(utils.DB_PATH)
+        self._fila: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+    def enviar(
+            self,
+            roteiro: RoteiroBiblico,
+            info_video: DetailVideoYouTube,
+            execucoes: List[ExecucaoGeracao]
+    ) -> "Future[int]":
+        """Enfileira a gravação; o futuro resolve para o ID do roteiro."""
+        futuro: "Future[int]" = Future()
+        self._fila.put((roteiro, info_video, execucoes, futuro))
+        return futuro
+
+    def encerrar(self) -> None:
+        """Grava o que estiver pendente e termina a thread."""
+        self._fila.put(None)
+        self.join()
+
+    def run(self) -> None:
+        while (item := self._fila.get()) is not None:
+            roteiro, info_video, execucoes, futuro = item
+            try:
+                roteiro_id = utils.save_roteiro_sqlite(roteiro, self.db_path)
+                utils.save_info_video_sqlite(info_video, roteiro_id, self.db_path)
+                for execucao in execucoes:
+                    execucao.roteiro_id = roteiro_id
+                gravar_execucoes(self.db_path, execucoes)
+                utils.save_roteiro_json(roteiro)
+            except Exception as e:
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(roteiro_id)
+
+
+def executar_lote(
+        pedidos: List[Pedido],
+        processos: int = None,
+        cache_dir: str = None,
+        db_path: str = None,
+        nivel_log: str = None
+) -> List[ResultadoLote]:
+    """
+    Gera roteiro e informações de vídeo para cada pedido num pool de ``processos``
+    (padrão: número de CPUs). Devolve os resultados na ordem dos pedidos; falhas
+    ficam em ``ResultadoLote.erro`` sem interromper o lote.
+    """
+    cache_dir = cache_dir or str(diretorio_padrao())
+    resultados = [ResultadoLote(p) for p in pedidos]
+    escritor = EscritorSQLite(db_path)
+    escritor.start()
+    gravacoes: List[tuple[ResultadoLote, Future]] = []
+
+    def _concluido(resultado: ResultadoLote, futuro: Future) -> None:
+        try:
+            resultado.roteiro, resultado.info_video, execucoes = futuro.result()
+        except Exception as e:
+            resultado.erro = f"{type(e).__name__}: {e}"
+            logger.error("Falha no pedido '{}': {}", resultado.pedido.tema, resultado.erro)
+            return
+        gravacoes.append((resultado, escritor.enviar(resultado.roteiro, resultado.info_video, execucoes)))
+
+    logger.info("Iniciando lote de {} pedidos", len(pedidos))
+    # spawn: os workers não herdam threads nem conexões abertas do processo principal
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processos, mp_context=contexto, initializer=_inicializar_worker,
+                             initargs=(cache_dir, nivel_log)) as pool:
+        for resultado in resultados:
+            pool.submit(_gerar, resultado.pedido).add_done_callback(
+                lambda f, r=resultado: _concluido(r, f)
+            )
+    escritor.encerrar()
+
+    for resultado, futuro in gravacoes:
+        try:
+            resultado.roteiro_id = futuro.result()
+        except Exception as e:
+            resultado.erro = f"Erro ao gravar: {e}"
+            logger.error("Falha ao gravar '{}': {}", resultado.pedido.tema, e)
+    ok = sum(1 for r in resultados if r.erro is None)
+    logger.success("Lote concluído: {}/{} pedidos gerados", ok, len(resultados))
+    return resultados
+
+
+def carregar_pedidos(caminho: str) -> List[Pedido]:
+    pedidos = []
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                dados = json.loads(linha)
+                pedidos.append(Pedido(dados["tema"], TipoRoteiro(dados.get("tipo", TipoRoteiro.LONGO.value)),
+                                      dados.get("referencias", [])))
+    return pedidos
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(find_dotenv())
+    configurar_logging()
+
+    parser = argparse.ArgumentParser(description="Geração de roteiros em lote com um pool de processos")
+    parser.add_argument("pedidos", help="Arquivo JSONL com tema, tipo e referencias por linha")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--log-level", default=None, help="Nível de log dos workers (padrão: LOG_LEVEL ou INFO)")
+    parser.add_argument("--profile", action="store_true", help="Grava cProfile/tracemalloc de cada pedido em profiles/")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.ativar()
+    for r in executar_lote(carregar_pedidos(args.pedidos), args.processos, args.cache_dir, nivel_log=args.log_level):
+        print(f"{r.roteiro_id or '-':>6}  {r.pedido.tema}  {r.erro or ''}")
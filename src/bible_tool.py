@@ -1,19 +1,209 @@
+import asyncio
+import os
 import re
-from typing import Dict, Any, List, Optional
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterator
 
 import requests
 from agno.tools import Toolkit
 from bs4 import BeautifulSoup
 from loguru import logger
 
+from src.chapter_cache import ChapterCache, hash_html
+from src.logging_config import logger_amostrado
+
 BASE_URL = "https://www.bibliaonline.com.br/{translation}/{slug}/{chapter}"
 
 
+# Traduções de ``lookup_verse_translations`` quando o agente não escolhe; com mais de uma a ferramenta é registrada
+TRADUCOES = [t.strip().lower() for t in os.environ.get("BIBLE_TRADUCOES", "ntlh").split(",") if t.strip()] or ["ntlh"]
+# Downloads simultâneos de uma consulta em várias traduções
+_MAX_DOWNLOADS_TRADUCOES = 4
+
+
+def _env_numero(nome: str, tipo: Callable = float) -> Optional[Any]:
+    valor = os.environ.get(nome)
+    return tipo(valor) if valor else None
+
+
+class SingleFlight:
+    """
+    Deduplicação de chamadas em voo por chave: o primeiro chamador executa a função e
+    os concorrentes com a mesma chave esperam o mesmo resultado (ou exceção).
+    Funciona entre threads (``do``) e entre corrotinas de um mesmo event loop (``ado``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_voo: Dict[str, Future] = {}
+        self._em_voo_async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = \
+            weakref.WeakKeyDictionary()
+        self.execucoes = 0
+
+    def do(self, chave: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            futuro = self._em_voo.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = self._em_voo[chave] = Future()
+                self.execucoes += 1
+        if not lider:
+            return futuro.result()
+        try:
+            resultado = fn()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                self._em_voo.pop(chave, None)
+
+    async def ado(self, chave: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        em_voo = self._em_voo_async.setdefault(loop, {})
+        tarefa = em_voo.get(chave)
+        if tarefa is None:
+            tarefa = em_voo[chave] = loop.create_task(fn())
+            tarefa.add_done_callback(lambda _: em_voo.pop(chave, None))
+        # shield: o cancelamento de um chamador não cancela a busca dos demais
+        return await asyncio.shield(tarefa)
+
+
+class CircuitoAberto(requests.exceptions.ConnectionError):
+    """A Bíblia Online falhou seguidamente e não está sendo consultada por enquanto."""
+
+
+class Disjuntor:
+    """
+    Circuit breaker do backend: abre após ``falhas_para_abrir`` falhas seguidas (timeout,
+    conexão, 5xx) e, durante ``segundos_aberto``, recusa na hora com ``CircuitoAberto`` em vez
+    de esperar o timeout. Depois disso deixa passar uma tentativa: sucesso fecha, falha reabre.
+    Respostas 4xx mostram que o site está no ar e contam como sucesso.
+    """
+
+    def __init__(self, falhas_para_abrir: int = 5, segundos_aberto: float = 60.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.segundos_aberto = segundos_aberto
+        self.relogio = relogio
+        self._lock = threading.Lock()
+        self.resetar()
+
+    def resetar(self) -> None:
+        self.falhas = 0
+        self._aberto_ate: Optional[float] = None
+        self._testando = False
+
+    @property
+    def aberto(self) -> bool:
+        return self._aberto_ate is not None
+
+    def _permitir(self) -> bool:
+        with self._lock:
+            if self._aberto_ate is None:
+                return True
+            if self.relogio() >= self._aberto_ate and not self._testando:
+                self._testando = True  # meio-aberto: uma única tentativa
+                return True
+            return False
+
+    def _registrar(self, falhou: Optional[bool]) -> None:
+        """``falhou`` None (erro que não é de rede) só libera a tentativa meio-aberta."""
+        with self._lock:
+            self._testando = False
+            if falhou is None:
+                return
+            if not falhou:
+                if self._aberto_ate is not None:
+                    logger.info("Bíblia Online respondeu; disjuntor fechado")
+                self.resetar()
+                return
+            self.falhas += 1
+            if self._aberto_ate is not None or self.falhas >= self.falhas_para_abrir:
+                self._aberto_ate = self.relogio() + self.segundos_aberto
+                logger.warning("Bíblia Online com {} falhas seguidas; disjuntor aberto por {:.0f}s",
+                               self.falhas, self.segundos_aberto)
+
+    @staticmethod
+    def _e_falha_do_backend(e: requests.exceptions.RequestException) -> bool:
+        resposta = getattr(e, "response", None)
+        return resposta is None or resposta.status_code >= 500
+
+    def chamar(self, fn: Callable[[], Any]) -> Any:
+        if not self._permitir():
+            raise CircuitoAberto("Bíblia Online indisponível (disjuntor aberto)")
+        falhou = None
+        try:
+            resultado = fn()
+            falhou = False
+            return resultado
+        except requests.exceptions.RequestException as e:
+            falhou = self._e_falha_do_backend(e)
+            raise
+        finally:
+            # Qualquer saída, inclusive exceções inesperadas, libera a tentativa meio-aberta
+            self._registrar(falhou)
+
+
+@dataclass
+class OrcamentoConsultas:
+    """Limites de ``lookup_verse`` numa execução do agente; None não limita."""
+    max_chamadas: Optional[int] = None
+    max_segundos: Optional[float] = None
+    chamadas: int = 0
+    segundos: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def esgotado(self) -> Optional[str]:
+        if self.max_chamadas is not None and self.chamadas >= self.max_chamadas:
+            return f"{self.chamadas} consultas"
+        if self.max_segundos is not None and self.segundos >= self.max_segundos:
+            return f"{self.segundos:.0f}s em consultas"
+        return None
+
+    def reservar(self) -> bool:
+        """Conta a consulta antes de fazê-la, para chamadas simultâneas não passarem juntas do limite."""
+        with self._lock:
+            if self.esgotado():
+                return False
+            self.chamadas += 1
+            return True
+
+    def gastar(self, segundos: float) -> None:
+        with self._lock:
+            self.segundos += segundos
+
+
+# Orçamento da execução corrente (por thread/tarefa); a ferramenta é compartilhada entre agentes
+_orcamento: ContextVar[Optional[OrcamentoConsultas]] = ContextVar("orcamento_consultas", default=None)
+
+
+@dataclass
+class Pagina:
+    """Resposta de um download; ``html`` None é um 304 (a cópia em cache continua valendo)."""
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
 class BibleLookupTool(Toolkit):
     """
-    Busca versículos reais na Bíblia Online (NTLH).
+    Busca versículos reais na Bíblia Online (NTLH por padrão; outras traduções pelo slug, ex.: 'ara', 'nvi').
     Aceita referência no formato: 'rm 5', 'rm 5:3', 'rm 5:3-5'.
     Limitação: intervalo deve estar no MESMO capítulo.
+
+    Args:
+        traducoes: Traduções de ``lookup_verse_translations`` (padrão: ``BIBLE_TRADUCOES``). Com mais
+            de uma, essa ferramenta também é oferecida ao agente.
     """
 
     BOOK_ABBREVIATIONS: Dict[str, str] = {
@@ -38,10 +228,21 @@ class BibleLookupTool(Toolkit):
         "2jo": "2 João", "3jo": "3 João", "jd": "Judas", "ap": "Apocalipse"
     }
 
-    def __init__(self, **kwargs):
+    _single_flight = SingleFlight()
+    # Cache em disco compartilhado entre processos; desligado a menos que configurado
+    _cache: Optional[ChapterCache] = ChapterCache(os.environ["BIBLE_CACHE_DIR"]) \
+        if os.environ.get("BIBLE_CACHE_DIR") else None
+    _disjuntor = Disjuntor(_env_numero("BIBLE_DISJUNTOR_FALHAS", int) or 5,
+                           _env_numero("BIBLE_DISJUNTOR_SEGUNDOS") or 60.0)
+
+    def __init__(self, traducoes: List[str] = None, **kwargs):
+        self.traducoes = [t.strip().lower() for t in traducoes or [] if t.strip()] or list(TRADUCOES)
+        tools = [self.lookup_verse]
+        if len(self.traducoes) > 1:
+            tools.append(self.lookup_verse_translations)
         super().__init__(
             name="bible_lookup_tools",
-            tools=[self.lookup_verse],
+            tools=tools,
             **kwargs
         )
 
@@ -58,36 +259,179 @@ class BibleLookupTool(Toolkit):
             referencia (str): Referência bíblica no formato 'rm 5', 'rm 5:3', 'rm 5:3-5'.
             translation (str): Tradução da Bíblia (padrão: 'ntlh').
         """
-        logger.info(f"Recebida referência: '{referencia}' (tradução: {translation})")
+        return self._limitado(lambda: self._consultar(referencia, translation))
+
+    def lookup_verse_translations(
+            self,
+            referencia: str,
+            translations: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Retorna a mesma referência em várias traduções, para comparar ou citar lado a lado.
+
+        Args:
+            referencia (str): Referência bíblica no formato 'rm 5', 'rm 5:3', 'rm 5:3-5'.
+            translations (str): Traduções separadas por vírgula, ex.: 'ntlh,ara,nvi' (padrão: as configuradas).
+        """
+        traducoes = [t.strip().lower() for t in translations.split(",") if t.strip()] or self.traducoes
+        return self._limitado(lambda: self._consultar_traducoes(referencia, traducoes))
+
+    async def alookup_verse(
+            self,
+            referencia: str,
+            translation: str = "ntlh"
+    ) -> Dict[str, Any]:
+        """
+        Versão assíncrona de ``lookup_verse``. Buscas concorrentes do mesmo capítulo no
+        mesmo event loop compartilham um único download.
+        """
+        with self._no_orcamento() as esgotado:
+            return esgotado or await self._aconsultar(referencia, translation)
+
+    @classmethod
+    @contextmanager
+    def orcamento(cls, max_chamadas: int = None, max_segundos: float = None) -> Iterator[OrcamentoConsultas]:
+        """
+        Limita as consultas feitas dentro do bloco (uma execução do agente). Os limites
+        omitidos vêm de ``BIBLE_MAX_CONSULTAS`` e ``BIBLE_MAX_SEGUNDOS``; sem eles só conta.
+        """
+        orcamento = OrcamentoConsultas(
+            max_chamadas if max_chamadas is not None else _env_numero("BIBLE_MAX_CONSULTAS", int),
+            max_segundos if max_segundos is not None else _env_numero("BIBLE_MAX_SEGUNDOS"),
+        )
+        token = _orcamento.set(orcamento)
+        try:
+            yield orcamento
+        finally:
+            _orcamento.reset(token)
+            logger.debug("Consultas bíblicas da execução: {} em {:.1f}s", orcamento.chamadas, orcamento.segundos)
+
+    # ------------------------- Métodos privados ------------------------ #
+    def _limitado(self, consulta: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Executa a consulta contando-a no orçamento da execução, se houver um."""
+        with self._no_orcamento() as esgotado:
+            return esgotado or consulta()
+
+    @classmethod
+    @contextmanager
+    def _no_orcamento(cls) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Reserva uma consulta no orçamento da execução e soma o tempo dela ao sair. Produz
+        o erro a devolver ao agente quando o orçamento já acabou (None para seguir).
+        """
+        orcamento = _orcamento.get()
+        if orcamento is None:
+            yield None
+            return
+        if not orcamento.reservar():
+            yield cls._orcamento_esgotado(orcamento)
+            return
+        inicio = time.perf_counter()
+        try:
+            yield None
+        finally:
+            orcamento.gastar(time.perf_counter() - inicio)
+
+    @staticmethod
+    def _orcamento_esgotado(orcamento: OrcamentoConsultas) -> Dict[str, Any]:
+        logger.warning("Orçamento de consultas bíblicas esgotado ({})", orcamento.esgotado())
+        return {"error": f"Limite de consultas desta execução atingido ({orcamento.esgotado()}). "
+                         "Não faça novas consultas: conclua com os versículos já encontrados."}
+
+    def _consultar(self, referencia: str, translation: str) -> Dict[str, Any]:
+        logger_amostrado.info("Recebida referência: '{}' (tradução: {})", referencia, translation)
         try:
             livro, cap, v_ini, v_fim = self._parse_ref(referencia)
-            logger.debug(f"Referência parseada: livro={livro}, capítulo={cap}, v_ini={v_ini}, v_fim={v_fim}")
+            logger_amostrado.debug("Referência parseada: livro={}, capítulo={}, v_ini={}, v_fim={}",
+                                   livro, cap, v_ini, v_fim)
             url = BASE_URL.format(translation=translation, slug=livro, chapter=cap)
-            logger.info(f"GET {url}")
+            logger_amostrado.info("GET {}", url)
             try:
-                raw_html = self._download(url)
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro ao baixar página da bíblia: {e}")
-                return {"error": "Erro de rede ou API ao buscar versículo."}
+                capitulo = self._fetch_chapter(url)
+            except Exception as e:
+                return self._fetch_error(e)
+            return self._build_result(livro, cap, v_ini, v_fim, capitulo, translation)
+        except ValueError:
+            return {"error": "Formato inválido. Ex.: 'rm5', 'rm5:3', 'rm5:3-5'"}
+        except Exception as e:
+            logger.error("Erro inesperado: {}", e)
+            return {"error": "Erro inesperado ao buscar versículo."}
+
+    def _consultar_traducoes(self, referencia: str, traducoes: List[str]) -> Dict[str, Any]:
+        """
+        Analisa a referência uma vez e recorta o mesmo intervalo de versículos do capítulo de
+        cada tradução, baixados em paralelo (cada um com seu cache e seu single-flight).
+        """
+        logger_amostrado.info("Recebida referência: '{}' (traduções: {})", referencia, traducoes)
+        try:
+            livro, cap, v_ini, v_fim = self._parse_ref(referencia)
+        except ValueError:
+            return {"error": "Formato inválido. Ex.: 'rm5', 'rm5:3', 'rm5:3-5'"}
+        traducoes = list(dict.fromkeys(traducoes)) or self.traducoes
+
+        def buscar(traducao: str) -> tuple[str, Any]:
             try:
-                verses = self._extract_verses(raw_html, v_ini, v_fim)
-                logger.debug(f"Versículos extraídos: {len(verses)} encontrados")
+                return traducao, self._fetch_chapter(BASE_URL.format(translation=traducao, slug=livro, chapter=cap))
             except Exception as e:
-                logger.error(f"Erro ao extrair versículos: {e}")
-                return {"error": "Erro ao processar resposta da bíblia online."}
-            if not verses:
-                return {"error": "Versículo(s) não encontrado(s)."}
-            full_text = " ".join(v["text"] for v in verses)
-            ref_fmt = self._format_reference(livro, cap, v_ini, v_fim)
-            logger.info(f"Consulta finalizada: {ref_fmt}")
-            return {"reference": ref_fmt, "text": full_text, "verses": verses}
+                return traducao, e
+
+        with ThreadPoolExecutor(max_workers=min(len(traducoes), _MAX_DOWNLOADS_TRADUCOES)) as pool:
+            capitulos = dict(pool.map(buscar, traducoes))
+        return {
+            "reference": self._format_reference(livro, cap, v_ini, v_fim, None),
+            "translations": {
+                traducao: self._fetch_error(capitulo) if isinstance(capitulo, Exception)
+                else self._build_result(livro, cap, v_ini, v_fim, capitulo, traducao)
+                for traducao, capitulo in capitulos.items()
+            },
+        }
+
+    async def _aconsultar(self, referencia: str, translation: str) -> Dict[str, Any]:
+        logger_amostrado.info("Recebida referência: '{}' (tradução: {})", referencia, translation)
+        try:
+            livro, cap, v_ini, v_fim = self._parse_ref(referencia)
+            url = BASE_URL.format(translation=translation, slug=livro, chapter=cap)
+            try:
+                capitulo = await self._single_flight.ado(url, lambda: asyncio.to_thread(self._fetch_chapter, url))
+            except Exception as e:
+                return self._fetch_error(e)
+            return self._build_result(livro, cap, v_ini, v_fim, capitulo, translation)
         except ValueError:
             return {"error": "Formato inválido. Ex.: 'rm5', 'rm5:3', 'rm5:3-5'"}
         except Exception as e:
-            logger.error(f"Erro inesperado: {e}")
+            logger.error("Erro inesperado: {}", e)
             return {"error": "Erro inesperado ao buscar versículo."}
 
-    # ------------------------- Métodos privados ------------------------ #
+    def _build_result(
+            self,
+            livro: str,
+            cap: str,
+            v_ini: Optional[int],
+            v_fim: Optional[int],
+            capitulo: List[Dict[str, Any]],
+            translation: str = "ntlh"
+    ) -> Dict[str, Any]:
+        verses = self._filter_verses(capitulo, v_ini, v_fim)
+        logger_amostrado.debug("Versículos extraídos: {} encontrados", len(verses))
+        if not verses:
+            return {"error": "Versículo(s) não encontrado(s)."}
+        full_text = " ".join(v["text"] for v in verses)
+        ref_fmt = self._format_reference(livro, cap, v_ini, v_fim, translation)
+        logger_amostrado.info("Consulta finalizada: {}", ref_fmt)
+        return {"reference": ref_fmt, "text": full_text, "verses": verses}
+
+    @staticmethod
+    def _fetch_error(e: Exception) -> Dict[str, Any]:
+        if isinstance(e, CircuitoAberto):
+            logger.warning("Consulta recusada: {}", e)
+            return {"error": "Bíblia Online indisponível no momento. Não tente outras referências agora: "
+                             "conclua com os versículos já encontrados."}
+        if isinstance(e, requests.exceptions.RequestException):
+            logger.error("Erro ao baixar página da bíblia: {}", e)
+            return {"error": "Erro de rede ou API ao buscar versículo."}
+        logger.error("Erro ao extrair versículos: {}", e)
+        return {"error": "Erro ao processar resposta da bíblia online."}
+
     @classmethod
     def _parse_ref(cls, ref: str) -> tuple[str, str, Optional[int], Optional[int]]:
         """
@@ -97,18 +441,78 @@ class BibleLookupTool(Toolkit):
         s = ref.lower().replace(" ", "")
         m = re.fullmatch(r"([1-3]?[a-z]{1,3})([0-9]+)(?::([0-9]+)(?:-([0-9]+))?)?", s)
         if not m:
-            logger.warning(f"Formato inválido de referência: '{ref}'")
+            logger.warning("Formato inválido de referência: '{}'", ref)
             raise ValueError("Formato inválido. Ex.: 'rm5', 'rm5:3', 'rm5:3-5'")
         slug, chapter, v1, v2 = m.groups()
         return slug, chapter, int(v1) if v1 else None, int(v2) if v2 else None
 
     @classmethod
-    def _download(cls, url: str) -> str:
-        logger.debug(f"Baixando URL: {url}")
-        resp = requests.get(url, timeout=10)
+    def _fetch_chapter(cls, url: str) -> List[Dict[str, Any]]:
+        """
+        Baixa e extrai o capítulo inteiro. Chamadas concorrentes para a mesma URL
+        são coalescidas: só o primeiro chamador faz a requisição e o parsing.
+        """
+        return cls._single_flight.do(url, lambda: cls._load_chapter(url))
+
+    @classmethod
+    def usar_cache(cls, cache: Optional[ChapterCache]) -> None:
+        """Liga (ou desliga, com None) o cache em disco de capítulos."""
+        cls._cache = cache
+
+    @classmethod
+    def _load_chapter(cls, url: str) -> List[Dict[str, Any]]:
+        if cls._cache is None:
+            return cls._extract_verses(cls._disjuntor.chamar(lambda: cls._download_condicional(url)).html, None, None)
+
+        entrada = cls._cache.entrada(url)
+        if entrada is None:
+            pagina = cls._disjuntor.chamar(lambda: cls._download_condicional(url))
+        elif not cls._cache.vencida(entrada):
+            logger.debug("Capítulo em cache: {}", url)
+            return entrada["verses"]
+        else:
+            try:
+                pagina = cls._disjuntor.chamar(
+                    lambda: cls._download_condicional(url, entrada.get("etag"), entrada.get("last_modified")))
+            except requests.exceptions.RequestException as e:
+                logger.warning("Revalidação de {} falhou ({}); usando a cópia em cache", url, e)
+                return entrada["verses"]
+
+        if pagina.html is None:
+            logger.debug("Capítulo não modificado (304): {}", url)
+            cls._cache.renovar(url, entrada, pagina.etag, pagina.last_modified)
+            return entrada["verses"]
+        hash_pagina = hash_html(pagina.html)
+        if entrada is not None and entrada.get("hash") == hash_pagina:
+            # O servidor reenviou a mesma página (sem suporte a validadores): não extrai de novo
+            logger.debug("Capítulo com HTML igual ao do cache: {}", url)
+            cls._cache.renovar(url, entrada, pagina.etag, pagina.last_modified)
+            return entrada["verses"]
+        capitulo = cls._extract_verses(pagina.html, None, None)
+        if capitulo:
+            cls._cache.put(url, capitulo, hash_pagina, pagina.etag, pagina.last_modified)
+        return capitulo
+
+    @classmethod
+    def _download_condicional(cls, url: str, etag: str = None, last_modified: str = None) -> Pagina:
+        """
+        GET do capítulo, com ``If-None-Match`` / ``If-Modified-Since`` quando houver validadores
+        (revalidação de uma entrada vencida); devolve o ``ETag`` e o ``Last-Modified`` da resposta
+        para o cache guardá-los já no primeiro download.
+        """
+        cabecalhos = {}
+        if etag:
+            cabecalhos["If-None-Match"] = etag
+        if last_modified:
+            cabecalhos["If-Modified-Since"] = last_modified
+        logger.debug("Baixando URL: {} {}", url, cabecalhos)
+        resp = requests.get(url, timeout=10, headers=cabecalhos or None)
+        if resp.status_code == 304:
+            return Pagina(None, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
         resp.raise_for_status()
-        logger.debug(f"Download concluído: {len(resp.text)} caracteres recebidos")
-        return resp.text
+        texto = resp.text
+        logger.debug("Download concluído: {} caracteres recebidos", len(texto))
+        return Pagina(texto, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
 
     @classmethod
     def _extract_verses(
@@ -120,15 +524,15 @@ class BibleLookupTool(Toolkit):
         """
         Coleta pares (nº, texto). Se v_start for None, devolve capítulo inteiro.
         """
-        logger.debug(f"Extraindo versículos: v_start={v_start}, v_end={v_end}")
+        logger_amostrado.debug("Extraindo versículos: v_start={}, v_end={}", v_start, v_end)
         soup = BeautifulSoup(html, "html.parser")
         spans = soup.find_all("span")
 
         result, current_num, current_text = [], None, []
         for sp in spans:
-            cls = sp.get("class", [])
+            classes = sp.get("class", [])
             # Número do versículo
-            if "v" in cls and sp.get_text(strip=True).isdigit():
+            if "v" in classes and sp.get_text(strip=True).isdigit():
                 if current_num is not None:
                     result.append(
                         {"number": current_num, "text": " ".join(current_text).strip()}
@@ -136,7 +540,7 @@ class BibleLookupTool(Toolkit):
                 current_num = int(sp.get_text(strip=True))
                 current_text = []
             # Texto do versículo
-            elif "t" in cls:
+            elif "t" in classes:
                 current_text.append(sp.get_text(strip=True))
 
         # adiciona o último verso
@@ -145,15 +549,26 @@ class BibleLookupTool(Toolkit):
                 {"number": current_num, "text": " ".join(current_text).strip()}
             )
 
-        # Filtro por intervalo
+        return cls._filter_verses(result, v_start, v_end)
+
+    @staticmethod
+    def _filter_verses(
+            verses: List[Dict[str, Any]],
+            v_start: Optional[int],
+            v_end: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Filtra o intervalo pedido. Devolve cópias, pois o capítulo pode ser compartilhado
+        entre chamadas concorrentes.
+        """
         if v_start is None:
-            logger.debug(f"Retornando capítulo inteiro: {len(result)} versículos")
-            return result
+            logger_amostrado.debug("Retornando capítulo inteiro: {} versículos", len(verses))
+            return [dict(v) for v in verses]
         v_end = v_end or v_start
         if v_end < v_start:
             v_start, v_end = v_end, v_start
-        filtrados = [v for v in result if v_start <= v["number"] <= v_end]
-        logger.debug(f"Versículos filtrados: {len(filtrados)} retornados")
+        filtrados = [dict(v) for v in verses if v_start <= v["number"] <= v_end]
+        logger_amostrado.debug("Versículos filtrados: {} retornados", len(filtrados))
         return filtrados
 
     def _format_reference(
@@ -161,11 +576,14 @@ class BibleLookupTool(Toolkit):
             slug: str,
             cap: str,
             v_start: Optional[int],
-            v_end: Optional[int]
+            v_end: Optional[int],
+            translation: Optional[str] = "ntlh"
     ) -> str:
         livro = self.BOOK_ABBREVIATIONS.get(slug, slug.upper())
         if v_start is None:
-            return f"{livro} {cap} (NTLH)"
-        if v_end and v_end != v_start:
-            return f"{livro} {cap}:{v_start}-{v_end} (NTLH)"
-        return f"{livro} {cap}:{v_start} (NTLH)"
+            referencia = f"{livro} {cap}"
+        elif v_end and v_end != v_start:
+            referencia = f"{livro} {cap}:{v_start}-{v_end}"
+        else:
+            referencia = f"{livro} {cap}:{v_start}"
+        return f"{referencia} ({translation.upper()})" if translation else referencia
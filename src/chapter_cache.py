@@ -0,0 +1,103 @@
+"""
+Cache em disco dos capítulos já baixados e extraídos da Bíblia Online.
+
+Um arquivo JSON por URL, gravado de forma atômica (arquivo temporário + ``os.replace``),
+de modo que vários processos podem ler e escrever o mesmo diretório sem trava: no pior
+caso dois processos baixam o mesmo capítulo e um sobrescreve o outro com o mesmo conteúdo.
+
+Com ``ttl`` (ou ``BIBLE_CACHE_TTL``, em segundos), uma entrada mais velha que isso fica
+vencida e é revalidada com uma requisição condicional (``If-None-Match`` /
+``If-Modified-Since``, pelo ``etag`` e ``last_modified`` guardados). Cada entrada guarda
+também o hash do HTML de origem, para que uma página reenviada sem mudanças não seja
+extraída de novo. Sem ``ttl`` as entradas nunca vencem.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src import utils
+
+
+def diretorio_padrao() -> Path:
+    """``cache/capitulos`` ao lado do banco: o do modo em lote e o da validação sem ``BIBLE_CACHE_DIR``."""
+    return Path(utils.DB_PATH).parent / "cache" / "capitulos"
+
+
+def hash_html(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class ChapterCache:
+    """
+    Args:
+        diretorio: Pasta dos arquivos de cache (criada se não existir).
+        ttl: Segundos até uma entrada precisar de revalidação (padrão: ``BIBLE_CACHE_TTL``; None não vence).
+    """
+
+    def __init__(self, diretorio: str | Path, ttl: Optional[float] = None):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl if ttl is not None else (float(os.environ.get("BIBLE_CACHE_TTL") or 0) or None)
+
+    def _caminho(self, url: str) -> Path:
+        return self.diretorio / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def entrada(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        A entrada inteira: ``verses``, ``hash``, ``etag``, ``last_modified`` e ``validado_em``.
+        Entradas gravadas antes da revalidação usam a data do arquivo como ``validado_em``.
+        """
+        caminho = self._caminho(url)
+        try:
+            with caminho.open(encoding="utf-8") as f:
+                dados = json.load(f)
+            dados.setdefault("validado_em", caminho.stat().st_mtime)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Cache de capítulo ilegível para {}: {}", url, e)
+            return None
+        return dados
+
+    def vencida(self, entrada: Dict[str, Any]) -> bool:
+        return self.ttl is not None and time.time() - entrada["validado_em"] > self.ttl
+
+    def get(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """Versículos em cache, vencidos ou não."""
+        dados = self.entrada(url)
+        if dados is None:
+            return None
+        logger.debug("Capítulo em cache: {}", url)
+        return dados["verses"]
+
+    def put(
+            self,
+            url: str,
+            verses: List[Dict[str, Any]],
+            hash_pagina: str = None,
+            etag: str = None,
+            last_modified: str = None
+    ) -> None:
+        self._gravar(url, {"url": url, "verses": verses, "hash": hash_pagina, "etag": etag,
+                           "last_modified": last_modified, "validado_em": time.time()})
+
+    def renovar(self, url: str, entrada: Dict[str, Any], etag: str = None, last_modified: str = None) -> None:
+        """Marca a entrada como validada agora (resposta 304 ou HTML igual), sem tocar nos versículos."""
+        self.put(url, entrada["verses"], entrada.get("hash"), etag or entrada.get("etag"),
+                 last_modified or entrada.get("last_modified"))
+
+    def _gravar(self, url: str, dados: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(tmp, self._caminho(url))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,293 @@
+"""
+Exportação em massa de ``roteiros_biblicos`` + ``info_videos_youtube``.
+
+Lê as duas tabelas juntas (a informação de vídeo mais recente de cada roteiro) em
+lotes por ``id`` e grava, sem carregar tudo na memória:
+
+- JSONL comprimido (``.jsonl.gz``), um roteiro por linha, com as listas decodificadas;
+- formato colunar: Parquet se o ``pyarrow`` estiver instalado, senão CSV comprimido.
+
+A exportação é incremental: o último ``id`` de roteiro e o último ``id`` de
+``info_videos_youtube`` exportados ficam em ``_watermark.json`` no diretório de destino.
+A próxima execução lê os roteiros novos e também reemite os antigos cujas informações de
+vídeo chegaram depois (o normal com a fila de jobs, que grava os detalhes mais tarde);
+quem consome os arquivos fica com a linha mais recente de cada ``id``. A marca só avança
+depois que os arquivos foram gravados por completo. O banco de origem é aberto só para leitura.
+
+    python -m src.export exports/             # incremental
+    python -m src.export exports/ --completo  # ignora a marca e exporta tudo
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from src import utils
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependência opcional
+    pa = pq = None
+
+COLUNAS = ("id", "tema", "data_criacao", "tipo", "roteiro", "versiculos_utilizados", "referencias",
+           "postagem_comunidade", "titulo", "descricao", "tags", "hashtags", "thumbnail_prompt")
+COLUNAS_LISTA = ("versiculos_utilizados", "referencias", "tags", "hashtags")
+ARQUIVO_WATERMARK = "_watermark.json"
+
+_SQL_LOTE = '''
+    SELECT r.id, r.tema, r.data_criacao, r.tipo, r.roteiro, r.versiculos_utilizados, r.referencias,
+           r.postagem_comunidade, v.titulo, v.descricao, v.tags, v.hashtags, v.thumbnail_prompt
+    FROM roteiros_biblicos r
+             LEFT JOIN info_videos_youtube v
+                       ON v.id = (SELECT MAX(id) FROM info_videos_youtube WHERE roteiro_id = r.id)
+    WHERE r.id > ?
+      AND (r.id > ? OR r.id IN (SELECT roteiro_id FROM info_videos_youtube WHERE id > ?))
+    ORDER BY r.id
+    LIMIT ?
+'''
+# Banco sem nenhuma informação de vídeo gravada ainda
+_SQL_LOTE_SEM_VIDEOS = '''
+    SELECT id, tema, data_criacao, tipo, roteiro, versiculos_utilizados, referencias, postagem_comunidade,
+           NULL, NULL, NULL, NULL, NULL
+    FROM roteiros_biblicos
+    WHERE id > ?
+    ORDER BY id
+    LIMIT ?
+'''
+MARCA_INICIAL = {"id": 0, "video_id": 0}
+
+
+@dataclass
+class ResultadoExportacao:
+    linhas: int = 0
+    arquivos: List[Path] = field(default_factory=list)
+    watermark: Dict[str, Any] = field(default_factory=dict)
+
+
+def _lista(coluna: str, valor: Optional[str]) -> List[str]:
+    if not valor:
+        return []
+    if coluna in ("tags", "hashtags"):
+        return valor.split(", ")
+    return json.loads(valor)
+
+
+def ler_watermark(destino: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((Path(destino) / ARQUIVO_WATERMARK).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return dict(MARCA_INICIAL)
+
+
+def _gravar_watermark(destino: Path, watermark: Dict[str, Any]) -> None:
+    tmp = Path(destino) / f"{ARQUIVO_WATERMARK}.tmp"
+    tmp.write_text(json.dumps(watermark, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, Path(destino) / ARQUIVO_WATERMARK)
+
+
+def _conectar_leitura(db_path: str = None) -> Optional[sqlite3.Connection]:
+    """Conexão só de leitura ao banco de origem, ou None se ele ainda não tem roteiros."""
+    caminho = Path(db_path or utils.DB_PATH)
+    if not caminho.exists():
+        return None
+    conn = sqlite3.connect(f"{caminho.resolve().as_uri()}?mode=ro", uri=True)
+    if utils.tabela_existe(conn, "roteiros_biblicos"):
+        return conn
+    conn.close()
+    return None
+
+
+def _ultimo_video_id(conn: sqlite3.Connection) -> int:
+    if not utils.tabela_existe(conn, "info_videos_youtube"):
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM info_videos_youtube").fetchone()[0]
+
+
+def ultimo_video_id(db_path: str = None) -> int:
+    conn = _conectar_leitura(db_path)
+    if conn is None:
+        return 0
+    try:
+        return _ultimo_video_id(conn)
+    finally:
+        conn.close()
+
+
+def iter_lotes(desde_id: int = 0, tamanho_lote: int = 1000, db_path: str = None,
+               desde_video_id: int = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lotes de linhas (roteiro + vídeo) com ``id > desde_id``, listas já decodificadas. Com
+    ``desde_video_id``, inclui também os roteiros anteriores com vídeo de ``id`` maior que ele.
+    """
+    conn = _conectar_leitura(db_path)
+    if conn is None:
+        return
+    try:
+        ultimo_id = desde_id
+        tem_videos = utils.tabela_existe(conn, "info_videos_youtube")
+        if desde_video_id is None:
+            desde_video_id = _ultimo_video_id(conn)
+        elif tem_videos:
+            # Começa antes do primeiro roteiro a reemitir; a condição do SQL filtra o resto
+            primeiro, = conn.execute("SELECT MIN(roteiro_id) FROM info_videos_youtube WHERE id > ?",
+                                     (desde_video_id,)).fetchone()
+            if primeiro is not None:
+                ultimo_id = min(ultimo_id, primeiro - 1)
+        while True:
+            if tem_videos:
+                linhas = conn.execute(_SQL_LOTE, (ultimo_id, desde_id, desde_video_id, tamanho_lote)).fetchall()
+            else:
+                linhas = conn.execute(_SQL_LOTE_SEM_VIDEOS, (ultimo_id, tamanho_lote)).fetchall()
+            if not linhas:
+                return
+            lote = []
+            for linha in linhas:
+                registro = dict(zip(COLUNAS, linha))
+                for coluna in COLUNAS_LISTA:
+                    registro[coluna] = _lista(coluna, registro[coluna])
+                lote.append(registro)
+            yield lote
+            if len(linhas) < tamanho_lote:
+                return
+            ultimo_id = linhas[-1][0]
+    finally:
+        conn.close()
+
+
+class _EscritorJsonl:
+    extensao = ".jsonl.gz"
+
+    def __init__(self, caminho: Path):
+        self.arquivo = gzip.open(caminho, "wt", encoding="utf-8")
+
+    def escrever(self, lote: List[Dict[str, Any]]) -> None:
+        self.arquivo.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in lote)
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+class _EscritorParquet:
+    extensao = ".parquet"
+
+    def __init__(self, caminho: Path):
+        self.schema = pa.schema([
+            (c, pa.int64() if c == "id" else pa.list_(pa.string()) if c in COLUNAS_LISTA else pa.string())
+            for c in COLUNAS
+        ])
+        self.escritor = pq.ParquetWriter(str(caminho), self.schema, compression="zstd")
+
+    def escrever(self, lote: List[Dict[str, Any]]) -> None:
+        # Cada lote vira um row group
+        self.escritor.write_table(pa.Table.from_pylist(lote, schema=self.schema))
+
+    def fechar(self) -> None:
+        self.escritor.close()
+
+
+class _EscritorCsv:
+    extensao = ".csv.gz"
+
+    def __init__(self, caminho: Path):
+        self.arquivo = gzip.open(caminho, "wt", encoding="utf-8", newline="")
+        self.escritor = csv.DictWriter(self.arquivo, fieldnames=COLUNAS)
+        self.escritor.writeheader()
+
+    def escrever(self, lote: List[Dict[str, Any]]) -> None:
+        self.escritor.writerows(
+            {c: json.dumps(r[c], ensure_ascii=False) if c in COLUNAS_LISTA else r[c] for c in COLUNAS} for r in lote
+        )
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+def exportar(
+        destino: str | Path,
+        formatos: tuple[str, ...] = ("jsonl", "colunar"),
+        tamanho_lote: int = 1000,
+        incremental: bool = True,
+        db_path: str = None
+) -> ResultadoExportacao:
+    """
+    Exporta os roteiros novos (ou todos, com ``incremental=False``) para ``destino``.
+
+    Args:
+        formatos: ``jsonl`` e/ou ``colunar`` (Parquet, ou CSV comprimido sem ``pyarrow``).
+        tamanho_lote: Linhas lidas e gravadas por vez.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    marca = {**MARCA_INICIAL, **ler_watermark(destino)} if incremental else dict(MARCA_INICIAL)
+    resultado = ResultadoExportacao(watermark=marca)
+    # Lido antes dos lotes: um vídeo gravado no meio da exportação é reemitido na próxima
+    ate_video_id = ultimo_video_id(db_path)
+
+    classes = []
+    for formato in formatos:
+        if formato == "jsonl":
+            classes.append(_EscritorJsonl)
+        elif formato == "colunar":
+            classes.append(_EscritorParquet if pq is not None else _EscritorCsv)
+        else:
+            raise ValueError(f"Formato inválido: {formato}. Use 'jsonl' e/ou 'colunar'")
+
+    base = f"roteiros_{datetime.now().strftime('%Y%m%dT%H%M%S')}_desde_{marca['id']}"
+    temporarios = [destino / f"{base}{c.extensao}.tmp" for c in classes]
+    escritores = []
+    try:
+        for classe, tmp in zip(classes, temporarios):
+            escritores.append(classe(tmp))
+        ultimo = None
+        for lote in iter_lotes(marca["id"], tamanho_lote, db_path, marca["video_id"]):
+            for escritor in escritores:
+                escritor.escrever(lote)
+            resultado.linhas += len(lote)
+            ultimo = lote[-1]
+        for escritor in escritores:
+            escritor.fechar()
+        escritores = []
+    except BaseException:
+        for escritor in escritores:
+            escritor.fechar()
+        for tmp in temporarios:
+            tmp.unlink(missing_ok=True)
+        raise
+
+    if ultimo is None:
+        for tmp in temporarios:
+            tmp.unlink(missing_ok=True)
+        logger.info("Nada novo para exportar desde o id {}", marca["id"])
+        return resultado
+
+    for tmp in temporarios:
+        final = tmp.with_suffix("")
+        os.replace(tmp, final)
+        resultado.arquivos.append(final)
+    resultado.watermark = {"id": max(marca["id"], ultimo["id"]), "video_id": max(marca["video_id"], ate_video_id)}
+    _gravar_watermark(destino, resultado.watermark)
+    logger.success("{} roteiros exportados para {} (até o id {})", resultado.linhas, destino, ultimo["id"])
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta roteiros e informações de vídeo")
+    parser.add_argument("destino")
+    parser.add_argument("--formato", action="append", choices=["jsonl", "colunar"], default=None)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    parser.add_argument("--completo", action="store_true", help="Ignora a marca d'água e exporta tudo")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+    r = exportar(args.destino, tuple(args.formato or ("jsonl", "colunar")), args.tamanho_lote,
+                 not args.completo, args.db)
+    for arquivo in r.arquivos:
+        print(arquivo)
@@ -0,0 +1,369 @@
+"""
+Fila de jobs de geração persistida no SQLite (tabela ``jobs`` em ``roteiros.sqlite3``).
+
+Cada job pede um roteiro (tema, tipo, referências) e as informações do vídeo. Workers
+reservam jobs com um lease (tempo de visibilidade): se o processo morrer no meio, o lease
+expira e outro worker retoma o job. Falhas voltam para a fila com backoff exponencial até
+``max_tentativas``; depois disso o job fica ``morto`` para inspeção. Reenfileirar o mesmo
+pedido (mesma chave de idempotência) devolve o job existente.
+
+    python -m src.job_queue enfileirar "Esperança" --tipo Short --referencia "Romanos 8:28"
+    python -m src.job_queue worker --concorrencia 4
+    python -m src.job_queue status
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src import profiling, utils
+from src.logging_config import configurar_logging
+from src.models import TipoRoteiro
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+MORTO = "morto"
+
+CREATE_TABLE_JOBS = '''
+    CREATE TABLE IF NOT EXISTS jobs
+    (
+        id                 INTEGER PRIMARY KEY AUTOINCREMENT,
+        chave_idempotencia TEXT UNIQUE,
+        tema               TEXT,
+        tipo               TEXT,
+        referencias        TEXT,
+        status             TEXT,
+        tentativas         INTEGER DEFAULT 0,
+        max_tentativas     INTEGER,
+        disponivel_em      REAL,
+        lease_ate          REAL,
+        worker             TEXT,
+        roteiro_id         INTEGER,
+        erro               TEXT,
+        criado_em          TEXT,
+        atualizado_em      TEXT,
+        FOREIGN KEY (roteiro_id) REFERENCES roteiros_biblicos (id)
+    )
+'''
+
+
+@dataclass
+class Job:
+    id: int
+    tema: str
+    tipo: TipoRoteiro
+    referencias: List[str] = field(default_factory=list)
+    tentativas: int = 0
+    max_tentativas: int = 5
+    worker: Optional[str] = None
+    roteiro_id: Optional[int] = None
+
+
+def chave_padrao(tema: str, tipo: TipoRoteiro, referencias: List[str]) -> str:
+    """Chave de idempotência derivada do próprio pedido."""
+    conteudo = json.dumps([tema, TipoRoteiro(tipo).value, sorted(referencias)], ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class FilaJobs:
+    """
+    Operações da fila. Cada operação abre sua própria conexão, então a mesma instância
+    pode ser usada por várias threads; processos diferentes se coordenam pelo
+    ``BEGIN IMMEDIATE`` do SQLite. A fila fica no mesmo banco em que as gerações gravam
+    (``utils.DB_PATH``, resolvido a cada operação), junto dos roteiros a que os jobs apontam.
+
+    Args:
+        backoff_base: Espera, em segundos, antes da primeira nova tentativa.
+        backoff_max: Teto da espera entre tentativas.
+    """
+
+    def __init__(self, backoff_base: float = 30.0, backoff_max: float = 1800.0):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(utils.DB_PATH), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(CREATE_TABLE_JOBS)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, disponivel_em)")
+        return conn
+
+    def enfileirar(
+            self,
+            tema: str,
+            tipo: TipoRoteiro = TipoRoteiro.LONGO,
+            referencias: List[str] = None,
+            chave: str = None,
+            max_tentativas: int = 5
+    ) -> int:
+        """Enfileira um pedido e devolve o ID do job (o já existente, se a chave se repetir)."""
+        referencias = referencias or []
+        chave = chave or chave_padrao(tema, tipo, referencias)
+        agora = datetime.now().isoformat()
+        conn = self._conectar()
+        try:
+            cur = conn.execute('''
+                INSERT OR IGNORE INTO jobs (chave_idempotencia, tema, tipo, referencias, status, max_tentativas,
+                                            disponivel_em, criado_em, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (chave, tema, TipoRoteiro(tipo).value, json.dumps(referencias, ensure_ascii=False), PENDENTE,
+                      max_tentativas, time.time(), agora, agora))
+            if cur.rowcount:
+                logger.info("Job {} enfileirado: tema='{}', tipo='{}'", cur.lastrowid, tema, TipoRoteiro(tipo).value)
+                return cur.lastrowid
+            job_id = conn.execute("SELECT id FROM jobs WHERE chave_idempotencia = ?", (chave,)).fetchone()["id"]
+            logger.info("Pedido já enfileirado como job {}", job_id)
+            return job_id
+        finally:
+            conn.close()
+
+    def reservar(self, worker: str, visibilidade: float = 900.0) -> Optional[Job]:
+        """
+        Reserva o próximo job disponível por ``visibilidade`` segundos. Jobs cujo lease
+        expirou voltam a ser elegíveis; se já esgotaram as tentativas, vão para ``morto``.
+        """
+        conn = self._conectar()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            agora = time.time()
+            conn.execute('''
+                UPDATE jobs SET status = ?, erro = 'lease expirado', lease_ate = NULL, atualizado_em = ?
+                WHERE status = ? AND lease_ate < ? AND tentativas >= max_tentativas
+                ''', (MORTO, datetime.now().isoformat(), EXECUTANDO, agora))
+            row = conn.execute('''
+                SELECT * FROM jobs
+                WHERE (status = ? AND disponivel_em <= ?) OR (status = ? AND lease_ate < ?)
+                ORDER BY disponivel_em, id
+                LIMIT 1
+                ''', (PENDENTE, agora, EXECUTANDO, agora)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute('''
+                UPDATE jobs SET status = ?, tentativas = tentativas + 1, lease_ate = ?, worker = ?, atualizado_em = ?
+                WHERE id = ?
+                ''', (EXECUTANDO, agora + visibilidade, worker, datetime.now().isoformat(), row["id"]))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return Job(
+            id=row["id"],
+            tema=row["tema"],
+            tipo=TipoRoteiro(row["tipo"]),
+            referencias=json.loads(row["referencias"] or "[]"),
+            tentativas=row["tentativas"] + 1,
+            max_tentativas=row["max_tentativas"],
+            worker=worker,
+            roteiro_id=row["roteiro_id"],
+        )
+
+    def _atualizar_lease(self, job: Job, sql: str, params: tuple) -> bool:
+        """Executa ``sql`` só se o lease ainda for deste worker e desta tentativa."""
+        conn = self._conectar()
+        try:
+            cur = conn.execute(f"{sql}, atualizado_em = ? WHERE id = ? AND status = ? AND worker = ? AND tentativas = ?",
+                               params + (datetime.now().isoformat(), job.id, EXECUTANDO, job.worker, job.tentativas))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def renovar(self, job: Job, visibilidade: float = 900.0) -> bool:
+        """Estende o lease de um job em execução. False se o lease já foi perdido."""
+        return self._atualizar_lease(job, "UPDATE jobs SET lease_ate = ?", (time.time() + visibilidade,))
+
+    def registrar_roteiro(self, job: Job, roteiro_id: int) -> bool:
+        """Marca a primeira etapa como feita, para que uma nova tentativa não gere outro roteiro."""
+        job.roteiro_id = roteiro_id
+        return self._atualizar_lease(job, "UPDATE jobs SET roteiro_id = ?", (roteiro_id,))
+
+    def concluir(self, job: Job) -> bool:
+        ok = self._atualizar_lease(job, "UPDATE jobs SET status = ?, lease_ate = NULL, erro = NULL", (CONCLUIDO,))
+        if not ok:
+            logger.warning("Job {}: lease perdido antes da conclusão", job.id)
+        return ok
+
+    def falhar(self, job: Job, erro: str) -> str:
+        """Devolve o job à fila com backoff ou o marca como morto. Retorna o novo status."""
+        if job.tentativas >= job.max_tentativas:
+            self._atualizar_lease(job, "UPDATE jobs SET status = ?, lease_ate = NULL, erro = ?", (MORTO, erro))
+            logger.error("Job {} morto após {} tentativas: {}", job.id, job.tentativas, erro)
+            return MORTO
+        espera = min(self.backoff_base * 2 ** (job.tentativas - 1), self.backoff_max) * random.uniform(0.5, 1.0)
+        self._atualizar_lease(job, "UPDATE jobs SET status = ?, lease_ate = NULL, erro = ?, disponivel_em = ?",
+                              (PENDENTE, erro, time.time() + espera))
+        logger.warning("Job {} falhou (tentativa {}); nova tentativa em {:.0f}s: {}",
+                       job.id, job.tentativas, espera, erro)
+        return PENDENTE
+
+    def obter(self, job_id: int) -> Optional[Dict]:
+        conn = self._conectar()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def contar_por_status(self) -> Dict[str, int]:
+        conn = self._conectar()
+        try:
+            return {r["status"]: r["total"]
+                    for r in conn.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status")}
+        finally:
+            conn.close()
+
+
+class Worker:
+    """
+    Executa até ``concorrencia`` jobs ao mesmo tempo, cada thread com seus próprios
+    agentes. Uma thread de heartbeat renova os leases dos jobs em andamento.
+    """
+
+    def __init__(
+            self,
+            fila: FilaJobs = None,
+            concorrencia: int = 2,
+            visibilidade: float = 900.0,
+            intervalo_ocioso: float = 2.0,
+            nome: str = None
+    ):
+        self.fila = fila or FilaJobs()
+        self.concorrencia = concorrencia
+        self.visibilidade = visibilidade
+        self.intervalo_ocioso = intervalo_ocioso
+        self.nome = nome or f"{socket.gethostname()}:{os.getpid()}"
+        self.parar = threading.Event()
+        self.processados = 0
+        self._em_andamento: Dict[int, Job] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _agentes(self):
+        if not hasattr(self._local, "roteiro"):
+            from src.agents import roteiro_agent, youtube_detail_agent
+            self._local.roteiro = roteiro_agent.criar_agente()
+            self._local.detalhes = youtube_detail_agent.criar_agente()
+        return self._local.roteiro, self._local.detalhes
+
+    def processar(self, job: Job) -> None:
+        """Roda as duas etapas de um job; a de roteiro é pulada se já foi feita numa tentativa anterior."""
+        from src.agents.roteiro_agent import gerar_roteiro
+        from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+
+        agente_roteiro, agente_detalhes = self._agentes()
+        if job.roteiro_id is None:
+            roteiro, roteiro_id = gerar_roteiro(job.tema, job.tipo, job.referencias, agente=agente_roteiro)
+            self.fila.registrar_roteiro(job, roteiro_id)
+        else:
+            roteiro = utils.get_roteiro(job.roteiro_id)
+            if roteiro is None:
+                raise LookupError(f"Roteiro {job.roteiro_id} não encontrado")
+        gerar_detail_video_youtube(roteiro, job.roteiro_id, agente=agente_detalhes)
+
+    def _executar_um(self) -> bool:
+        job = self.fila.reservar(f"{self.nome}:{threading.current_thread().name}", self.visibilidade)
+        if job is None:
+            return False
+        with self._lock:
+            self._em_andamento[job.id] = job
+        logger.info("Job {} iniciado (tentativa {}/{})", job.id, job.tentativas, job.max_tentativas)
+        try:
+            self.processar(job)
+        except Exception as e:
+            self.fila.falhar(job, f"{type(e).__name__}: {e}")
+        else:
+            if self.fila.concluir(job):
+                logger.success("Job {} concluído: roteiro_id={}", job.id, job.roteiro_id)
+            with self._lock:
+                self.processados += 1
+        finally:
+            with self._lock:
+                self._em_andamento.pop(job.id, None)
+        return True
+
+    def _laco(self, parar_quando_vazio: bool) -> None:
+        while not self.parar.is_set():
+            if not self._executar_um():
+                if parar_quando_vazio:
+                    return
+                self.parar.wait(self.intervalo_ocioso)
+
+    def _heartbeat(self) -> None:
+        while not self.parar.wait(self.visibilidade / 3):
+            with self._lock:
+                jobs = list(self._em_andamento.values())
+            for job in jobs:
+                if not self.fila.renovar(job, self.visibilidade):
+                    logger.warning("Job {}: lease perdido para outro worker", job.id)
+
+    def executar(self, parar_quando_vazio: bool = False) -> int:
+        """Bloqueia até ``parar`` ser sinalizado (ou a fila esvaziar). Retorna os jobs concluídos."""
+        from src.agents import roteiro_agent, youtube_detail_agent
+        roteiro_agent.preparar_storage()
+        youtube_detail_agent.preparar_storage()
+
+        threading.Thread(target=self._heartbeat, name="jobs-heartbeat", daemon=True).start()
+        threads = [threading.Thread(target=self._laco, args=(parar_quando_vazio,), name=f"job-worker-{i}")
+                   for i in range(self.concorrencia)]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            logger.info("Encerrando: aguardando os jobs em andamento")
+            self.parar.set()
+            for t in threads:
+                t.join()
+        self.parar.set()
+        return self.processados
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(find_dotenv())
+    configurar_logging()
+
+    parser = argparse.ArgumentParser(description="Fila de jobs de geração de roteiros")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_enf = sub.add_parser("enfileirar", help="Enfileira um pedido de roteiro")
+    p_enf.add_argument("tema")
+    p_enf.add_argument("--tipo", choices=[t.value for t in TipoRoteiro], default=TipoRoteiro.LONGO.value)
+    p_enf.add_argument("--referencia", action="append", default=[])
+    p_enf.add_argument("--chave", default=None, help="Chave de idempotência (padrão: derivada do pedido)")
+    p_enf.add_argument("--max-tentativas", type=int, default=5)
+    p_work = sub.add_parser("worker", help="Processa jobs da fila")
+    p_work.add_argument("--concorrencia", type=int, default=2)
+    p_work.add_argument("--visibilidade", type=float, default=900.0)
+    p_work.add_argument("--parar-quando-vazio", action="store_true")
+    p_work.add_argument("--profile", action="store_true", help="Grava cProfile/tracemalloc de cada geração em profiles/")
+    sub.add_parser("status", help="Mostra quantos jobs há em cada status")
+    args = parser.parse_args()
+
+    fila = FilaJobs()
+    if args.comando == "enfileirar":
+        print(fila.enfileirar(args.tema, TipoRoteiro(args.tipo), args.referencia, args.chave, args.max_tentativas))
+    elif args.comando == "worker":
+        if args.profile:
+            profiling.ativar()
+        Worker(fila, args.concorrencia, args.visibilidade).executar(args.parar_quando_vazio)
+    else:
+        for status, total in sorted(fila.contar_por_status().items()):
+            print(f"{status:<12} {total}")
@@ -0,0 +1,75 @@
+"""
+Configuração do loguru para os pontos de entrada (``main.py``, lote, fila, servidor).
+
+- O sink padrão grava com ``enqueue=True``: a escrita vai para uma thread em segundo plano
+  e os workers concorrentes não ficam serializados no I/O do stderr.
+- ``LOG_JSON=1`` troca o texto por uma linha JSON por registro (``serialize`` do loguru).
+- Mensagens repetidas a cada versículo (``logger_amostrado``) passam só 1 a cada
+  ``LOG_AMOSTRAGEM``; avisos e erros nunca são descartados.
+
+Nos módulos, as mensagens usam argumentos posicionais (``logger.debug("x: {}", valor)``) em vez
+de f-strings: o loguru só formata depois de conferir o nível, então uma mensagem abaixo do
+nível mínimo não custa a renderização de ``valor``.
+
+    LOG_LEVEL=INFO LOG_JSON=1 LOG_AMOSTRAGEM=20 python main.py
+"""
+import itertools
+import os
+import sys
+from typing import Any, Dict, Optional, TextIO
+
+from loguru import logger
+
+# Registros marcados com esta chave em ``extra`` são amostrados
+CHAVE_AMOSTRAGEM = "amostrado"
+
+# Logger para mensagens por versículo/consulta (alto volume, baixo valor individual)
+logger_amostrado = logger.bind(**{CHAVE_AMOSTRAGEM: True})
+
+_NIVEL_AVISO = logger.level("WARNING").no
+
+
+class FiltroAmostragem:
+    """Deixa passar 1 a cada ``taxa`` registros amostrados abaixo de WARNING."""
+
+    def __init__(self, taxa: int = 1):
+        self.taxa = max(int(taxa), 1)
+        self._contador = itertools.count()
+
+    def __call__(self, registro: Dict[str, Any]) -> bool:
+        if self.taxa == 1 or not registro["extra"].get(CHAVE_AMOSTRAGEM):
+            return True
+        if registro["level"].no >= _NIVEL_AVISO:
+            return True
+        return next(self._contador) % self.taxa == 0
+
+
+def configurar_logging(
+        nivel: str = None,
+        json: bool = None,
+        amostragem: int = None,
+        destino: TextIO = None,
+        enqueue: bool = True,
+        arquivo: Optional[str] = None
+) -> None:
+    """
+    Substitui os sinks do loguru. Os argumentos omitidos vêm de ``LOG_LEVEL`` (INFO),
+    ``LOG_JSON``, ``LOG_AMOSTRAGEM`` (1, sem amostragem) e ``LOG_ARQUIVO``.
+
+    Args:
+        destino: Stream do sink principal (padrão: stderr)
+        enqueue: Grava numa thread em segundo plano
+        arquivo: Arquivo adicional, com rotação por tamanho
+    """
+    nivel = (nivel or os.environ.get("LOG_LEVEL") or "INFO").upper()
+    if json is None:
+        json = os.environ.get("LOG_JSON", "").lower() in ("1", "true", "sim")
+    filtro = FiltroAmostragem(amostragem or int(os.environ.get("LOG_AMOSTRAGEM") or 1))
+    arquivo = arquivo or os.environ.get("LOG_ARQUIVO") or None
+
+    logger.remove()
+    logger.add(destino or sys.stderr, level=nivel, serialize=json, enqueue=enqueue, filter=filtro,
+               backtrace=False, diagnose=False)
+    if arquivo:
+        logger.add(arquivo, level=nivel, serialize=json, enqueue=enqueue, filter=filtro,
+                   rotation="50 MB", retention=5, encoding="utf-8")
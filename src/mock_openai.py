@@ -0,0 +1,398 @@
+"""
+Servidor local compatível com a API de chat completions da OpenAI.
+
+Serve para testes de carga e concorrência sem rede: sintetiza respostas válidas para o
+``response_format`` pedido (``RoteiroBiblico``, ``DetailVideoYouTube`` ou qualquer schema),
+faz turnos de chamada à ferramenta ``lookup_verse``, injeta latência e erros (429/500),
+suporta streaming e pode reproduzir respostas gravadas.
+
+    python -m src.mock_openai --porta 8765 --latencia 0.5 --taxa-429 0.05
+
+Para apontar os agentes para ele::
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock python main.py
+"""
+import argparse
+import ast
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+REFERENCIAS_PADRAO = [
+    "sl 23:1-6", "rm 8:28-39", "fp 4:6-7", "mt 6:25-34",
+    "is 41:10", "jo 14:27", "jo 3:16", "sl 119:105-112",
+]
+
+
+# ------------------------------------------------------------------------- #
+# Síntese de respostas
+# ------------------------------------------------------------------------- #
+def _texto(conteudo: Any) -> str:
+    if isinstance(conteudo, str):
+        return conteudo
+    if isinstance(conteudo, list):
+        return " ".join(p.get("text", "") for p in conteudo if isinstance(p, dict))
+    return "" if conteudo is None else str(conteudo)
+
+
+def _resultado_ferramenta(conteudo: str) -> Optional[Dict[str, Any]]:
+    for loader in (json.loads, ast.literal_eval):
+        try:
+            dado = loader(conteudo)
+            if isinstance(dado, dict):
+                return dado
+        except (ValueError, SyntaxError):
+            continue
+    return None
+
+
+def estimar_tokens(texto: str) -> int:
+    return max(1, len(texto) // 4)
+
+
+def chave_requisicao(corpo: Dict[str, Any]) -> str:
+    """Chave estável de uma requisição, usada para gravar e reproduzir respostas."""
+    relevante = {k: corpo.get(k) for k in ("model", "messages", "tools", "response_format")}
+    return hashlib.sha256(json.dumps(relevante, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def sintetizar_mensagem(
+        corpo: Dict[str, Any],
+        turnos_ferramenta: int = 1,
+        chamadas_por_turno: int = 3,
+        referencias: Optional[List[str]] = None
+) -> tuple[Dict[str, Any], str]:
+    """
+    Gera a mensagem do assistente para uma requisição de chat completions.
+
+    Enquanto houver turnos de ferramenta a fazer e ``lookup_verse`` estiver disponível,
+    devolve ``tool_calls``; depois, a saída estruturada sintetizada a partir do
+    JSON schema do ``response_format``, usando os versículos retornados pela ferramenta.
+
+    Returns:
+        tuple[dict, str]: Mensagem do assistente e ``finish_reason``.
+    """
+    referencias = referencias or REFERENCIAS_PADRAO
+    messages = corpo.get("messages", [])
+    prompt = "\n".join(_texto(m.get("content")) for m in messages)
+    semente = zlib.crc32(prompt[:2000].encode("utf-8"))
+    turno = sum(1 for m in messages if m.get("role") == "assistant" and m.get("tool_calls"))
+    ferramentas = {t.get("function", {}).get("name") for t in corpo.get("tools") or []}
+
+    if "lookup_verse" in ferramentas and turno < turnos_ferramenta:
+        calls = []
+        for i in range(chamadas_por_turno):
+            ref = referencias[(semente + turno * chamadas_por_turno + i) % len(referencias)]
+            calls.append({
+                "id": f"call_{turno}_{i}",
+                "type": "function",
+                "function": {"name": "lookup_verse", "arguments": json.dumps({"referencia": ref})},
+            })
+        return {"role": "assistant", "content": None, "tool_calls": calls}, "tool_calls"
+
+    saida = json.dumps(_saida_estruturada(messages, corpo.get("response_format")), ensure_ascii=False)
+    return {"role": "assistant", "content": saida}, "stop"
+
+
+def montar_completion(corpo: Dict[str, Any], mensagem: Dict[str, Any], finish_reason: str) -> Dict[str, Any]:
+    prompt = "\n".join(_texto(m.get("content")) for m in corpo.get("messages", []))
+    saida = mensagem.get("content") or json.dumps(mensagem.get("tool_calls"))
+    prompt_tokens, completion_tokens = estimar_tokens(prompt), estimar_tokens(saida)
+    return {
+        "id": f"chatcmpl-mock-{zlib.crc32(prompt.encode('utf-8')):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": corpo.get("model", "mock"),
+        "choices": [{"index": 0, "message": mensagem, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+    }
+
+
+def _saida_estruturada(messages: List[Dict[str, Any]], response_format) -> Dict[str, Any]:
+    prompt = "\n".join(_texto(m.get("content")) for m in messages if m.get("role") != "tool")
+    resultados = [r for m in messages if m.get("role") == "tool"
+                  for r in [_resultado_ferramenta(_texto(m.get("content")))] if r and "reference" in r]
+    tema = re.search(r"tema '([^']+)'", prompt) or re.search(r"TEMA:\s*(.+)", prompt)
+    contexto = {
+        "tema": tema.group(1).strip() if tema else "Fé",
+        "prompt": prompt,
+        "blocos": [f"{r['reference'].replace(' (NTLH)', '')}\n{r['text']}" for r in resultados],
+        "referencias": [r["reference"].replace(" (NTLH)", "") for r in resultados],
+    }
+    schema = {}
+    if isinstance(response_format, dict) and response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"].get("schema", {})
+    if not schema:
+        return {"resposta": "ok"}
+    return _sintetizar(schema, schema, contexto, None)
+
+
+def _sintetizar(schema: Dict[str, Any], raiz: Dict[str, Any], ctx: Dict[str, Any], campo: Optional[str]) -> Any:
+    if "$ref" in schema:
+        nome = schema["$ref"].rsplit("/", 1)[-1]
+        return _sintetizar(raiz.get("$defs", {}).get(nome, {}), raiz, ctx, campo)
+    if "anyOf" in schema:
+        opcoes = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return _sintetizar(opcoes[0], raiz, ctx, campo)
+    if "enum" in schema:
+        for valor in schema["enum"]:
+            if re.search(rf"\broteiro {re.escape(str(valor))}\b", ctx["prompt"]):
+                return valor
+        return schema["enum"][0]
+
+    tipo = schema.get("type")
+    if tipo == "object":
+        return {nome: _sintetizar(sub, raiz, ctx, nome) for nome, sub in schema.get("properties", {}).items()}
+    if tipo == "array":
+        if campo == "versiculos_utilizados":
+            return ctx["referencias"] or ["João 3:16"]
+        if campo == "referencias":
+            return []
+        if campo == "hashtags":
+            return ["#" + ctx["tema"].lower().replace(" ", ""), "#biblia", "#fe", "#devocional"]
+        item = schema.get("items", {})
+        if item.get("type", "string") == "string":
+            return [ctx["tema"].lower(), "bíblia", "fé", "devocional", "reflexão", "cristão"]
+        return [_sintetizar(item, raiz, ctx, None) for _ in range(3)]
+    if tipo == "integer":
+        return 1
+    if tipo == "number":
+        return 1.0
+    if tipo == "boolean":
+        return True
+    if schema.get("format") == "date-time":
+        return "2025-01-01T00:00:00"
+
+    tema = ctx["tema"]
+    textos = {
+        "tema": tema,
+        "roteiro": "\n\n".join(ctx["blocos"]) + "\n\nInscreva-se no canal e ative as notificações.",
+        "postagem_comunidade": f"🙏 Novo vídeo sobre {tema}! O que esse tema fala ao seu coração? ✨",
+        "titulo": f"✨ {tema}: o que a Bíblia diz",
+        "descricao": f"Neste vídeo lemos versículos sobre {tema}. Inscreva-se e compartilhe!",
+        "thumbnail_prompt": f"Luz dourada sobre uma Bíblia aberta, tema {tema}",
+    }
+    return textos.get(campo, f"{campo or 'texto'} sobre {tema}")
+
+
+# ------------------------------------------------------------------------- #
+# Servidor HTTP
+# ------------------------------------------------------------------------- #
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Servidor de chat completions. Cada requisição roda na sua própria thread, então
+    a latência injetada não serializa os clientes concorrentes.
+
+    Args:
+        latencia: Atraso fixo por requisição, em segundos.
+        jitter: Atraso adicional aleatório (uniforme entre 0 e ``jitter``).
+        taxa_429: Probabilidade de responder 429 (rate limit).
+        taxa_500: Probabilidade de responder 500.
+        rpm: Limite de requisições por minuto; acima dele responde 429.
+        gravacoes: Diretório com respostas gravadas (``<chave>.json``), reproduzidas quando existirem.
+        gravar: Se True, grava em ``gravacoes`` as respostas sintetizadas.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            endereco: tuple[str, int] = ("127.0.0.1", 0),
+            latencia: float = 0.0,
+            jitter: float = 0.0,
+            taxa_429: float = 0.0,
+            taxa_500: float = 0.0,
+            rpm: Optional[int] = None,
+            turnos_ferramenta: int = 1,
+            chamadas_por_turno: int = 3,
+            gravacoes: Optional[Path] = None,
+            gravar: bool = False,
+            semente: Optional[int] = None
+    ):
+        super().__init__(endereco, _MockHandler)
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_429 = taxa_429
+        self.taxa_500 = taxa_500
+        self.rpm = rpm
+        self.turnos_ferramenta = turnos_ferramenta
+        self.chamadas_por_turno = chamadas_por_turno
+        self.gravacoes = Path(gravacoes) if gravacoes else None
+        self.gravar = gravar
+        self.random = random.Random(semente)
+        self._lock = threading.Lock()
+        self._janela: deque[float] = deque()
+        self.requisicoes = 0
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+    def iniciar_em_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True)
+        thread.start()
+        return thread
+
+    def sortear_erro(self) -> Optional[int]:
+        with self._lock:
+            self.requisicoes += 1
+            agora = time.monotonic()
+            if self.rpm:
+                while self._janela and agora - self._janela[0] > 60:
+                    self._janela.popleft()
+                if len(self._janela) >= self.rpm:
+                    return 429
+                self._janela.append(agora)
+            sorteio = self.random.random()
+            atraso = self.latencia + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if atraso:
+            time.sleep(atraso)
+        if sorteio < self.taxa_429:
+            return 429
+        if sorteio < self.taxa_429 + self.taxa_500:
+            return 500
+        return None
+
+    def responder(self, corpo: Dict[str, Any]) -> Dict[str, Any]:
+        chave = chave_requisicao(corpo)
+        arquivo = self.gravacoes / f"{chave}.json" if self.gravacoes else None
+        if arquivo is not None and arquivo.exists() and not self.gravar:
+            return json.loads(arquivo.read_text(encoding="utf-8"))
+        mensagem, finish_reason = sintetizar_mensagem(corpo, self.turnos_ferramenta, self.chamadas_por_turno)
+        completion = montar_completion(corpo, mensagem, finish_reason)
+        if arquivo is not None and self.gravar:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            arquivo.write_text(json.dumps(completion, ensure_ascii=False), encoding="utf-8")
+        return completion
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server: MockOpenAIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.opt(lazy=True).debug("mock-openai: {}", lambda: format % args)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        else:
+            self._json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        tamanho = int(self.headers.get("Content-Length", 0))
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        except json.JSONDecodeError:
+            self._json(400, {"error": {"message": "JSON inválido", "type": "invalid_request_error"}})
+            return
+
+        erro = self.server.sortear_erro()
+        if erro == 429:
+            self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error",
+                                       "code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            return
+        if erro == 500:
+            self._json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+            return
+
+        completion = self.server.responder(corpo)
+        if corpo.get("stream"):
+            incluir_uso = bool((corpo.get("stream_options") or {}).get("include_usage"))
+            self._stream(completion, incluir_uso)
+        else:
+            self._json(200, completion)
+
+    # -------------------------------------------------------------- #
+    def _json(self, status: int, dados: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _stream(self, completion: Dict[str, Any], incluir_uso: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        base = {k: completion[k] for k in ("id", "created", "model")}
+        mensagem = completion["choices"][0]["message"]
+        deltas: List[Dict[str, Any]] = [{"role": "assistant", "content": ""}]
+        if mensagem.get("tool_calls"):
+            deltas.append({"tool_calls": [dict(tc, index=i) for i, tc in enumerate(mensagem["tool_calls"])]})
+        conteudo = mensagem.get("content") or ""
+        deltas.extend({"content": conteudo[i:i + 64]} for i in range(0, len(conteudo), 64))
+
+        for delta in deltas:
+            self._evento(dict(base, object="chat.completion.chunk",
+                              choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+        self._evento(dict(base, object="chat.completion.chunk",
+                          choices=[{"index": 0, "delta": {},
+                                    "finish_reason": completion["choices"][0]["finish_reason"]}]))
+        if incluir_uso:
+            self._evento(dict(base, object="chat.completion.chunk", choices=[], usage=completion["usage"]))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _evento(self, dados: Dict[str, Any]) -> None:
+        self.wfile.write(b"data: " + json.dumps(dados, ensure_ascii=False).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso fixo por requisição (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Atraso aleatório adicional máximo (s)")
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    parser.add_argument("--taxa-500", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None, help="Limite de requisições por minuto")
+    parser.add_argument("--turnos-ferramenta", type=int, default=1)
+    parser.add_argument("--chamadas-por-turno", type=int, default=3)
+    parser.add_argument("--gravacoes", default=None, help="Diretório de respostas gravadas")
+    parser.add_argument("--gravar", action="store_true", help="Grava as respostas sintetizadas em --gravacoes")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = MockOpenAIServer(
+        (args.host, args.porta), args.latencia, args.jitter, args.taxa_429, args.taxa_500, args.rpm,
+        args.turnos_ferramenta, args.chamadas_por_turno, args.gravacoes, args.gravar, args.semente
+    )
+    logger.info("Mock OpenAI ouvindo em {}", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Roteamento de modelos por etapa e tipo de roteiro, com cadeia de fallback e requisições
+de cobertura (hedge).
+
+Cada etapa (``roteiro``, ``continuacao``, ``detalhes``, ``reparo``, ``campo``) tem uma cadeia
+de modelos, opcionalmente por ``TipoRoteiro``. Em timeout, falha de conexão ou erro 5xx a
+chamada passa para o próximo modelo; 429 continua a cargo do limitador de taxa. Configurado
+por ``ROTAS_MODELOS``:
+
+    ROTAS_MODELOS="roteiro.short=gpt-4.1-nano,gpt-4o-mini;detalhes=gpt-4.1-nano,gpt-4o-mini"
+
+Sem rota, a etapa usa só o modelo padrão do agente e a chamada é exatamente um ``agent.run``.
+
+Com ``HEDGE_REQUISICOES=1``, se a resposta demorar mais que o p95 das durações recentes da
+etapa/modelo (memória do processo, semeada por ``generation_runs``), uma segunda requisição
+igual é disparada e vale a que chegar primeiro. A outra não é cancelada: termina em segundo
+plano e é registrada como ``<etapa>:descartada`` para o custo não sumir da contabilidade.
+"""
+import contextvars
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from agno.agent import Agent, RunResponse
+from agno.exceptions import ModelProviderError, ModelRateLimitError
+from loguru import logger
+
+from src import utils
+from src.accounting import registrar_execucao
+from src.models import TipoRoteiro
+from src.rate_limiter import limitador
+
+# Timeout de cada requisição ao modelo (segundos); sem ele vale o padrão do cliente OpenAI
+TIMEOUT_MODELO = float(os.getenv("TIMEOUT_MODELO", "0")) or None
+
+PERCENTIL_HEDGE = 95
+MIN_AMOSTRAS_HEDGE = 20
+MAX_AMOSTRAS = 200
+
+
+def ler_rotas(texto: str) -> Dict[Tuple[str, Optional[str]], List[str]]:
+    """``"roteiro.short=a,b;detalhes=c"`` -> ``{("roteiro", "short"): ["a", "b"], ("detalhes", None): ["c"]}``"""
+    rotas = {}
+    for item in filter(None, (p.strip() for p in (texto or "").split(";"))):
+        chave, _, modelos = item.partition("=")
+        etapa, _, tipo = chave.strip().lower().partition(".")
+        cadeia = [m.strip() for m in modelos.split(",") if m.strip()]
+        if not etapa or not cadeia:
+            raise ValueError(f"Rota de modelos inválida: '{item}'")
+        rotas[(etapa, tipo or None)] = cadeia
+    return rotas
+
+
+def deve_trocar_modelo(erro: BaseException) -> bool:
+    """Timeout, falha de conexão e 5xx passam para o próximo modelo; 429 e 4xx não."""
+    if isinstance(erro, ModelRateLimitError):
+        return False
+    if isinstance(erro, ModelProviderError):
+        # O agno converte falhas de conexão e timeouts em ModelProviderError com status 502
+        return (getattr(erro, "status_code", None) or 502) >= 500
+    return isinstance(erro, (TimeoutError, ConnectionError))
+
+
+def modelo_usado(resposta: Any, padrao: str) -> str:
+    """Modelo que de fato respondeu, para a contabilidade (``padrao`` se não for conhecido)."""
+    modelo = getattr(resposta, "model", None)
+    return modelo if isinstance(modelo, str) else padrao
+
+
+class Roteador:
+    """
+    Escolhe e executa a cadeia de modelos de uma etapa.
+
+    Args:
+        rotas: ``{(etapa, tipo ou None): [modelos]}``; veja ``ler_rotas``.
+        hedge: Dispara uma segunda requisição quando a primeira passa do p95.
+        db_path: Banco com ``generation_runs``, usado para semear as durações.
+    """
+
+    def __init__(self, rotas: Dict[Tuple[str, Optional[str]], List[str]] = None, hedge: bool = False,
+                 db_path: str = None):
+        self.rotas = rotas or {}
+        self.hedge = hedge
+        self.db_path = db_path
+        self._duracoes: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=MAX_AMOSTRAS))
+        self._semeados: set = set()
+        self._lock = threading.Lock()
+
+    def cadeia(self, etapa: str, tipo: TipoRoteiro = None, padrao: str = None) -> List[str]:
+        """Modelos da etapa, na ordem: rota do tipo, rota da etapa, ``padrao``."""
+        if isinstance(tipo, TipoRoteiro) and (etapa, tipo.name.lower()) in self.rotas:
+            return list(self.rotas[(etapa, tipo.name.lower())])
+        if (etapa, None) in self.rotas:
+            return list(self.rotas[(etapa, None)])
+        return [padrao]
+
+    # ------------------------------------------------------------------ #
+    # Durações e atraso do hedge
+    # ------------------------------------------------------------------ #
+    def registrar_duracao(self, etapa: str, modelo: str, duracao: float) -> None:
+        with self._lock:
+            self._duracoes[(etapa, modelo)].append(duracao)
+
+    def _semear(self, etapa: str, modelo: str) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path or utils.DB_PATH)
+            try:
+                linhas = conn.execute(
+                    "SELECT wall_time FROM generation_runs WHERE etapa = ? AND model_id = ? AND wall_time > 0 "
+                    "ORDER BY id DESC LIMIT ?", (etapa, modelo, MAX_AMOSTRAS)).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            linhas = []  # banco ainda sem generation_runs
+        with self._lock:
+            self._duracoes[(etapa, modelo)].extendleft(d for d, in linhas)
+
+    def atraso_hedge(self, etapa: str, modelo: str) -> Optional[float]:
+        """p95 das durações recentes, ou None enquanto houver poucas amostras."""
+        if (etapa, modelo) not in self._semeados:
+            self._semeados.add((etapa, modelo))
+            self._semear(etapa, modelo)
+        with self._lock:
+            duracoes = list(self._duracoes[(etapa, modelo)])
+        if len(duracoes) < MIN_AMOSTRAS_HEDGE:
+            return None
+        return statistics.quantiles(duracoes, n=100)[PERCENTIL_HEDGE - 1]
+
+    # ------------------------------------------------------------------ #
+    # Execução
+    # ------------------------------------------------------------------ #
+    def _chamar(self, etapa: str, modelo: str, agente: Agent, prompt: str, tokens: int,
+                requisicoes: int) -> tuple[RunResponse, float]:
+        with limitador.limitar(modelo, tokens, requisicoes) as reserva:
+            inicio = time.perf_counter()
+            resposta = agente.run(prompt)
+            duracao = time.perf_counter() - inicio
+            reserva.registrar_uso(resposta)
+        resposta.model = modelo
+        self.registrar_duracao(etapa, modelo, duracao)
+        return resposta, duracao
+
+    def _chamar_com_hedge(self, etapa: str, modelo: str, agente: Optional[Agent], fabrica: Callable[[str], Agent],
+                          prompt: str, tokens: int, requisicoes: int) -> tuple[RunResponse, float]:
+        atraso = self.atraso_hedge(etapa, modelo)
+        if atraso is None:
+            return self._chamar(etapa, modelo, agente or fabrica(modelo), prompt, tokens, requisicoes)
+
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"hedge-{etapa}")
+        inicio = time.perf_counter()
+        # A perdedora segue rodando em segundo plano: num agente próprio, não no compartilhado do
+        # chamador, que a próxima geração usaria ao mesmo tempo. Cada requisição roda com uma cópia
+        # do contexto (ex.: orçamento de consultas da execução).
+        pendentes = {executor.submit(contextvars.copy_context().run, self._chamar, etapa, modelo,
+                                     fabrica(modelo), prompt, tokens, requisicoes)}
+        try:
+            feitos, _ = wait(pendentes, timeout=atraso)
+            if not feitos:
+                logger.info("{}/{} passou do p95 ({:.1f}s); disparando requisição de cobertura",
+                            etapa, modelo, atraso)
+                pendentes.add(executor.submit(contextvars.copy_context().run, self._chamar, etapa, modelo,
+                                              fabrica(modelo), prompt, tokens, requisicoes))
+            erro = None
+            while pendentes:
+                feitos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in feitos:
+                    if futuro.exception() is None:
+                        for perdedor in pendentes:
+                            perdedor.add_done_callback(lambda f: self._descartar(etapa, modelo, f))
+                        resposta, _ = futuro.result()
+                        # Para o chamador conta o tempo até a primeira resposta, não o da requisição vencedora
+                        return resposta, time.perf_counter() - inicio
+                    erro = futuro.exception()
+            raise erro
+        finally:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _descartar(etapa: str, modelo: str, futuro: Future) -> None:
+        if futuro.exception() is None:
+            resposta, duracao = futuro.result()
+            registrar_execucao(resposta, f"{etapa}:descartada", None, duracao, modelo)
+
+    def executar(
+            self,
+            etapa: str,
+            prompt: str,
+            fabrica: Callable[[str], Agent],
+            padrao: str,
+            tipo: TipoRoteiro = None,
+            agente: Agent = None,
+            tokens: int = 0,
+            requisicoes: int = 1
+    ) -> tuple[RunResponse, float]:
+        """
+        Roda ``prompt`` pela cadeia da etapa, passando pelo limitador de taxa em cada tentativa.
+
+        Args:
+            fabrica: Constrói um agente para um modelo (ex.: ``criar_agente``)
+            padrao: Modelo da etapa sem rota configurada (o ``MODEL_ID`` do agente)
+            agente: Agente já construído com ``padrao``; usado na primeira tentativa quando
+                a cadeia começa por ``padrao`` e não há hedge possível
+            tokens, requisicoes: Estimativa para o limitador
+
+        Returns:
+            tuple[RunResponse, float]: Resposta (com ``model`` = modelo que respondeu) e duração
+        """
+        cadeia = self.cadeia(etapa, tipo, padrao)
+        for posicao, modelo in enumerate(cadeia):
+            atual = agente if (modelo == padrao and posicao == 0) else None
+            try:
+                if self.hedge:
+                    return self._chamar_com_hedge(etapa, modelo, atual, fabrica, prompt, tokens, requisicoes)
+                return self._chamar(etapa, modelo, atual or fabrica(modelo), prompt, tokens, requisicoes)
+            except Exception as e:
+                if posicao == len(cadeia) - 1 or not deve_trocar_modelo(e):
+                    raise
+                logger.warning("{}: {} falhou ({}); tentando {}", etapa, modelo, e, cadeia[posicao + 1])
+        raise AssertionError("cadeia de modelos vazia")
+
+
+def roteador_do_ambiente() -> Roteador:
+    """Roteador configurado por ``ROTAS_MODELOS`` e ``HEDGE_REQUISICOES``."""
+    return Roteador(
+        rotas=ler_rotas(os.environ.get("ROTAS_MODELOS", "")),
+        hedge=os.environ.get("HEDGE_REQUISICOES", "").lower() in ("1", "true", "sim"),
+    )
+
+
+roteador = roteador_do_ambiente()
@@ -22,9 +22,26 @@ class RoteiroBiblico(BaseModel):
     )
 
 
+class ContinuacaoRoteiro(BaseModel):
+    blocos: str = Field(..., description="Novos blocos de versículos, no mesmo formato do roteiro")
+    versiculos_utilizados: list[str] = Field(..., description="Referências bíblicas dos novos blocos")
+
+
 class DetailVideoYouTube(BaseModel):
     titulo: str = Field(..., description="Título chamativo para o vídeo do YouTube")
     descricao: str = Field(..., description="Descrição completa do vídeo para o YouTube")
     tags: list[str] = Field(..., description="Tags relevantes para SEO do YouTube")
     hashtags: list[str] = Field(..., description="Hashtags para redes sociais")
     thumbnail_prompt: str = Field(..., description="Prompt para geração da thumbnail do vídeo")
+
+
+class CandidatoTitulo(BaseModel):
+    titulo: str = Field(..., description="Variação de título chamativo para o vídeo do YouTube")
+    thumbnail_prompt: str = Field(..., description="Prompt para a thumbnail que combina com este título")
+
+
+class DetailVideoYouTubeCandidatos(BaseModel):
+    candidatos: list[CandidatoTitulo] = Field(..., description="Variações diferentes de título e thumbnail")
+    descricao: str = Field(..., description="Descrição completa do vídeo para o YouTube")
+    tags: list[str] = Field(..., description="Tags relevantes para SEO do YouTube")
+    hashtags: list[str] = Field(..., description="Hashtags para redes sociais")
@@ -0,0 +1,142 @@
+"""
+Perfilamento opcional das gerações com cProfile e tracemalloc.
+
+Desligado por padrão. ``PROFILE_GERACAO=1`` (ou ``--profile`` em ``main.py``, no lote e no
+worker da fila) envolve cada ``gerar_roteiro`` / ``gerar_detail_video_youtube`` (e cada pedido
+do lote) e grava em ``profiles/`` (ou ``PROFILES_DIR``):
+
+- ``<data>_<nome>.prof``: estatísticas do cProfile, para ``snakeviz``/``pstats``;
+- ``<data>_<nome>.txt``: resumo com os N pontos de CPU mais caros (tempo acumulado e próprio)
+  e os locais que mais alocaram memória na execução (árvores do BeautifulSoup, dumps do
+  pydantic...), pela diferença entre dois snapshots do tracemalloc.
+
+O cProfile mede só a thread que chamou; o tracemalloc é global, então com workers
+concorrentes as alocações de um resumo incluem as das outras threads.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from loguru import logger
+
+ATIVO = os.getenv("PROFILE_GERACAO", "").lower() in ("1", "true", "sim")
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", "profiles"))
+TOP_N = int(os.getenv("PROFILE_TOP", "25"))
+
+_SEM_SIMBOLOS = re.compile(r"[^\w-]+")
+_local = threading.local()
+_lock_tracemalloc = threading.Lock()
+_usuarios_tracemalloc = 0
+
+
+def ativar(diretorio: str = None) -> None:
+    """Liga o perfilamento neste processo e nos que ele criar (pela variável de ambiente)."""
+    global ATIVO, PROFILES_DIR
+    ATIVO = True
+    os.environ["PROFILE_GERACAO"] = "1"
+    if diretorio:
+        PROFILES_DIR = Path(diretorio)
+        os.environ["PROFILES_DIR"] = str(diretorio)
+
+
+def _iniciar_tracemalloc() -> bool:
+    """Liga o tracemalloc se ninguém o ligou; devolve se este chamador deve desligá-lo."""
+    global _usuarios_tracemalloc
+    with _lock_tracemalloc:
+        if _usuarios_tracemalloc == 0 and tracemalloc.is_tracing():
+            return False  # ligado por fora (ex.: python -X tracemalloc)
+        if _usuarios_tracemalloc == 0:
+            tracemalloc.start()
+        _usuarios_tracemalloc += 1
+        return True
+
+
+def _parar_tracemalloc() -> None:
+    global _usuarios_tracemalloc
+    with _lock_tracemalloc:
+        _usuarios_tracemalloc -= 1
+        if _usuarios_tracemalloc == 0:
+            tracemalloc.stop()
+
+
+def resumo(perfil: cProfile.Profile, antes: tracemalloc.Snapshot, depois: tracemalloc.Snapshot,
+           nome: str, duracao: float, top: int = TOP_N) -> str:
+    """Texto com os pontos de CPU e de alocação mais caros de uma execução."""
+    saida = io.StringIO()
+    saida.write(f"# {nome}: {duracao:.2f}s\n\n")
+    estatisticas = pstats.Stats(perfil, stream=saida).strip_dirs()
+    for ordem, titulo in (("cumulative", "tempo acumulado"), ("tottime", "tempo próprio")):
+        saida.write(f"## CPU por {titulo}\n")
+        estatisticas.sort_stats(ordem).print_stats(top)
+
+    filtros = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>")]
+    diferencas = depois.filter_traces(filtros).compare_to(antes.filter_traces(filtros), "lineno")
+    saida.write("## Alocações (maiores saldos)\n")
+    for diferenca in diferencas[:top]:
+        saida.write(f"{diferenca.size_diff / 1024:10.1f} KiB {diferenca.count_diff:+8d}  {diferenca.traceback}\n")
+    por_arquivo = depois.filter_traces(filtros).compare_to(antes.filter_traces(filtros), "filename")
+    saida.write("\n## Alocações por arquivo\n")
+    for diferenca in por_arquivo[:top]:
+        saida.write(f"{diferenca.size_diff / 1024:10.1f} KiB  {diferenca.traceback}\n")
+    return saida.getvalue()
+
+
+@contextmanager
+def perfilar(nome: str, diretorio: Path = None, top: int = None) -> Iterator[Optional[Path]]:
+    """
+    Perfila o bloco se o perfilamento estiver ligado e grava ``.prof`` e ``.txt``.
+    Blocos aninhados na mesma thread são medidos só pelo de fora.
+    """
+    if not ATIVO or getattr(_local, "ativo", False):
+        yield None
+        return
+
+    diretorio = Path(diretorio or PROFILES_DIR)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    base = diretorio / f"{datetime.now():%Y%m%d_%H%M%S_%f}_{_SEM_SIMBOLOS.sub('_', nome)[:60]}"
+    desligar = _iniciar_tracemalloc()
+    perfil = cProfile.Profile()
+    _local.ativo = True
+    antes = tracemalloc.take_snapshot()
+    inicio = time.perf_counter()
+    perfil.enable()
+    try:
+        yield base.with_suffix(".txt")
+    finally:
+        perfil.disable()
+        duracao = time.perf_counter() - inicio
+        depois = tracemalloc.take_snapshot()
+        _local.ativo = False
+        if desligar:
+            _parar_tracemalloc()
+        perfil.dump_stats(base.with_suffix(".prof"))
+        base.with_suffix(".txt").write_text(resumo(perfil, antes, depois, nome, duracao, top or TOP_N),
+                                            encoding="utf-8")
+        logger.info("Perfil de '{}' gravado em {}", nome, base.with_suffix(".txt"))
+
+
+def perfilado(etapa: str) -> Callable:
+    """
+    Decorador: perfila a função quando ``PROFILE_GERACAO`` estiver ligado (sem custo quando não).
+    O nome do perfil leva o tema do primeiro argumento (texto ou objeto com ``tema``).
+    """
+    def decorador(funcao: Callable) -> Callable:
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not ATIVO:
+                return funcao(*args, **kwargs)
+            tema = getattr(args[0], "tema", args[0]) if args else None
+            with perfilar(f"{etapa}_{tema}" if isinstance(tema, str) else etapa):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
@@ -0,0 +1,170 @@
+"""
+Limitador de taxa para chamadas à OpenAI compartilhado entre processos.
+
+Dois baldes de tokens por modelo — requisições por minuto (RPM) e tokens por minuto
+(TPM) — ficam numa tabela SQLite ao lado de ``roteiros.sqlite3``. Cada chamador
+reserva sua cota numa única transação e, se o balde ficar negativo, dorme exatamente
+o tempo até a sua vez. Assim os processos são espaçados de forma uniforme no limite
+do provedor, em vez de estourarem juntos e caírem em tempestades de 429.
+
+Ativado pelas variáveis ``OPENAI_RPM`` e/ou ``OPENAI_TPM``; sem elas, não faz nada.
+"""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from loguru import logger
+
+from src import utils
+
+CREATE_TABLE_RATE_LIMIT = '''
+    CREATE TABLE IF NOT EXISTS rate_limit_buckets
+    (
+        nome          TEXT PRIMARY KEY,
+        saldo         REAL,
+        atualizado_em REAL
+    )
+'''
+
+
+def estimar_tokens(*textos: str) -> int:
+    """Estimativa barata de tokens a partir do tamanho do texto (~4 caracteres por token)."""
+    return sum(len(t) for t in textos if t) // 4 + 1
+
+
+@dataclass
+class Reserva:
+    chave: str
+    tokens: int
+    requisicoes: int
+    espera: float = 0.0
+    tokens_reais: Optional[int] = None
+    requisicoes_reais: Optional[int] = None
+
+    def registrar_uso(self, run_response: Any) -> None:
+        """Guarda o uso real de um ``RunResponse`` do agno para ajustar os baldes na saída."""
+        metrics = getattr(run_response, "metrics", None)
+        if not isinstance(metrics, dict):
+            return
+        entrada = [v for v in metrics.get("input_tokens") or [] if isinstance(v, (int, float))]
+        saida = [v for v in metrics.get("output_tokens") or [] if isinstance(v, (int, float))]
+        self.tokens_reais = int(sum(entrada) + sum(saida))
+        self.requisicoes_reais = len(entrada)
+
+
+class LimitadorTaxa:
+    """
+    Baldes RPM/TPM persistidos em SQLite, com reserva antecipada.
+
+    Args:
+        rpm: Requisições por minuto (None para não limitar).
+        tpm: Tokens por minuto (None para não limitar).
+        db_path: Arquivo SQLite compartilhado entre os processos.
+        rajada_segundos: Capacidade do balde, em segundos de vazão; pequena para manter a vazão plana.
+    """
+
+    def __init__(
+            self,
+            rpm: Optional[float] = None,
+            tpm: Optional[float] = None,
+            db_path: str = None,
+            rajada_segundos: float = 5.0,
+            relogio: Callable[[], float] = time.time,
+            dormir: Callable[[float], None] = time.sleep
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.db_path = db_path or str(Path(utils.DB_PATH).parent / "rate_limit.sqlite3")
+        self.rajada_segundos = rajada_segundos
+        self.relogio = relogio
+        self.dormir = dormir
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def adquirir(self, chave: str, tokens: int, requisicoes: int = 1) -> Reserva:
+        """Reserva ``requisicoes`` e ``tokens`` e bloqueia até a reserva caber nos limites."""
+        reserva = Reserva(chave, tokens, requisicoes)
+        if not self.ativo:
+            return reserva
+        reserva.espera = self._debitar(chave, requisicoes, tokens)
+        if reserva.espera > 0:
+            logger.debug("Rate limit {}: aguardando {:.2f}s", chave, reserva.espera)
+            self.dormir(reserva.espera)
+        return reserva
+
+    def ajustar(self, reserva: Reserva) -> None:
+        """Corrige os baldes pela diferença entre o uso estimado e o real (sem esperar)."""
+        if not self.ativo or reserva.tokens_reais is None:
+            return
+        extra_req = (reserva.requisicoes_reais or 0) - reserva.requisicoes
+        extra_tokens = reserva.tokens_reais - reserva.tokens
+        if extra_req or extra_tokens:
+            self._debitar(reserva.chave, extra_req, extra_tokens)
+
+    @contextmanager
+    def limitar(self, chave: str, tokens: int, requisicoes: int = 1) -> Iterator[Reserva]:
+        reserva = self.adquirir(chave, tokens, requisicoes)
+        try:
+            yield reserva
+        finally:
+            self.ajustar(reserva)
+
+    # ------------------------------------------------------------------ #
+    def _debitar(self, chave: str, requisicoes: float, tokens: float) -> float:
+        """
+        Reabastece e debita os baldes numa transação ``BEGIN IMMEDIATE`` (exclusiva entre
+        processos). Devolve quanto o chamador precisa esperar até o saldo voltar a zero.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute(CREATE_TABLE_RATE_LIMIT)
+            conn.execute("BEGIN IMMEDIATE")
+            agora = self.relogio()
+            espera = 0.0
+            for sufixo, limite, custo in (("rpm", self.rpm, requisicoes), ("tpm", self.tpm, tokens)):
+                if not limite:
+                    continue
+                por_segundo = limite / 60.0
+                capacidade = max(por_segundo * self.rajada_segundos, 1.0)
+                nome = f"{chave}:{sufixo}"
+                row = conn.execute("SELECT saldo, atualizado_em FROM rate_limit_buckets WHERE nome = ?",
+                                   (nome,)).fetchone()
+                saldo, atualizado_em = row if row else (capacidade, agora)
+                saldo = min(capacidade, saldo + max(agora - atualizado_em, 0.0) * por_segundo)
+                # Uma reserva maior que o balde inteiro nunca caberia; limita ao tamanho do balde
+                saldo -= min(custo, capacidade) if custo > 0 else custo
+                conn.execute("INSERT OR REPLACE INTO rate_limit_buckets (nome, saldo, atualizado_em) VALUES (?, ?, ?)",
+                             (nome, saldo, agora))
+                if saldo < 0:
+                    espera = max(espera, -saldo / por_segundo)
+            conn.execute("COMMIT")
+            return espera
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+def _float_env(nome: str) -> Optional[float]:
+    valor = os.environ.get(nome)
+    return float(valor) if valor else None
+
+
+def limitador_openai() -> LimitadorTaxa:
+    """Limitador configurado por ``OPENAI_RPM``, ``OPENAI_TPM`` e ``OPENAI_RATE_LIMIT_DB``."""
+    return LimitadorTaxa(
+        rpm=_float_env("OPENAI_RPM"),
+        tpm=_float_env("OPENAI_TPM"),
+        db_path=os.environ.get("OPENAI_RATE_LIMIT_DB") or None,
+    )
+
+
+limitador = limitador_openai()
@@ -0,0 +1,148 @@
+"""
+Regeneração de um único campo de um roteiro ou das informações de vídeo já gravados.
+
+Em vez de rodar ``gerar_roteiro`` / ``gerar_detail_video_youtube`` de novo (reenviando o
+roteiro inteiro), ``regenerar_campo`` lê a linha gravada, faz um pedido pequeno com saída
+estruturada só para aquele campo (um modelo pydantic de um campo, derivado do original)
+e um contexto mínimo, e atualiza só a coluna no SQLite e, para campos do roteiro, o JSON
+em ``roteiros_json``.
+
+    python -m src.regeneration 42 titulo --instrucoes "mais curto, sem emojis"
+"""
+import argparse
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any, Type
+
+from agno.agent import Agent
+from agno.models.openai import OpenAIChat
+from loguru import logger
+from pydantic import BaseModel, create_model
+
+from src import repair, serialization, utils
+from src.accounting import registrar_execucao
+from src.models import DetailVideoYouTube, RoteiroBiblico
+from src.model_router import TIMEOUT_MODELO, modelo_usado, roteador
+from src.rate_limiter import estimar_tokens
+
+MODEL_ID = "gpt-4o-mini"
+TOKENS_SAIDA_ESTIMADOS = 400
+
+# Campo -> modelo de origem. O texto do roteiro fica de fora: para ele, gere o roteiro de novo
+CAMPOS: dict[str, Type[BaseModel]] = {
+    "postagem_comunidade": RoteiroBiblico,
+    "titulo": DetailVideoYouTube,
+    "descricao": DetailVideoYouTube,
+    "tags": DetailVideoYouTube,
+    "hashtags": DetailVideoYouTube,
+    "thumbnail_prompt": DetailVideoYouTube,
+}
+
+system_prompt = """
+Você é um especialista em conteúdo cristão para YouTube. Reescreva apenas o campo pedido
+de um vídeo bíblico já produzido, mantendo o tema, o tom pastoral e o público do canal.
+"""
+
+
+@lru_cache(maxsize=None)
+def modelo_campo(campo: str) -> Type[BaseModel]:
+    """Modelo de saída com só ``campo``, com o mesmo tipo e descrição do modelo de origem."""
+    if campo not in CAMPOS:
+        raise ValueError(f"Campo inválido: {campo}. Use um de {sorted(CAMPOS)}")
+    info = CAMPOS[campo].model_fields[campo]
+    return create_model(f"Novo_{campo}", **{campo: (info.annotation, info)})
+
+
+def criar_agente(campo: str, modelo: str = None) -> Agent:
+    return Agent(
+        model=OpenAIChat(id=modelo or MODEL_ID, temperature=0.7, timeout=TIMEOUT_MODELO,
+                         base_url=os.environ.get("OPENAI_BASE_URL") or None),
+        description="Agente que regenera um campo de um vídeo bíblico",
+        response_model=modelo_campo(campo),
+        instructions=[system_prompt],
+    )
+
+
+def _prompt(campo: str, roteiro: RoteiroBiblico, info_video: DetailVideoYouTube = None, instrucoes: str = None) -> str:
+    atual = getattr(info_video if CAMPOS[campo] is DetailVideoYouTube else roteiro, campo)
+    linhas = [
+        f"Gere um novo valor para o campo '{campo}' ({modelo_campo(campo).model_fields[campo].description}).",
+        "",
+        f"TEMA: {roteiro.tema}",
+        f"TIPO: {roteiro.tipo.value}",
+        f"VERSÍCULOS: {', '.join(roteiro.versiculos_utilizados)}",
+    ]
+    if info_video is not None and campo != "titulo":
+        linhas.append(f"TÍTULO DO VÍDEO: {info_video.titulo}")
+    linhas.append(f"VALOR ATUAL (a substituir): {', '.join(atual) if isinstance(atual, list) else atual}")
+    if instrucoes:
+        linhas.append(f"AJUSTES PEDIDOS: {instrucoes}")
+    return "\n".join(linhas)
+
+
+def _atualizar_json(roteiro: RoteiroBiblico, campo: str, valor: Any) -> None:
+    caminho = utils.find_roteiro_json(roteiro)
+    if caminho is None:
+        logger.debug("JSON do roteiro '{}' não encontrado em {}", roteiro.tema, utils.OUT_DIR)
+        return
+    roteiro = roteiro.model_copy(update={campo: valor})
+    fd, tmp = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(serialization.para_json(roteiro, serialization.JSON_COMPACTO))
+    os.replace(tmp, caminho)
+    logger.info("Campo {} atualizado em {}", campo, caminho)
+
+
+def regenerar_campo(roteiro_id: int, campo: str, instrucoes: str = None, agente: Agent = None,
+                    db_path: str = None) -> Any:
+    """
+    Regenera um campo de um roteiro gravado e grava só esse campo.
+
+    Args:
+        roteiro_id (int): ID do roteiro no banco
+        campo (str): ``postagem_comunidade`` ou um campo de ``DetailVideoYouTube``
+        instrucoes (str, opcional): O que mudar em relação ao valor atual
+        agente (Agent, opcional): Agente com ``response_model=modelo_campo(campo)``
+
+    Returns:
+        O novo valor do campo
+    """
+    modelo = modelo_campo(campo)
+    roteiro = utils.get_roteiro(roteiro_id, db_path)
+    if roteiro is None:
+        raise ValueError(f"Roteiro {roteiro_id} não encontrado")
+    info_video = None
+    if CAMPOS[campo] is DetailVideoYouTube:
+        info_video = utils.get_info_video(roteiro_id, db_path)
+        if info_video is None:
+            raise ValueError(f"Roteiro {roteiro_id} não tem informações de vídeo")
+
+    prompt = _prompt(campo, roteiro, info_video, instrucoes)
+    logger.info("Regenerando {} do roteiro {}", campo, roteiro_id)
+    resposta, duracao = roteador.executar("campo", prompt, lambda modelo: criar_agente(campo, modelo), MODEL_ID,
+                                          tipo=roteiro.tipo, agente=agente,
+                                          tokens=estimar_tokens(system_prompt, prompt) + TOKENS_SAIDA_ESTIMADOS)
+    registrar_execucao(resposta, f"campo:{campo}", roteiro_id, duracao, modelo_usado(resposta, MODEL_ID))
+    valor = getattr(repair.garantir_modelo(resposta.content, modelo), campo)
+
+    if info_video is not None:
+        utils.update_info_video_campo(roteiro_id, campo, valor, db_path)
+    else:
+        utils.update_roteiro_campo(roteiro_id, campo, valor, db_path)
+        _atualizar_json(roteiro, campo, valor)
+    logger.success("{} do roteiro {} regenerado em {:.1f}s", campo, roteiro_id, duracao)
+    return valor
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(find_dotenv())
+
+    parser = argparse.ArgumentParser(description="Regenera um campo de um roteiro gravado")
+    parser.add_argument("id", type=int)
+    parser.add_argument("campo", choices=sorted(CAMPOS))
+    parser.add_argument("--instrucoes", default=None)
+    args = parser.parse_args()
+    print(regenerar_campo(args.id, args.campo, args.instrucoes))
@@ -0,0 +1,240 @@
+"""
+Reparo local de saídas estruturadas que não validam no modelo pydantic.
+
+Quando o agno não consegue converter a resposta (JSON truncado, ``tags`` como texto em
+vez de lista, ``versiculos_utilizados`` ausente...), ``run().content`` chega como texto.
+Antes de gastar outra geração completa, ``garantir_modelo`` tenta, nesta ordem:
+
+1. ler o JSON de forma tolerante: cercas de código, texto em volta e JSON truncado
+   (fecha a string e as chaves abertas, ou descarta o último membro incompleto);
+2. coagir tipos óbvios (texto -> lista, lista -> texto, enum sem diferenciar maiúsculas);
+3. preencher campos deriváveis (padrões do chamador e funções como ``derivar_roteiro``);
+4. só então, um pedido curto ao modelo: "corrija este JSON" para o schema.
+"""
+import json
+import os
+import re
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Type, get_args, get_origin
+
+from agno.agent import Agent
+from agno.models.openai import OpenAIChat
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from src.accounting import registrar_execucao
+from src.model_router import TIMEOUT_MODELO, modelo_usado, roteador
+from src.rate_limiter import estimar_tokens
+
+MODEL_ID = "gpt-4o-mini"
+# Parte do texto original enviada no pedido de correção
+LIMITE_CARACTERES_REPARO = 24000
+
+_CERCA = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_SEPARADORES_LISTA = re.compile(r"\s*(?:,|;|\n)\s*")
+
+
+# ------------------------------------------------------------------------- #
+# JSON tolerante
+# ------------------------------------------------------------------------- #
+def _fechar(texto: str, pilha: List[str]) -> str:
+    return texto.rstrip().rstrip(",") + "".join(reversed(pilha))
+
+
+def ler_json_parcial(texto: str) -> Optional[Any]:
+    """
+    Lê o primeiro objeto/lista JSON de ``texto``, completando-o se estiver truncado.
+    Devolve None se não houver nada aproveitável.
+    """
+    texto = _CERCA.sub("", texto or "")
+    inicio = min((i for i in (texto.find("{"), texto.find("[")) if i >= 0), default=-1)
+    if inicio < 0:
+        return None
+    texto = texto[inicio:]
+
+    pilha: List[str] = []
+    cortes: List[tuple[int, List[str]]] = []  # pontos onde o JSON pode ser fechado
+    em_string = escape = False
+    for i, c in enumerate(texto):
+        if em_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                em_string = False
+            continue
+        if c == '"':
+            em_string = True
+        elif c in "{[":
+            pilha.append("}" if c == "{" else "]")
+            cortes.append((i + 1, list(pilha)))
+        elif c in "}]":
+            if pilha:
+                pilha.pop()
+            if not pilha:
+                try:
+                    return json.loads(texto[:i + 1])
+                except ValueError:
+                    break
+            cortes.append((i + 1, list(pilha)))
+        elif c == ",":
+            cortes.append((i, list(pilha)))
+
+    # Truncado: primeiro fecha o que estiver aberto (preserva um texto longo cortado no meio)
+    aberto = texto[:-1] if escape else texto
+    tentativas = [_fechar(aberto + ('"' if em_string else ""), pilha)]
+    # Senão, descarta o último membro incompleto, voltando pelos pontos seguros
+    tentativas += [_fechar(texto[:pos], p) for pos, p in reversed(cortes[-20:])]
+    for tentativa in tentativas:
+        try:
+            return json.loads(tentativa)
+        except ValueError:
+            continue
+    return None
+
+
+# ------------------------------------------------------------------------- #
+# Coerção e campos deriváveis
+# ------------------------------------------------------------------------- #
+def _para_lista(valor: str) -> List[str]:
+    partes = [p for p in _SEPARADORES_LISTA.split(valor.strip()) if p]
+    # "#fé #esperança" sem vírgulas
+    if len(partes) == 1 and partes[0].count("#") > 1:
+        partes = partes[0].split()
+    return [p.strip().strip('"') for p in partes]
+
+
+def coagir(dados: Dict[str, Any], modelo: Type[BaseModel]) -> Dict[str, Any]:
+    """Corrige incompatibilidades óbvias de tipo nos campos de ``modelo``."""
+    dados = dict(dados)
+    for nome, campo in modelo.model_fields.items():
+        if nome not in dados:
+            continue
+        valor, tipo = dados[nome], campo.annotation
+        if valor is None:
+            if get_origin(tipo) is list:
+                dados[nome] = []
+            elif not campo.is_required():
+                del dados[nome]
+        elif get_origin(tipo) is list:
+            item = (get_args(tipo) or (str,))[0]
+            if isinstance(valor, str) and item is str:
+                dados[nome] = _para_lista(valor)
+            elif isinstance(valor, list) and item is str:
+                dados[nome] = [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in valor]
+            elif isinstance(valor, dict):
+                dados[nome] = [valor]
+        elif tipo is str:
+            if isinstance(valor, list):
+                dados[nome] = "\n".join(str(v) for v in valor)
+            elif isinstance(valor, (int, float)):
+                dados[nome] = str(valor)
+        elif isinstance(tipo, type) and issubclass(tipo, Enum) and isinstance(valor, str):
+            for membro in tipo:
+                if valor.strip().lower() in (str(membro.value).lower(), membro.name.lower()):
+                    dados[nome] = membro
+    return dados
+
+
+def derivar_roteiro(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """``versiculos_utilizados`` ausente: as referências dos blocos do texto."""
+    if not dados.get("versiculos_utilizados") and (dados.get("roteiro") or dados.get("blocos")):
+        from src.validation import extrair_blocos
+
+        texto = dados.get("roteiro") or dados.get("blocos")
+        dados["versiculos_utilizados"] = list(dict.fromkeys(b.referencia for b in extrair_blocos(texto)))
+    return dados
+
+
+def derivar_detalhes(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """``hashtags`` a partir das tags, ou o contrário."""
+    if not dados.get("hashtags") and dados.get("tags"):
+        dados["hashtags"] = ["#" + re.sub(r"\s+", "", t.lstrip("#")) for t in dados["tags"][:5]]
+    if not dados.get("tags") and dados.get("hashtags"):
+        dados["tags"] = [h.lstrip("#") for h in dados["hashtags"]]
+    return dados
+
+
+def reparar(
+        conteudo: Any,
+        modelo: Type[BaseModel],
+        padroes: Dict[str, Any] = None,
+        derivar: Callable[[Dict[str, Any]], Dict[str, Any]] = None
+) -> tuple[Optional[BaseModel], str]:
+    """
+    Reparo só local. Devolve o modelo validado (ou None) e a descrição do último erro.
+    """
+    if isinstance(conteudo, modelo):
+        return conteudo, ""
+    if isinstance(conteudo, BaseModel):
+        dados = conteudo.model_dump()
+    elif isinstance(conteudo, dict):
+        dados = conteudo
+    elif isinstance(conteudo, str):
+        dados = ler_json_parcial(conteudo)
+        if not isinstance(dados, dict):
+            return None, "JSON ilegível"
+    else:
+        return None, f"conteúdo do tipo {type(conteudo).__name__}"
+
+    dados = coagir(dados, modelo)
+    for campo, valor in (padroes or {}).items():
+        if dados.get(campo) in (None, "", []):
+            dados[campo] = valor
+    if derivar is not None:
+        dados = derivar(dados)
+    try:
+        return modelo.model_validate(dados), ""
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def reparar_com_modelo(bruto: str, modelo: Type[BaseModel], erro: str, agente: Agent = None) -> Optional[BaseModel]:
+    """Pedido curto ao modelo para corrigir o JSON, quando o reparo local não basta."""
+    prompt = (f"O JSON abaixo deveria seguir o schema de {modelo.__name__}, mas é inválido ({erro}). "
+              "Devolva o mesmo conteúdo corrigido, sem inventar informações além das necessárias "
+              f"para completar os campos obrigatórios.\n\nJSON:\n{bruto[:LIMITE_CARACTERES_REPARO]}")
+
+    def criar_agente(modelo_id: str) -> Agent:
+        return Agent(
+            model=OpenAIChat(id=modelo_id, temperature=0, timeout=TIMEOUT_MODELO,
+                             base_url=os.environ.get("OPENAI_BASE_URL") or None),
+            description="Agente que corrige JSON inválido",
+            response_model=modelo,
+        )
+
+    resposta, duracao = roteador.executar("reparo", prompt, criar_agente, MODEL_ID, agente=agente,
+                                          tokens=estimar_tokens(prompt) * 2)
+    registrar_execucao(resposta, "reparo", None, duracao, modelo_usado(resposta, MODEL_ID))
+    return resposta.content if isinstance(resposta.content, modelo) else None
+
+
+def garantir_modelo(
+        conteudo: Any,
+        modelo: Type[BaseModel],
+        padroes: Dict[str, Any] = None,
+        derivar: Callable[[Dict[str, Any]], Dict[str, Any]] = None,
+        agente: Agent = None
+) -> BaseModel:
+    """
+    ``conteudo`` como instância de ``modelo``: direto se já for, reparado localmente
+    se possível, ou corrigido por um pedido curto ao modelo.
+
+    Raises:
+        ValueError: Se nem o reparo local nem o pedido de correção produzirem um modelo válido
+    """
+    if isinstance(conteudo, modelo):
+        return conteudo
+    objeto, erro = reparar(conteudo, modelo, padroes, derivar)
+    if objeto is not None:
+        logger.warning("Saída de {} reparada localmente", modelo.__name__)
+        return objeto
+    if not isinstance(conteudo, str) or not conteudo.strip():
+        raise ValueError(f"Saída inválida para {modelo.__name__}: {erro}")
+
+    logger.warning("Reparo local de {} falhou ({}); pedindo correção ao modelo", modelo.__name__, erro)
+    objeto = reparar_com_modelo(conteudo, modelo, erro, agente)
+    if objeto is None:
+        raise ValueError(f"Saída inválida para {modelo.__name__}: {erro}")
+    return objeto
@@ -0,0 +1,76 @@
+"""
+Contagem local de palavras e tempo de leitura dos roteiros, e o pedido de continuação.
+
+Quando o roteiro gerado fica abaixo da extensão pedida, em vez de gerar tudo de novo o
+agente recebe só um resumo (tema, referências já usadas e quantas palavras faltam) e
+devolve blocos de versículos adicionais, que são inseridos depois do último bloco.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict
+
+from src.models import ContinuacaoRoteiro, RoteiroBiblico, TipoRoteiro
+from src.validation import extrair_blocos
+
+# Faixa de palavras pedida no prompt de cada tipo
+PALAVRAS_ALVO: Dict[TipoRoteiro, tuple[int, int]] = {
+    TipoRoteiro.LONGO: (2000, 3000),
+    TipoRoteiro.SHORT: (150, 220),
+}
+# Ritmo de leitura em voz alta, pausado
+PALAVRAS_POR_MINUTO = 150
+
+_PALAVRA = re.compile(r"\w+(?:[-']\w+)*")
+
+
+def contar_palavras(texto: str) -> int:
+    return sum(1 for _ in _PALAVRA.finditer(texto or ""))
+
+
+@dataclass(frozen=True)
+class Extensao:
+    palavras: int
+    minimo: int
+    maximo: int
+
+    @property
+    def minutos(self) -> float:
+        """Tempo de leitura estimado."""
+        return self.palavras / PALAVRAS_POR_MINUTO
+
+    @property
+    def faltam(self) -> int:
+        return max(self.minimo - self.palavras, 0)
+
+
+def medir(roteiro: RoteiroBiblico) -> Extensao:
+    minimo, maximo = PALAVRAS_ALVO.get(TipoRoteiro(roteiro.tipo), PALAVRAS_ALVO[TipoRoteiro.LONGO])
+    return Extensao(contar_palavras(roteiro.roteiro), minimo, maximo)
+
+
+def prompt_continuacao(roteiro: RoteiroBiblico, extensao: Extensao) -> str:
+    """Pedido de blocos adicionais com um resumo do roteiro, sem reenviar o texto."""
+    usados = ", ".join(roteiro.versiculos_utilizados) or "nenhum"
+    return (
+        f"Um roteiro {TipoRoteiro(roteiro.tipo).value} sobre o tema '{roteiro.tema}' tem {extensao.palavras} palavras "
+        f"e precisa de pelo menos {extensao.minimo}.\n\n"
+        f"VERSÍCULOS JÁ UTILIZADOS (não repita): {usados}\n\n"
+        f"Acrescente de {extensao.faltam} a {extensao.maximo - extensao.palavras} palavras em novos blocos de versículos "
+        "sobre o mesmo tema:\n"
+        "- Use a ferramenta lookup_verse para buscar os versículos\n"
+        "- Cada bloco começa com a referência 'Livro Capítulo:Versículo-Versículo' numa linha e o texto na seguinte\n"
+        "- Separe os blocos com uma linha em branco\n"
+        "- Apenas versículos: sem introduções, comentários, transições ou convite final"
+    )
+
+
+def anexar(roteiro: RoteiroBiblico, continuacao: ContinuacaoRoteiro) -> None:
+    """Insere os novos blocos depois do último bloco de versículos (antes do convite final, se houver)."""
+    novos = continuacao.blocos.strip()
+    if not novos:
+        return
+    texto = roteiro.roteiro.rstrip()
+    blocos = extrair_blocos(texto)
+    corte = blocos[-1].fim if blocos else len(texto)
+    roteiro.roteiro = f"{texto[:corte]}\n\n{novos}{texto[corte:]}"
+    roteiro.versiculos_utilizados = list(dict.fromkeys(roteiro.versiculos_utilizados + continuacao.versiculos_utilizados))
@@ -0,0 +1,84 @@
+"""
+Serialização JSON dos modelos para a persistência.
+
+Cada forma de um ``RoteiroBiblico`` (JSON compacto, JSON indentado, JSON de cada coluna
+de lista do SQLite) é gerada só quando alguém a pede, pelo serializador do pydantic (em
+Rust), e guardada: gravar o mesmo modelo de novo (o arquivo em ``roteiros_json`` mais de
+uma vez, uma nova linha no SQLite) reaproveita os bytes em vez de serializar outra vez.
+No caminho padrão isso dá um dump indentado do modelo e um das listas pequenas de cada coluna.
+
+O cache fica fora do modelo (a igualdade do pydantic compara os atributos privados)
+e é invalidado quando algum campo é reatribuído. Mutações dentro de uma lista
+(``roteiro.referencias.append(...)``) não são percebidas: reatribua o campo.
+
+Com o ``orjson`` instalado as listas das colunas usam ``orjson.dumps``.
+"""
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+# Grava os arquivos de roteiros_json sem indentação (menores e mais rápidos de escrever)
+JSON_COMPACTO = os.getenv("ROTEIROS_JSON_COMPACTO", "").lower() in ("1", "true", "sim")
+
+_LISTA = TypeAdapter(List[str])
+
+
+def json_lista(valores: List[str]) -> str:
+    """Lista de strings como JSON compacto, com acentos sem escape, para colunas TEXT."""
+    if orjson is not None:
+        return orjson.dumps(valores).decode("utf-8")
+    return _LISTA.dump_json(valores).decode("utf-8")
+
+
+@dataclass
+class _Entrada:
+    ref: weakref.ref
+    valores: tuple
+    compacto: bytes = None
+    indentado: bytes = None
+    colunas: Dict[str, str] = field(default_factory=dict)
+
+
+_cache: Dict[int, _Entrada] = {}
+
+
+def _entrada(modelo: BaseModel) -> _Entrada:
+    chave = id(modelo)
+    valores = tuple(modelo.__dict__.values())
+    entrada = _cache.get(chave)
+    if (entrada is not None and entrada.ref() is modelo and len(entrada.valores) == len(valores)
+            and all(a is b for a, b in zip(entrada.valores, valores))):
+        return entrada
+    # A entrada guarda referências aos valores, então um id reaproveitado não engana a comparação
+    entrada = _Entrada(weakref.ref(modelo, lambda _, c=chave: _cache.pop(c, None)), valores)
+    _cache[chave] = entrada
+    return entrada
+
+
+def para_json(modelo: BaseModel, compacto: bool = True) -> bytes:
+    """Bytes JSON (UTF-8) do modelo, serializado no máximo uma vez por forma, e só a pedida."""
+    entrada = _entrada(modelo)
+    if compacto:
+        if entrada.compacto is None:
+            entrada.compacto = modelo.model_dump_json().encode("utf-8")
+        return entrada.compacto
+    if entrada.indentado is None:
+        entrada.indentado = modelo.model_dump_json(indent=2).encode("utf-8")
+    return entrada.indentado
+
+
+def colunas_lista(modelo: BaseModel, *campos: str) -> Dict[str, str]:
+    """JSON de cada campo de lista pedido, reaproveitado entre gravações do mesmo modelo."""
+    entrada = _entrada(modelo)
+    for campo in campos:
+        if campo not in entrada.colunas:
+            entrada.colunas[campo] = json_lista(getattr(modelo, campo))
+    return {campo: entrada.colunas[campo] for campo in campos}
@@ -0,0 +1,350 @@
+"""
+Serviço HTTP de geração de roteiros (só biblioteca padrão).
+
+    POST /roteiros                {"tema": "...", "tipo": "Short", "referencias": [...]}  -> 202 {"id": ...}
+    GET  /roteiros/{id}           estado e, quando concluído, roteiro e informações do vídeo
+    GET  /roteiros/{id}/eventos   progresso em Server-Sent Events até o fim da tarefa
+    GET  /saude                   tamanho da fila e tarefas em andamento
+
+Os pedidos entram numa fila em memória limitada; com a fila cheia o serviço responde
+429 com ``Retry-After``. Cada etapa (roteiro, detalhes) tem seu próprio limite de
+execuções simultâneas. No SIGTERM/SIGINT o serviço para de aceitar pedidos, cancela o
+que ainda está na fila e espera as chamadas ao modelo em andamento terminarem.
+
+    python -m src.server --porta 8000 --fila 32 --max-roteiro 2 --max-detalhes 4
+"""
+import argparse
+import json
+import queue
+import re
+import signal
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.logging_config import configurar_logging
+from src.models import DetailVideoYouTube, RoteiroBiblico, TipoRoteiro
+
+NA_FILA = "na_fila"
+GERANDO_ROTEIRO = "gerando_roteiro"
+GERANDO_DETALHES = "gerando_detalhes"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+CANCELADO = "cancelado"
+FINAIS = {CONCLUIDO, ERRO, CANCELADO}
+
+
+class FilaCheia(Exception):
+    pass
+
+
+class ServicoEncerrando(Exception):
+    pass
+
+
+@dataclass
+class Tarefa:
+    tema: str
+    tipo: TipoRoteiro
+    referencias: List[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = NA_FILA
+    roteiro_id: Optional[int] = None
+    roteiro: Optional[RoteiroBiblico] = None
+    info_video: Optional[DetailVideoYouTube] = None
+    erro: Optional[str] = None
+    eventos: List[Dict[str, Any]] = field(default_factory=list)
+    mudou: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    def atualizar(self, status: str, **dados) -> None:
+        with self.mudou:
+            self.status = status
+            self.eventos.append({"status": status, "em": datetime.now().isoformat(), **dados})
+            self.mudou.notify_all()
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "tema": self.tema,
+            "tipo": self.tipo.value,
+            "referencias": self.referencias,
+            "status": self.status,
+            "roteiro_id": self.roteiro_id,
+            "roteiro": self.roteiro.model_dump(mode="json") if self.roteiro else None,
+            "info_video": self.info_video.model_dump(mode="json") if self.info_video else None,
+            "erro": self.erro,
+        }
+
+
+class ServicoGeracao:
+    """
+    Fila limitada + threads de trabalho, cada uma com seus próprios agentes.
+
+    Args:
+        tamanho_fila: Pedidos aguardando; acima disso ``enviar`` levanta ``FilaCheia``.
+        max_roteiro: Execuções simultâneas do agente de roteiros.
+        max_detalhes: Execuções simultâneas do agente de detalhes.
+        max_tarefas_guardadas: Tarefas finalizadas mantidas em memória para consulta.
+    """
+
+    def __init__(
+            self,
+            tamanho_fila: int = 32,
+            max_roteiro: int = 2,
+            max_detalhes: int = 4,
+            max_tarefas_guardadas: int = 1000
+    ):
+        self.fila: "queue.Queue[Tarefa]" = queue.Queue(tamanho_fila)
+        self.sem_roteiro = threading.BoundedSemaphore(max_roteiro)
+        self.sem_detalhes = threading.BoundedSemaphore(max_detalhes)
+        self.max_tarefas_guardadas = max_tarefas_guardadas
+        self.tarefas: "OrderedDict[str, Tarefa]" = OrderedDict()
+        self.aceitando = True
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._parar = threading.Event()
+        # Threads suficientes para manter as duas etapas ocupadas ao mesmo tempo
+        self._threads = [threading.Thread(target=self._laco, name=f"servico-worker-{i}", daemon=True)
+                         for i in range(max_roteiro + max_detalhes)]
+        self.em_andamento = 0
+
+    def iniciar(self) -> None:
+        from src.agents import roteiro_agent, youtube_detail_agent
+        roteiro_agent.preparar_storage()
+        youtube_detail_agent.preparar_storage()
+
+        for t in self._threads:
+            t.start()
+
+    def enviar(self, tema: str, tipo: TipoRoteiro, referencias: List[str] = None) -> Tarefa:
+        if not self.aceitando:
+            raise ServicoEncerrando()
+        tarefa = Tarefa(tema, TipoRoteiro(tipo), referencias or [])
+        tarefa.atualizar(NA_FILA)
+        with self._lock:
+            self.tarefas[tarefa.id] = tarefa
+            self._podar()
+        try:
+            self.fila.put_nowait(tarefa)
+        except queue.Full:
+            with self._lock:
+                self.tarefas.pop(tarefa.id, None)
+            raise FilaCheia()
+        logger.info("Tarefa {} na fila: tema='{}', tipo='{}'", tarefa.id, tema, tarefa.tipo.value)
+        return tarefa
+
+    def obter(self, tarefa_id: str) -> Optional[Tarefa]:
+        with self._lock:
+            return self.tarefas.get(tarefa_id)
+
+    def encerrar(self, timeout: float = None) -> None:
+        """Para de aceitar pedidos, cancela os que não começaram e espera os em andamento."""
+        logger.info("Encerrando serviço: drenando chamadas em andamento")
+        self.aceitando = False
+        while True:
+            try:
+                tarefa = self.fila.get_nowait()
+            except queue.Empty:
+                break
+            tarefa.atualizar(CANCELADO)
+        self._parar.set()
+        for t in self._threads:
+            t.join(timeout)
+        logger.success("Serviço encerrado")
+
+    # ------------------------------------------------------------------ #
+    def _podar(self) -> None:
+        excedente = len(self.tarefas) - self.max_tarefas_guardadas
+        for tarefa_id in [i for i, t in self.tarefas.items() if t.status in FINAIS][:max(excedente, 0)]:
+            del self.tarefas[tarefa_id]
+
+    def _agentes(self):
+        if not hasattr(self._local, "roteiro"):
+            from src.agents import roteiro_agent, youtube_detail_agent
+            self._local.roteiro = roteiro_agent.criar_agente()
+            self._local.detalhes = youtube_detail_agent.criar_agente()
+        return self._local.roteiro, self._local.detalhes
+
+    def _laco(self) -> None:
+        while not self._parar.is_set():
+            # Só retira um pedido da fila quando a etapa de roteiro tem vaga: assim o que
+            # está esperando fica na fila (e conta para o 429 e para o cancelamento)
+            if not self.sem_roteiro.acquire(timeout=0.2):
+                continue
+            try:
+                tarefa = self.fila.get(timeout=0.2)
+            except queue.Empty:
+                self.sem_roteiro.release()
+                continue
+            with self._lock:
+                self.em_andamento += 1
+            try:
+                self._processar(tarefa)
+            except Exception as e:
+                tarefa.erro = f"{type(e).__name__}: {e}"
+                logger.error("Tarefa {} falhou: {}", tarefa.id, tarefa.erro)
+                tarefa.atualizar(ERRO, erro=tarefa.erro)
+            finally:
+                with self._lock:
+                    self.em_andamento -= 1
+
+    def _processar(self, tarefa: Tarefa) -> None:
+        """Roda as duas etapas; chamado já com uma vaga de ``sem_roteiro`` reservada."""
+        from src.agents.roteiro_agent import gerar_roteiro
+        from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+
+        try:
+            agente_roteiro, agente_detalhes = self._agentes()
+            tarefa.atualizar(GERANDO_ROTEIRO)
+            tarefa.roteiro, tarefa.roteiro_id = gerar_roteiro(tarefa.tema, tarefa.tipo, tarefa.referencias,
+                                                              agente=agente_roteiro)
+        finally:
+            self.sem_roteiro.release()
+        with self.sem_detalhes:
+            tarefa.atualizar(GERANDO_DETALHES, roteiro_id=tarefa.roteiro_id)
+            tarefa.info_video = gerar_detail_video_youtube(tarefa.roteiro, tarefa.roteiro_id, agente=agente_detalhes)
+        tarefa.atualizar(CONCLUIDO, roteiro_id=tarefa.roteiro_id)
+        logger.success("Tarefa {} concluída: roteiro_id={}", tarefa.id, tarefa.roteiro_id)
+
+
+class ServidorRoteiros(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco: tuple[str, int], servico: ServicoGeracao):
+        super().__init__(endereco, _RoteirosHandler)
+        self.servico = servico
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+
+_ROTA_TAREFA = re.compile(r"^/roteiros/([0-9a-f]+)(/eventos)?/?$")
+
+
+class _RoteirosHandler(BaseHTTPRequestHandler):
+    server: ServidorRoteiros
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.opt(lazy=True).debug("servidor: {}", lambda: format % args)
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/roteiros":
+            self._json(404, {"erro": "Rota não encontrada"})
+            return
+        tamanho = int(self.headers.get("Content-Length", 0))
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+            tema = corpo["tema"]
+            tipo = TipoRoteiro(corpo.get("tipo", TipoRoteiro.LONGO.value))
+            referencias = list(corpo.get("referencias") or [])
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+            self._json(400, {"erro": "Envie JSON com 'tema' e, opcionalmente, 'tipo' (Video|Short) e 'referencias'"})
+            return
+        try:
+            tarefa = self.server.servico.enviar(tema, tipo, referencias)
+        except FilaCheia:
+            self._json(429, {"erro": "Fila cheia, tente novamente mais tarde"}, {"Retry-After": "5"})
+            return
+        except ServicoEncerrando:
+            self._json(503, {"erro": "Serviço em encerramento"})
+            return
+        self._json(202, {"id": tarefa.id, "status": tarefa.status}, {"Location": f"/roteiros/{tarefa.id}"})
+
+    def do_GET(self) -> None:
+        servico = self.server.servico
+        if self.path.rstrip("/") == "/saude":
+            self._json(200, {"aceitando": servico.aceitando, "fila": servico.fila.qsize(),
+                             "em_andamento": servico.em_andamento})
+            return
+        m = _ROTA_TAREFA.match(self.path)
+        tarefa = servico.obter(m.group(1)) if m else None
+        if tarefa is None:
+            self._json(404, {"erro": "Tarefa não encontrada"})
+        elif m.group(2):
+            self._eventos(tarefa)
+        else:
+            self._json(200, tarefa.como_dict())
+
+    # -------------------------------------------------------------- #
+    def _json(self, status: int, dados: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _eventos(self, tarefa: Tarefa) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        enviados = 0
+        while True:
+            with tarefa.mudou:
+                # Acorda periodicamente para mandar keep-alive e detectar clientes desconectados
+                tarefa.mudou.wait_for(lambda: len(tarefa.eventos) > enviados, timeout=15)
+                novos = tarefa.eventos[enviados:]
+            try:
+                if not novos:
+                    self.wfile.write(b": keep-alive\n\n")
+                for evento in novos:
+                    self.wfile.write(f"event: {evento['status']}\n".encode("utf-8") + b"data: " +
+                                     json.dumps(evento, ensure_ascii=False).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            enviados += len(novos)
+            if novos and novos[-1]["status"] in FINAIS:
+                return
+
+
+def main(argv=None) -> None:
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(find_dotenv())
+    configurar_logging()
+
+    parser = argparse.ArgumentParser(description="Serviço HTTP de geração de roteiros")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--fila", type=int, default=32, help="Pedidos aguardando antes de responder 429")
+    parser.add_argument("--max-roteiro", type=int, default=2)
+    parser.add_argument("--max-detalhes", type=int, default=4)
+    parser.add_argument("--timeout-encerramento", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    servico = ServicoGeracao(args.fila, args.max_roteiro, args.max_detalhes)
+    servico.iniciar()
+    server = ServidorRoteiros((args.host, args.porta), servico)
+
+    def _sinal(signum, _frame):
+        logger.info("Sinal {} recebido", signal.Signals(signum).name)
+        # shutdown() bloqueia até serve_forever sair, então roda fora da thread principal
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _sinal)
+    signal.signal(signal.SIGINT, _sinal)
+    logger.info("Serviço de roteiros ouvindo em {}", server.url)
+    try:
+        server.serve_forever()
+    finally:
+        servico.encerrar(args.timeout_encerramento)
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
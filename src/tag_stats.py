@@ -0,0 +1,229 @@
+"""
+Estatísticas de tags e hashtags já publicadas, para o agente de detalhes reaproveitá-las.
+
+Mantidas de forma incremental por ``save_info_video_sqlite`` (e por ``update_info_video_campo``
+quando a regeneração troca tags ou hashtags), na mesma transação que grava o vídeo, em três
+tabelas agregadas:
+
+- ``tags_frequencia``: usos e último uso de cada tag/hashtag;
+- ``tags_coocorrencia``: quantas vezes duas tags do mesmo tipo saíram juntas;
+- ``tags_tema``: usos e último uso de cada tag por palavra do tema (as mesmas palavras
+  normalizadas de ``topic_index``), que dá a relevância e a recência por tema.
+
+Na primeira gravação as tabelas são preenchidas a partir de ``info_videos_youtube``; depois
+uma consulta lê só as linhas das palavras do tema (chave primária), sem dividir strings.
+``gerar_detail_video_youtube`` põe as ``TAGS_SUGERIDAS`` melhores no prompt.
+
+    python -m src.tag_stats "Ansiedade e paz" -k 10
+"""
+import argparse
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from loguru import logger
+
+from src import utils
+from src.topic_index import palavras
+
+# Quantas tags (e hashtags) do histórico sugerir no prompt de detalhes (0 desliga)
+TAGS_SUGERIDAS = int(os.getenv("TAGS_SUGERIDAS", "15"))
+# Em quantos dias o peso de um uso antigo cai pela metade
+MEIA_VIDA_DIAS = float(os.getenv("TAGS_MEIA_VIDA_DIAS", "90"))
+# Peso das tags que costumam sair junto com as do tema, relativo a um uso no tema
+PESO_COOCORRENCIA = 0.3
+# Quantas tags do tema expandir pela coocorrência
+_SEMENTES_COOCORRENCIA = 5
+
+TAG = "tag"
+HASHTAG = "hashtag"
+
+CREATE_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS tags_frequencia
+    (
+        tipo       TEXT,
+        tag        TEXT,
+        usos       INTEGER,
+        ultimo_uso TEXT,
+        PRIMARY KEY (tipo, tag)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS tags_coocorrencia
+    (
+        tipo  TEXT,
+        tag_a TEXT,
+        tag_b TEXT,
+        usos  INTEGER,
+        PRIMARY KEY (tipo, tag_a, tag_b)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS tags_tema
+    (
+        palavra    TEXT,
+        tipo       TEXT,
+        tag        TEXT,
+        usos       INTEGER,
+        ultimo_uso TEXT,
+        PRIMARY KEY (palavra, tipo, tag)
+    )
+    ''',
+)
+
+
+def _normalizar(tags: Iterable[str]) -> List[str]:
+    """Sem espaços extras nem repetições (ignorando maiúsculas), na ordem original."""
+    vistas = {}
+    for tag in tags:
+        tag = " ".join(tag.split())
+        if tag:
+            vistas.setdefault(tag.lower(), tag)
+    return list(vistas.values())
+
+
+def _somar(conn: sqlite3.Connection, chaves: Iterable[str], tipo: str, tags: Iterable[str], quando: str) -> None:
+    lista = _normalizar(tags)
+    conn.executemany('''
+        INSERT INTO tags_frequencia (tipo, tag, usos, ultimo_uso) VALUES (?, ?, 1, ?)
+        ON CONFLICT (tipo, tag) DO UPDATE SET usos = usos + 1, ultimo_uso = MAX(ultimo_uso, excluded.ultimo_uso)
+        ''', [(tipo, tag, quando) for tag in lista])
+    # Os dois sentidos de cada par, para a consulta partir de qualquer uma das tags
+    pares = [(tipo, a, b) for a in lista for b in lista if a != b]
+    conn.executemany('''
+        INSERT INTO tags_coocorrencia (tipo, tag_a, tag_b, usos) VALUES (?, ?, ?, 1)
+        ON CONFLICT (tipo, tag_a, tag_b) DO UPDATE SET usos = usos + 1
+        ''', pares)
+    conn.executemany('''
+        INSERT INTO tags_tema (palavra, tipo, tag, usos, ultimo_uso) VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT (palavra, tipo, tag) DO UPDATE SET usos = usos + 1,
+                                                       ultimo_uso = MAX(ultimo_uso, excluded.ultimo_uso)
+        ''', [(chave, tipo, tag, quando) for chave in chaves for tag in lista])
+
+
+def _subtrair(conn: sqlite3.Connection, chaves: Iterable[str], tipo: str, tags: Iterable[str]) -> None:
+    """Desfaz ``_somar`` (sem mexer no último uso), apagando as linhas que chegam a zero."""
+    lista = _normalizar(tags)
+    for tabela, colunas, linhas in (
+            ("tags_frequencia", ("tipo", "tag"), [(tipo, tag) for tag in lista]),
+            ("tags_coocorrencia", ("tipo", "tag_a", "tag_b"), [(tipo, a, b) for a in lista for b in lista if a != b]),
+            ("tags_tema", ("palavra", "tipo", "tag"), [(chave, tipo, tag) for chave in chaves for tag in lista])):
+        filtro = " AND ".join(f"{coluna} = ?" for coluna in colunas)
+        conn.executemany(f"UPDATE {tabela} SET usos = usos - 1 WHERE {filtro}", linhas)
+        conn.executemany(f"DELETE FROM {tabela} WHERE {filtro} AND usos <= 0", linhas)
+
+
+def _atualizar(conn: sqlite3.Connection, tema: str, tags: Iterable[str], hashtags: Iterable[str],
+               quando: str) -> None:
+    chaves = set(palavras(tema or ""))
+    _somar(conn, chaves, TAG, tags, quando)
+    _somar(conn, chaves, HASHTAG, hashtags, quando)
+
+
+def garantir_tabelas(conn: sqlite3.Connection) -> None:
+    """Cria as tabelas agregadas; se ainda não existiam, as preenche com os vídeos já gravados."""
+    if utils.tabela_existe(conn, "tags_frequencia"):
+        return
+    for create in CREATE_TABLES:
+        conn.execute(create)
+    if not utils.tabela_existe(conn, "info_videos_youtube"):
+        return
+    if utils.tabela_existe(conn, "roteiros_biblicos"):
+        consulta = ("SELECT r.tema, i.tags, i.hashtags, r.data_criacao FROM info_videos_youtube i "
+                    "LEFT JOIN roteiros_biblicos r ON r.id = i.roteiro_id ORDER BY i.id")
+    else:
+        consulta = "SELECT NULL, tags, hashtags, NULL FROM info_videos_youtube ORDER BY id"
+    quando = datetime.now().isoformat()
+    total = 0
+    for tema, tags, hashtags, data in conn.execute(consulta).fetchall():
+        _atualizar(conn, tema, (tags or "").split(", "), (hashtags or "").split(", "), data or quando)
+        total += 1
+    logger.info("Estatísticas de tags preenchidas com {} vídeos já gravados", total)
+
+
+def _tema(conn: sqlite3.Connection, roteiro_id: int) -> Optional[str]:
+    if not utils.tabela_existe(conn, "roteiros_biblicos"):
+        return None
+    linha = conn.execute("SELECT tema FROM roteiros_biblicos WHERE id = ?", (roteiro_id,)).fetchone()
+    return linha[0] if linha else None
+
+
+def registrar(conn: sqlite3.Connection, roteiro_id: int, tags: Iterable[str], hashtags: Iterable[str]) -> None:
+    """Soma um vídeo às estatísticas, na transação do chamador."""
+    garantir_tabelas(conn)
+    _atualizar(conn, _tema(conn, roteiro_id), tags, hashtags, datetime.now().isoformat())
+
+
+def substituir(conn: sqlite3.Connection, roteiro_id: int, tipo: str, antigas: Iterable[str],
+               novas: Iterable[str]) -> None:
+    """
+    Troca as tags (ou hashtags) de um vídeo já contado, na transação do chamador: tira as
+    antigas dos agregados e soma as novas. ``garantir_tabelas`` deve rodar antes de o vídeo
+    mudar, para um preenchimento inicial contar as antigas.
+    """
+    chaves = set(palavras(_tema(conn, roteiro_id) or ""))
+    _subtrair(conn, chaves, tipo, antigas)
+    _somar(conn, chaves, tipo, novas, datetime.now().isoformat())
+
+
+def _recencia(ultimo_uso: str, agora: datetime) -> float:
+    try:
+        dias = max(0.0, (agora - datetime.fromisoformat(ultimo_uso)).total_seconds() / 86400)
+    except (TypeError, ValueError):
+        return 1.0
+    return 0.5 ** (dias / MEIA_VIDA_DIAS)
+
+
+def sugerir(tema: str, tipo: str = TAG, k: int = TAGS_SUGERIDAS, db_path: str = None) -> List[str]:
+    """
+    As ``k`` tags (ou hashtags) mais relevantes para ``tema``: usos nas palavras do tema,
+    ponderados pela recência, mais as que costumam sair junto com elas; completa com as
+    mais usadas no canal quando o tema é novo.
+    """
+    if k <= 0:
+        return []
+    db_path = Path(db_path or utils.DB_PATH)
+    if not db_path.exists():  # sem criar um banco vazio só para consultar
+        return []
+    chaves = sorted(set(palavras(tema or "")))
+    agora = datetime.now()
+    conn = sqlite3.connect(db_path)
+    try:
+        if not utils.tabela_existe(conn, "tags_frequencia"):
+            return []
+        pontuacao: Counter = Counter()
+        if chaves:
+            for tag, usos, ultimo_uso in conn.execute(
+                    "SELECT tag, usos, ultimo_uso FROM tags_tema WHERE tipo = ? "
+                    f"AND palavra IN ({', '.join('?' * len(chaves))})", (tipo, *chaves)):
+                pontuacao[tag] += usos * _recencia(ultimo_uso, agora)
+        sementes = [tag for tag, _ in pontuacao.most_common(_SEMENTES_COOCORRENCIA)]
+        if sementes:
+            for tag, usos in conn.execute(
+                    "SELECT tag_b, SUM(usos) FROM tags_coocorrencia WHERE tipo = ? "
+                    f"AND tag_a IN ({', '.join('?' * len(sementes))}) GROUP BY tag_b", (tipo, *sementes)):
+                pontuacao[tag] += usos * PESO_COOCORRENCIA
+        sugestoes = [tag for tag, _ in pontuacao.most_common(k)]
+        if len(sugestoes) < k:
+            for (tag,) in conn.execute("SELECT tag FROM tags_frequencia WHERE tipo = ? "
+                                       "ORDER BY usos DESC, ultimo_uso DESC LIMIT ?", (tipo, k * 2)):
+                if len(sugestoes) == k:
+                    break
+                if tag not in pontuacao:
+                    sugestoes.append(tag)
+        return sugestoes
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra as tags e hashtags já publicadas mais relevantes para um tema")
+    parser.add_argument("tema")
+    parser.add_argument("-k", type=int, default=TAGS_SUGERIDAS)
+    args = parser.parse_args()
+    print("Tags:", ", ".join(sugerir(args.tema, TAG, args.k)))
+    print("Hashtags:", " ".join(sugerir(args.tema, HASHTAG, args.k)))
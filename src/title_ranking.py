@@ -0,0 +1,93 @@
+"""
+Ranking local de candidatos de título/thumbnail.
+
+Uma única chamada ao agente de detalhes devolve vários pares título + prompt de
+thumbnail; aqui eles são ordenados por uma pontuação barata, sem outra chamada ao modelo:
+
+- comprimento: 40 a 70 caracteres é o ideal, e acima de 100 o YouTube corta;
+- cobertura das palavras do tema (peso maior) e das tags;
+- emojis: um ou dois ajudam, nenhum ou muitos atrapalham;
+- títulos em caixa alta perdem pontos;
+- títulos parecidos com os já publicados (``info_videos_youtube``) ou com um candidato
+  mais bem colocado perdem muitos pontos.
+"""
+import difflib
+import re
+from typing import Iterable, List
+
+from src.models import CandidatoTitulo
+from src.topic_index import palavras
+
+COMPRIMENTO_IDEAL = (40, 70)
+COMPRIMENTO_MAXIMO = 100
+LIMIAR_SIMILARIDADE = 0.8
+
+_EMOJI = re.compile("[\U0001F300-\U0001FAFF☀-➿]")
+
+
+def _similaridade(a: str, b: str) -> float:
+    comparador = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    # real_quick_ratio e quick_ratio são limites superiores baratos da ratio
+    if comparador.real_quick_ratio() < LIMIAR_SIMILARIDADE or comparador.quick_ratio() < LIMIAR_SIMILARIDADE:
+        return 0.0
+    return comparador.ratio()
+
+
+def _normalizar(titulo: str) -> str:
+    return " ".join(palavras(titulo))
+
+
+def pontuar(titulo: str, tema: str, tags: Iterable[str] = (), existentes: Iterable[str] = ()) -> float:
+    """Pontuação de um título; ``existentes`` já normalizados com ``palavras``."""
+    pontos = 0.0
+    tamanho = len(titulo)
+    minimo, maximo = COMPRIMENTO_IDEAL
+    if tamanho > COMPRIMENTO_MAXIMO:
+        pontos -= 3
+    elif minimo <= tamanho <= maximo:
+        pontos += 1
+    else:
+        distancia = minimo - tamanho if tamanho < minimo else tamanho - maximo
+        pontos -= min(distancia / minimo, 1)
+
+    do_titulo = set(palavras(titulo))
+    do_tema = set(palavras(tema))
+    if do_tema:
+        pontos += 2 * len(do_tema & do_titulo) / len(do_tema)
+    das_tags = set(p for tag in tags for p in palavras(tag)) - do_tema
+    pontos += min(len(das_tags & do_titulo), 3) / 3
+
+    emojis = len(_EMOJI.findall(titulo))
+    pontos += -0.3 if emojis == 0 else 0.5 if emojis <= 2 else -0.5 * (emojis - 2)
+
+    letras = [c for c in titulo if c.isalpha()]
+    if len(letras) > 10 and sum(c.isupper() for c in letras) / len(letras) > 0.6:
+        pontos -= 1
+
+    normalizado = _normalizar(titulo)
+    repeticao = max((_similaridade(normalizado, e) for e in existentes), default=0.0)
+    if repeticao >= LIMIAR_SIMILARIDADE:
+        pontos -= 3 * repeticao
+    return round(pontos, 4)
+
+
+def ranquear(
+        candidatos: List[CandidatoTitulo],
+        tema: str,
+        tags: Iterable[str] = (),
+        existentes: Iterable[str] = ()
+) -> List[tuple[CandidatoTitulo, float]]:
+    """Candidatos com a pontuação, do melhor para o pior. Nenhum é descartado."""
+    tags = list(tags)
+    existentes = [_normalizar(t) for t in existentes if t]
+    pontuados = sorted(((c, pontuar(c.titulo, tema, tags, existentes)) for c in candidatos),
+                       key=lambda par: par[1], reverse=True)
+    # Quase repetições de um candidato mais bem colocado vão para o fim
+    resultado, vistos = [], []
+    for candidato, pontos in pontuados:
+        normalizado = _normalizar(candidato.titulo)
+        if any(_similaridade(normalizado, v) >= LIMIAR_SIMILARIDADE for v in vistos):
+            pontos = round(pontos - 3, 4)
+        vistos.append(normalizado)
+        resultado.append((candidato, pontos))
+    return sorted(resultado, key=lambda par: par[1], reverse=True)
@@ -0,0 +1,223 @@
+"""
+Índice de temas para versículos, para sugerir ``referencias`` antes da geração.
+
+Minerado dos roteiros já gravados: cada palavra do tema de um roteiro aponta para os
+``versiculos_utilizados`` nele, com peso pela frequência e pelo IDF da palavra (palavras
+que aparecem em muitos temas pesam menos). Opcionalmente também indexa o texto dos
+capítulos do cache em disco (``ChapterCache``), com peso menor.
+
+Cada palavra guarda sua lista já ordenada dos melhores versículos, então uma consulta
+só soma algumas dezenas de pesos: bem abaixo de um milissegundo. Quando o chamador não
+passa ``referencias`` e ``REFERENCIAS_AUTOMATICAS`` está ligado, ``gerar_roteiro`` põe as
+``k`` melhores sugestões no prompt (não em ``roteiro.referencias``, que guarda só as do
+chamador), o que poupa ao agente os turnos de ferramenta gastos procurando versículos.
+
+    python -m src.topic_index "Ansiedade e paz" -k 5
+"""
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src import utils
+
+# Quantas referências sugerir no prompt quando o chamador não passa nenhuma (0, o padrão, desliga)
+SUGESTOES_PADRAO = int(os.getenv("REFERENCIAS_AUTOMATICAS", "0"))
+# Peso de uma ocorrência no texto dos versículos, relativo a um uso num roteiro com o tema
+PESO_TEXTO = 0.2
+# Tamanho da lista ordenada guardada por palavra
+_TOPO_POR_PALAVRA = 50
+
+_PALAVRA = re.compile(r"\w+")
+_SUFIXO_TRADUCAO = re.compile(r"\s*\([^)]*\)\s*$")
+_URL_CAPITULO = re.compile(r"/[^/]+/([1-3]?[a-zçãéíóúâêôõ]{1,3})/(\d+)$")
+_STOPWORDS = frozenset("""
+    a ao aos as com como da das de do dos e em entre na nas no nos o os ou para pela pelas pelo pelos
+    por que se sem sob sobre sua suas seu seus um uma umas uns voce nao mais quando onde eu tu ele ela
+    nos vos eles elas meu minha teu tua nosso nossa isso esse essa este esta aquele aquela ja
+""".split())
+
+# Palavras terminadas em 's' que não são plurais (já sem acento, como saem de ``palavras``)
+_SEM_PLURAL = frozenset("""
+    jesus moises judas tomas barrabas satanas lucas marcos emaus atlas simples pires alferes
+    adeus apos atras
+""".split())
+_FINAIS_SEM_PLURAL = ("us", "ss", "is")
+_RADICAL_MINIMO = 4
+
+
+def palavras(texto: str) -> List[str]:
+    """Palavras normalizadas: minúsculas, sem acento, sem stopwords e com plural simples removido."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    resultado = []
+    for p in _PALAVRA.findall(texto):
+        if len(p) < 3 or p.isdigit() or p in _STOPWORDS:
+            continue
+        resultado.append(_singular(p))
+    return resultado
+
+
+def _singular(palavra: str) -> str:
+    """Tira o 's' final de plurais simples, preservando nomes e palavras que já terminam em 's'."""
+    if (len(palavra) - 1 < _RADICAL_MINIMO or not palavra.endswith("s")
+            or palavra.endswith(_FINAIS_SEM_PLURAL) or palavra in _SEM_PLURAL):
+        return palavra
+    return palavra[:-1]
+
+
+def normalizar_referencia(referencia: str) -> str:
+    """'Salmos 23:1 (NTLH)' -> 'Salmos 23:1'."""
+    return _SUFIXO_TRADUCAO.sub("", " ".join(referencia.split()))
+
+
+class IndiceTopicos:
+    """Índice invertido palavra -> referências ranqueadas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pesos: Dict[str, Counter] = defaultdict(Counter)  # palavra -> referência -> usos
+        self._temas_por_palavra: Counter = Counter()
+        self._texto: Dict[str, Counter] = defaultdict(Counter)  # palavra -> referência -> ocorrências
+        self._versiculos_por_palavra: Counter = Counter()
+        self._total_temas = 0
+        self._total_versiculos = 0
+        self._topo: Dict[str, List[tuple[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return self._total_temas
+
+    # ---------------------------- construção ---------------------------- #
+    def adicionar(self, tema: str, versiculos: Iterable[str]) -> None:
+        """Registra os versículos usados num roteiro sobre ``tema``."""
+        referencias = [normalizar_referencia(v) for v in versiculos if v and v.strip()]
+        chaves = set(palavras(tema))
+        if not referencias or not chaves:
+            return
+        with self._lock:
+            self._total_temas += 1
+            for chave in chaves:
+                self._temas_por_palavra[chave] += 1
+                self._pesos[chave].update(referencias)
+            # O IDF de todas as palavras mudou; as listas são refeitas sob demanda
+            self._topo.clear()
+
+    def adicionar_capitulo(self, livro: str, capitulo: str, verses: List[dict]) -> None:
+        """Indexa o texto de um capítulo (``[{"number": 1, "text": "..."}]``)."""
+        with self._lock:
+            for v in verses:
+                referencia = f"{livro} {capitulo}:{v['number']}"
+                self._total_versiculos += 1
+                chaves = palavras(v["text"])
+                for chave in set(chaves):
+                    self._versiculos_por_palavra[chave] += 1
+                for chave in chaves:
+                    self._texto[chave][referencia] += 1
+            self._topo.clear()
+
+    @classmethod
+    def construir(cls, db_path: str = None, cache_dir: str | Path = None) -> "IndiceTopicos":
+        """Minera os roteiros do banco e, se indicado, o texto do cache de capítulos."""
+        indice = cls()
+        for roteiro, _ in utils.iter_roteiros(columns=("tema", "versiculos_utilizados"), db_path=db_path):
+            indice.adicionar(roteiro.tema or "", roteiro.versiculos_utilizados or [])
+        if cache_dir is not None:
+            indice._indexar_cache(Path(cache_dir))
+        logger.info("Índice de temas construído: {} roteiros, {} versículos de texto",
+                    indice._total_temas, indice._total_versiculos)
+        return indice
+
+    def _indexar_cache(self, diretorio: Path) -> None:
+        from src.bible_tool import BibleLookupTool
+
+        for arquivo in diretorio.glob("*.json"):
+            try:
+                dados = json.loads(arquivo.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            m = _URL_CAPITULO.search(dados.get("url", ""))
+            if m:
+                slug, capitulo = m.groups()
+                self.adicionar_capitulo(BibleLookupTool.BOOK_ABBREVIATIONS.get(slug, slug.upper()), capitulo,
+                                        dados.get("verses", []))
+
+    # ------------------------------ consulta ----------------------------- #
+    def _lista(self, chave: str) -> List[tuple[str, float]]:
+        lista = self._topo.get(chave)
+        if lista is not None:
+            return lista
+        if chave not in self._pesos and chave not in self._texto:
+            return []
+        with self._lock:
+            pesos: Counter = Counter()
+            if chave in self._pesos:
+                idf = math.log(1 + self._total_temas / self._temas_por_palavra[chave])
+                for referencia, usos in self._pesos[chave].items():
+                    pesos[referencia] += usos * idf
+            if chave in self._texto:
+                idf = math.log(1 + self._total_versiculos / self._versiculos_por_palavra[chave])
+                for referencia, ocorrencias in self._texto[chave].items():
+                    pesos[referencia] += ocorrencias * idf * PESO_TEXTO
+            lista = self._topo[chave] = pesos.most_common(_TOPO_POR_PALAVRA)
+        return lista
+
+    def sugerir(self, tema: str, k: int = SUGESTOES_PADRAO) -> List[str]:
+        """As ``k`` referências mais associadas às palavras de ``tema``, da mais forte à mais fraca."""
+        if k <= 0:
+            return []
+        pontuacao: Counter = Counter()
+        for chave in set(palavras(tema)):
+            for referencia, peso in self._lista(chave):
+                pontuacao[referencia] += peso
+        return [referencia for referencia, _ in pontuacao.most_common(k)]
+
+
+_indice: Optional[IndiceTopicos] = None
+_indice_db: Optional[str] = None
+_indice_lock = threading.Lock()
+
+
+def indice_padrao() -> IndiceTopicos:
+    """Índice do banco atual, construído na primeira consulta do processo."""
+    global _indice, _indice_db
+    db_path = str(utils.DB_PATH)
+    with _indice_lock:
+        if _indice is None or _indice_db != db_path:
+            from src.bible_tool import BibleLookupTool
+
+            cache = BibleLookupTool._cache
+            _indice = IndiceTopicos.construir(db_path, cache.diretorio if cache is not None else None)
+            _indice_db = db_path
+        return _indice
+
+
+def sugerir_referencias(tema: str, k: int = None) -> List[str]:
+    """As ``k`` (padrão: ``REFERENCIAS_AUTOMATICAS``) referências sugeridas para ``tema``."""
+    k = SUGESTOES_PADRAO if k is None else k
+    if k <= 0:
+        return []
+    return indice_padrao().sugerir(tema, k)
+
+
+def registrar_roteiro(tema: str, versiculos: Iterable[str]) -> None:
+    """Mantém o índice do processo em dia com um roteiro recém-gravado."""
+    if _indice is not None and _indice_db == str(utils.DB_PATH):
+        _indice.adicionar(tema, versiculos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sugere referências para um tema a partir dos roteiros gravados")
+    parser.add_argument("tema")
+    parser.add_argument("-k", type=int, default=SUGESTOES_PADRAO or 5)
+    parser.add_argument("--cache-dir", default=None, help="Também indexa o texto dos capítulos em cache")
+    args = parser.parse_args()
+    for ref in IndiceTopicos.construir(cache_dir=args.cache_dir).sugerir(args.tema, args.k):
+        print(ref)
@@ -1,24 +1,82 @@
+import glob
 import json
 import sqlite3
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 from loguru import logger
 
-from src.models import RoteiroBiblico, DetailVideoYouTube
+from src import serialization
+from src.models import CandidatoTitulo, RoteiroBiblico, DetailVideoYouTube, TipoRoteiro
 
 OUT_DIR = Path(__file__).resolve().parent.parent / "roteiros_json"
 OUT_DIR.mkdir(exist_ok=True)
 
+DB_PATH = Path(__file__).resolve().parent.parent / "roteiros.sqlite3"
 
-def save_roteiro_json(roteiro: RoteiroBiblico) -> Path:
-    logger.info(f"Salvando roteiro: tema='{roteiro.tema}', tipo='{roteiro.tipo}'")
+CREATE_TABLE_ROTEIROS_BIBLICOS = '''
+    CREATE TABLE IF NOT EXISTS roteiros_biblicos
+    (
+        id                    INTEGER PRIMARY KEY AUTOINCREMENT,
+        tema                  TEXT,
+        data_criacao          TEXT,
+        roteiro               TEXT,
+        versiculos_utilizados TEXT,
+        tipo                  TEXT,
+        referencias           TEXT,
+        postagem_comunidade   TEXT
+    )
+'''
+
+CREATE_TABLE_INFO_VIDEOS_YOUTUBE = '''
+    CREATE TABLE IF NOT EXISTS info_videos_youtube
+    (
+        id               INTEGER PRIMARY KEY AUTOINCREMENT,
+        roteiro_id       INTEGER,
+        titulo           TEXT,
+        descricao        TEXT,
+        tags             TEXT,
+        hashtags         TEXT,
+        thumbnail_prompt TEXT,
+        FOREIGN KEY (roteiro_id) REFERENCES roteiros_biblicos (id)
+    )
+'''
+
+# A junção com a informação de vídeo mais recente (exportação, get_info_video) busca por roteiro_id
+CREATE_INDEX_INFO_VIDEOS_ROTEIRO = '''
+    CREATE INDEX IF NOT EXISTS idx_info_videos_roteiro ON info_videos_youtube (roteiro_id)
+'''
+
+CREATE_TABLE_CANDIDATOS_TITULO = '''
+    CREATE TABLE IF NOT EXISTS candidatos_titulo
+    (
+        id               INTEGER PRIMARY KEY AUTOINCREMENT,
+        roteiro_id       INTEGER,
+        posicao          INTEGER,
+        titulo           TEXT,
+        thumbnail_prompt TEXT,
+        pontuacao        REAL,
+        escolhido        INTEGER,
+        criado_em        TEXT,
+        FOREIGN KEY (roteiro_id) REFERENCES roteiros_biblicos (id)
+    )
+'''
+
+
+def save_roteiro_json(roteiro: RoteiroBiblico, compacto: bool = None) -> Path:
+    """
+    Grava o roteiro em ``roteiros_json``. Indentado por padrão; compacto com
+    ``compacto=True`` ou ``ROTEIROS_JSON_COMPACTO=1``.
+    """
+    if compacto is None:
+        compacto = serialization.JSON_COMPACTO
+    logger.info("Salvando roteiro: tema='{}', tipo='{}'", roteiro.tema, roteiro.tipo)
     ts = datetime.now().strftime("%Y%m%dT%H%M%SZ")
     f_name = f"{ts}_{roteiro.tipo}_{roteiro.tema.replace(' ', '_')}.json"
     path = OUT_DIR / f_name
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(roteiro.model_dump(mode="json"), f, ensure_ascii=False, indent=2)
-    logger.success(f"Roteiro salvo em {path}")
+    path.write_bytes(serialization.para_json(roteiro, compacto))
+    logger.success("Roteiro salvo em {}", path)
     return path
 
 
@@ -31,7 +89,7 @@ def save_roteiro_sqlite(roteiro: RoteiroBiblico, db_path: str = None) -> int:
         int: ID do roteiro inserido
     """
     if db_path is None:
-        db_path = str((Path(__file__).resolve().parent.parent / "roteiros.sqlite3"))
+        db_path = str(DB_PATH)
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     
@@ -42,19 +100,8 @@ def save_roteiro_sqlite(roteiro: RoteiroBiblico, db_path: str = None) -> int:
     except sqlite3.OperationalError:
         # Campo já existe, não faz nada
         pass
-    cur.execute('''
-                CREATE TABLE IF NOT EXISTS roteiros_biblicos
-                (
-                    id                    INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tema                  TEXT,
-                    data_criacao          TEXT,
-                    roteiro               TEXT,
-                    versiculos_utilizados TEXT,
-                    tipo                  TEXT,
-                    referencias           TEXT,
-                    postagem_comunidade   TEXT
-                )
-                ''')
+    cur.execute(CREATE_TABLE_ROTEIROS_BIBLICOS)
+    listas = serialization.colunas_lista(roteiro, "versiculos_utilizados", "referencias")
     cur.execute('''
                 INSERT INTO roteiros_biblicos (tema, data_criacao, roteiro, versiculos_utilizados,
                                                tipo, referencias, postagem_comunidade)
@@ -63,41 +110,34 @@ def save_roteiro_sqlite(roteiro: RoteiroBiblico, db_path: str = None) -> int:
                     roteiro.tema,
                     roteiro.data_criacao.isoformat(),
                     roteiro.roteiro,
-                    json.dumps(roteiro.versiculos_utilizados, ensure_ascii=False),
+                    listas["versiculos_utilizados"],
                     roteiro.tipo.value if hasattr(roteiro.tipo, 'value') else str(roteiro.tipo),
-                    json.dumps(roteiro.referencias, ensure_ascii=False),
+                    listas["referencias"],
                     roteiro.postagem_comunidade
                 ))
     roteiro_id = cur.lastrowid
     conn.commit()
     conn.close()
-    logger.success(f"Roteiro salvo no banco SQLite em {db_path} com ID {roteiro_id}")
+    logger.success("Roteiro salvo no banco SQLite em {} com ID {}", db_path, roteiro_id)
     return roteiro_id
 
 
 def save_info_video_sqlite(info_video: DetailVideoYouTube, roteiro_id: int, db_path: str = None) -> None:
     """
-    Salva as informações do vídeo do YouTube em um banco SQLite.
+    Salva as informações do vídeo do YouTube em um banco SQLite e, na mesma transação,
+    soma as tags e hashtags às estatísticas de ``tag_stats``.
     """
+    from src import tag_stats
+
     if db_path is None:
-        db_path = str((Path(__file__).resolve().parent.parent / "roteiros.sqlite3"))
+        db_path = str(DB_PATH)
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     
 
-    cur.execute('''
-                CREATE TABLE IF NOT EXISTS info_videos_youtube
-                (
-                    id               INTEGER PRIMARY KEY AUTOINCREMENT,
-                    roteiro_id       INTEGER,
-                    titulo           TEXT,
-                    descricao        TEXT,
-                    tags             TEXT,
-                    hashtags         TEXT,
-                    thumbnail_prompt TEXT,
-                    FOREIGN KEY (roteiro_id) REFERENCES roteiros_biblicos (id)
-                )
-                ''')
+    cur.execute(CREATE_TABLE_INFO_VIDEOS_YOUTUBE)
+    cur.execute(CREATE_INDEX_INFO_VIDEOS_ROTEIRO)
+    tag_stats.garantir_tabelas(conn)  # antes do INSERT: o preenchimento inicial não deve contar este vídeo
     cur.execute('''
                 INSERT INTO info_videos_youtube (roteiro_id, titulo, descricao, tags, hashtags, thumbnail_prompt)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -109,6 +149,250 @@ def save_info_video_sqlite(info_video: DetailVideoYouTube, roteiro_id: int, db_p
                     ", ".join(info_video.hashtags),
                     info_video.thumbnail_prompt
                 ))
+    tag_stats.registrar(conn, roteiro_id, info_video.tags, info_video.hashtags)
     conn.commit()
     conn.close()
-    logger.success(f"Informações do vídeo salvas no banco SQLite para roteiro_id {roteiro_id}")
+    logger.success("Informações do vídeo salvas no banco SQLite para roteiro_id {}", roteiro_id)
+
+
+def save_candidatos_titulo_sqlite(roteiro_id: int, candidatos: list[tuple[CandidatoTitulo, float]],
+                                  escolhido: int = 0, db_path: str = None) -> None:
+    """
+    Guarda todos os candidatos de título/thumbnail de um roteiro, na ordem do ranking,
+    para testes A/B posteriores. ``escolhido`` é a posição do que foi para ``info_videos_youtube``.
+    """
+    criado_em = datetime.now().isoformat()
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        with conn:
+            conn.execute(CREATE_TABLE_CANDIDATOS_TITULO)
+            conn.executemany('''
+                INSERT INTO candidatos_titulo (roteiro_id, posicao, titulo, thumbnail_prompt, pontuacao, escolhido, criado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(roteiro_id, i, c.titulo, c.thumbnail_prompt, pontos, int(i == escolhido), criado_em)
+                      for i, (c, pontos) in enumerate(candidatos)])
+    finally:
+        conn.close()
+    logger.success("{} candidatos de título salvos para roteiro_id {}", len(candidatos), roteiro_id)
+
+
+def get_titulos_existentes(limite: int = 500, db_path: str = None) -> list[str]:
+    """Títulos mais recentes de ``info_videos_youtube``, para evitar repetições."""
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        if not tabela_existe(conn, "info_videos_youtube"):
+            return []
+        return [t for (t,) in conn.execute("SELECT titulo FROM info_videos_youtube ORDER BY id DESC LIMIT ?",
+                                           (limite,))]
+    finally:
+        conn.close()
+
+
+# ------------------------------------------------------------------------- #
+# Leitura
+# ------------------------------------------------------------------------- #
+COLUNAS_ROTEIRO = ("tema", "data_criacao", "roteiro", "versiculos_utilizados", "tipo", "referencias",
+                   "postagem_comunidade")
+
+_FILTROS_ROTEIRO = {
+    "tema": "tema = ?",
+    "tema_contem": "tema LIKE '%' || ? || '%'",
+    "tipo": "tipo = ?",
+    "desde": "data_criacao >= ?",
+    "ate": "data_criacao < ?",
+}
+
+
+def _valor_coluna(coluna: str, valor):
+    """Converte o valor armazenado de volta para o tipo do campo em RoteiroBiblico."""
+    if valor is None:
+        return None
+    if coluna in ("versiculos_utilizados", "referencias"):
+        return json.loads(valor)
+    if coluna == "tipo":
+        return TipoRoteiro(valor)
+    if coluna == "data_criacao":
+        return datetime.fromisoformat(valor)
+    return valor
+
+
+def tabela_existe(conn: sqlite3.Connection, tabela: str) -> bool:
+    """Se ``tabela`` já foi criada no banco (as consultas não criam tabelas só para ler)."""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone() is not None
+
+
+def iter_roteiros(
+        filters: dict = None,
+        columns: Iterable[str] = None,
+        batch_size: int = 500,
+        db_path: str = None,
+        validar: bool = False
+) -> Iterator[tuple[RoteiroBiblico, int]]:
+    """
+    Percorre os roteiros gravados em lotes, com paginação por chave (``id > último``),
+    sem carregar a tabela inteira na memória.
+
+    Args:
+        filters: Filtros opcionais: ``tema``, ``tema_contem``, ``tipo``, ``desde`` e ``ate``
+            (datas ISO, sobre ``data_criacao``).
+        columns: Colunas a ler (padrão: todas). Deixar ``roteiro`` de fora evita ler o texto integral.
+        batch_size: Linhas lidas por consulta.
+        validar: Se False, monta o modelo com ``model_construct``, sem validação (campos não
+            lidos ficam ausentes ou com o valor padrão); se True, valida cada linha (exige todas as colunas).
+
+    Yields:
+        tuple[RoteiroBiblico, int]: Roteiro e seu ID no banco, em ordem de ID
+    """
+    colunas = tuple(columns) if columns is not None else COLUNAS_ROTEIRO
+    invalidas = set(colunas) - set(COLUNAS_ROTEIRO)
+    if invalidas:
+        raise ValueError(f"Colunas inválidas: {sorted(invalidas)}")
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    desconhecidos = set(filters) - set(_FILTROS_ROTEIRO)
+    if desconhecidos:
+        raise ValueError(f"Filtros inválidos: {sorted(desconhecidos)}")
+
+    condicoes = [_FILTROS_ROTEIRO[k] for k in filters]
+    parametros = [v.value if isinstance(v, TipoRoteiro) else v.isoformat() if isinstance(v, datetime) else v
+                  for v in filters.values()]
+    sql = (f"SELECT id{''.join(f', {c}' for c in colunas)} FROM roteiros_biblicos "
+           f"WHERE {' AND '.join(condicoes + ['id > ?'])} ORDER BY id LIMIT ?")
+
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        if not tabela_existe(conn, "roteiros_biblicos"):
+            return
+        ultimo_id = 0
+        while True:
+            linhas = conn.execute(sql, (*parametros, ultimo_id, batch_size)).fetchall()
+            for linha in linhas:
+                dados = {c: _valor_coluna(c, v) for c, v in zip(colunas, linha[1:]) if v is not None}
+                roteiro = RoteiroBiblico.model_validate(dados) if validar else RoteiroBiblico.model_construct(
+                    _fields_set=set(dados), **dados)
+                yield roteiro, linha[0]
+            if len(linhas) < batch_size:
+                return
+            ultimo_id = linhas[-1][0]
+    finally:
+        conn.close()
+
+
+def get_roteiro(roteiro_id: int, db_path: str = None) -> Optional[RoteiroBiblico]:
+    """
+    Lê um roteiro pelo ID, validado.
+
+    Returns:
+        RoteiroBiblico | None: O roteiro, ou None se não existir
+    """
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        if not tabela_existe(conn, "roteiros_biblicos"):
+            return None
+        linha = conn.execute(f"SELECT {', '.join(COLUNAS_ROTEIRO)} FROM roteiros_biblicos WHERE id = ?",
+                             (roteiro_id,)).fetchone()
+    finally:
+        conn.close()
+    if linha is None:
+        return None
+    return RoteiroBiblico.model_validate(
+        {c: _valor_coluna(c, v) for c, v in zip(COLUNAS_ROTEIRO, linha) if v is not None}
+    )
+
+
+def update_roteiro_texto(roteiro_id: int, texto: str, db_path: str = None) -> bool:
+    """
+    Substitui o texto (coluna ``roteiro``) de um roteiro gravado, ex.: após corrigir versículos.
+
+    Returns:
+        bool: True se o roteiro existia
+    """
+    return update_roteiro_campo(roteiro_id, "roteiro", texto, db_path)
+
+
+def update_roteiro_campo(roteiro_id: int, campo: str, valor, db_path: str = None) -> bool:
+    """
+    Atualiza uma única coluna de ``roteiros_biblicos`` (listas são gravadas como JSON).
+
+    Returns:
+        bool: True se o roteiro existia
+    """
+    if campo not in COLUNAS_ROTEIRO:
+        raise ValueError(f"Campo inválido: {campo}")
+    if isinstance(valor, list):
+        valor = serialization.json_lista(valor)
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        with conn:
+            cur = conn.execute(f"UPDATE roteiros_biblicos SET {campo} = ? WHERE id = ?", (valor, roteiro_id))
+    finally:
+        conn.close()
+    logger.info("Campo {} do roteiro {} atualizado", campo, roteiro_id)
+    return cur.rowcount > 0
+
+
+COLUNAS_INFO_VIDEO = ("titulo", "descricao", "tags", "hashtags", "thumbnail_prompt")
+
+
+def get_info_video(roteiro_id: int, db_path: str = None) -> Optional[DetailVideoYouTube]:
+    """Informações de vídeo mais recentes de um roteiro, ou None."""
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        if not tabela_existe(conn, "info_videos_youtube"):
+            return None
+        linha = conn.execute(f"SELECT {', '.join(COLUNAS_INFO_VIDEO)} FROM info_videos_youtube "
+                             "WHERE roteiro_id = ? ORDER BY id DESC LIMIT 1", (roteiro_id,)).fetchone()
+    finally:
+        conn.close()
+    if linha is None:
+        return None
+    dados = dict(zip(COLUNAS_INFO_VIDEO, linha))
+    for campo in ("tags", "hashtags"):
+        dados[campo] = dados[campo].split(", ") if dados[campo] else []
+    return DetailVideoYouTube.model_validate(dados)
+
+
+def update_info_video_campo(roteiro_id: int, campo: str, valor, db_path: str = None) -> bool:
+    """
+    Atualiza uma coluna das informações de vídeo mais recentes do roteiro
+    (listas no mesmo formato de ``save_info_video_sqlite``). Trocar tags ou hashtags
+    atualiza as estatísticas de ``tag_stats`` na mesma transação.
+
+    Returns:
+        bool: True se havia informações de vídeo para o roteiro
+    """
+    if campo not in COLUNAS_INFO_VIDEO:
+        raise ValueError(f"Campo inválido: {campo}")
+    from src import tag_stats
+
+    if isinstance(valor, list):
+        valor = ", ".join(valor)
+    ultimo = "(SELECT MAX(id) FROM info_videos_youtube WHERE roteiro_id = ?)"
+    conn = sqlite3.connect(db_path or str(DB_PATH))
+    try:
+        with conn:
+            anterior = None
+            if campo in ("tags", "hashtags"):
+                tag_stats.garantir_tabelas(conn)  # antes do UPDATE: o preenchimento inicial conta o valor antigo
+                anterior = conn.execute(f"SELECT {campo} FROM info_videos_youtube WHERE id = {ultimo}",
+                                        (roteiro_id,)).fetchone()
+            cur = conn.execute(f"UPDATE info_videos_youtube SET {campo} = ? WHERE id = {ultimo}", (valor, roteiro_id))
+            if anterior is not None:
+                tipo = tag_stats.TAG if campo == "tags" else tag_stats.HASHTAG
+                tag_stats.substituir(conn, roteiro_id, tipo, (anterior[0] or "").split(", "), valor.split(", "))
+    finally:
+        conn.close()
+    logger.info("Campo {} das informações de vídeo do roteiro {} atualizado", campo, roteiro_id)
+    return cur.rowcount > 0
+
+
+def find_roteiro_json(roteiro: RoteiroBiblico) -> Optional[Path]:
+    """Arquivo de ``roteiros_json`` gravado para este roteiro (mesmo tipo, tema e data de criação)."""
+    padrao = f"*_{roteiro.tipo}_{glob.escape(roteiro.tema.replace(' ', '_'))}.json"
+    for caminho in sorted(OUT_DIR.glob(padrao), reverse=True):
+        try:
+            salvo = RoteiroBiblico.model_validate_json(caminho.read_bytes())
+        except ValueError:
+            continue
+        if salvo.data_criacao == roteiro.data_criacao:
+            return caminho
+    return None
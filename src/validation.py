@@ -0,0 +1,237 @@
+"""
+Validação local dos versículos de um roteiro já gerado.
+
+Um único scanner compilado encontra cada bloco "Livro C:V-V" no texto do roteiro (a
+linha da referência seguida do parágrafo com o texto). Os capítulos citados são
+resolvidos em lote pelo ``BibleLookupTool`` (cache primeiro, downloads em paralelo e
+deduplicados) e o texto de cada bloco é comparado com o da tradução. Sem ``BIBLE_CACHE_DIR``
+a validação usa o cache padrão (``cache/capitulos``, o mesmo do modo em lote). Blocos divergentes
+podem ser corrigidos no próprio texto ou apenas apontados; referências de
+``versiculos_utilizados`` que não existem também são apontadas. Corrigir alguns blocos
+sai muito mais barato que gerar o roteiro de novo.
+
+    python -m src.validation 42              # relatório do roteiro com ID 42
+    python -m src.validation 42 --corrigir   # grava o texto corrigido no banco
+"""
+import argparse
+import difflib
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from src import utils
+from src.bible_tool import BASE_URL, BibleLookupTool
+from src.chapter_cache import ChapterCache, diretorio_padrao
+from src.models import RoteiroBiblico
+
+OK = "ok"
+DIVERGENTE = "divergente"
+INEXISTENTE = "inexistente"
+ERRO = "erro"
+
+# Nomes que o modelo costuma usar e que não são o nome canônico do livro
+_APELIDOS = {"salmo": "sl", "cantares": "ct", "cantico dos canticos": "ct", "apocalipse de joao": "ap"}
+
+
+def _chave_livro(nome: str) -> str:
+    """'1 Coríntios' e '1coríntios' -> '1corintios'."""
+    nome = unicodedata.normalize("NFKD", nome)
+    return "".join(c for c in nome if not unicodedata.combining(c) and not c.isspace()).lower()
+
+
+_SLUGS = {_chave_livro(nome): slug for slug, nome in BibleLookupTool.BOOK_ABBREVIATIONS.items()}
+_SLUGS.update({_chave_livro(apelido): slug for apelido, slug in _APELIDOS.items()})
+
+# "João 3:16", "1 Coríntios 13:4-7", "Salmos 23" ou "Salmos 23:1 (NTLH)", sozinhos na linha.
+# O nome é genérico no scanner e conferido em _SLUGS, o que tolera acentos e espaços.
+_LIVRO = r"(?:[1-3][ \t]*)?[^\W\d_]+(?:[ \t]+[^\W\d_]+){0,3}?"
+_FIM_CABECALHO = r"[ \t]*(?:\([^)\n]*\))?[ \t]*$"
+_SCANNER = re.compile(
+    rf"^[ \t]*(?P<livro>{_LIVRO})[ \t]+(?P<cap>\d+)(?::(?P<v1>\d+)(?:[-–](?P<v2>\d+))?)?{_FIM_CABECALHO}\n"
+    # Texto: as linhas seguintes até uma linha em branco ou outra referência
+    rf"(?P<texto>(?:(?![ \t]*{_LIVRO}[ \t]+\d+(?::\d+(?:[-–]\d+)?)?{_FIM_CABECALHO})[ \t]*\S.*(?:\n|$))+)",
+    re.MULTILINE,
+)
+_REFERENCIA = re.compile(
+    r"^\s*(?P<livro>.+?)\s+(?P<cap>\d+)(?::(?P<v1>\d+)(?:[-–](?P<v2>\d+))?)?\s*(?:\([^)]*\))?\s*$"
+)
+_ASPAS = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'", "—": "-", "–": "-"})
+
+
+def normalizar_texto(texto: str) -> str:
+    return " ".join(texto.translate(_ASPAS).split())
+
+
+@dataclass
+class BlocoVersiculos:
+    referencia: str
+    slug: str
+    capitulo: str
+    v_ini: Optional[int]
+    v_fim: Optional[int]
+    inicio: int  # posição do texto do bloco dentro de roteiro.roteiro
+    fim: int
+    texto: str
+    esperado: Optional[str] = None
+    status: str = OK
+    similaridade: float = 1.0
+
+    @property
+    def url(self) -> str:
+        return BASE_URL.format(translation="ntlh", slug=self.slug, chapter=self.capitulo)
+
+
+@dataclass
+class ResultadoValidacao:
+    blocos: List[BlocoVersiculos] = field(default_factory=list)
+    referencias_invalidas: List[str] = field(default_factory=list)
+    roteiro_corrigido: Optional[RoteiroBiblico] = None
+
+    @property
+    def divergentes(self) -> List[BlocoVersiculos]:
+        return [b for b in self.blocos if b.status != OK]
+
+    @property
+    def valido(self) -> bool:
+        return not self.divergentes and not self.referencias_invalidas
+
+
+def extrair_blocos(texto: str) -> List[BlocoVersiculos]:
+    """Blocos "referência + texto" do roteiro, na ordem em que aparecem."""
+    blocos = []
+    for m in _SCANNER.finditer(texto):
+        slug = _SLUGS.get(_chave_livro(m.group("livro")))
+        if slug is None:
+            continue
+        corpo = m.group("texto").rstrip()
+        inicio = m.start("texto") + (len(corpo) - len(corpo.lstrip()))
+        v1, v2 = m.group("v1"), m.group("v2")
+        blocos.append(BlocoVersiculos(
+            referencia=f"{m.group('livro')} {m.group('cap')}" + (f":{v1}" if v1 else "") + (f"-{v2}" if v2 else ""),
+            slug=slug, capitulo=m.group("cap"), v_ini=int(v1) if v1 else None, v_fim=int(v2) if v2 else None,
+            inicio=inicio, fim=m.start("texto") + len(corpo), texto=corpo.strip(),
+        ))
+    return blocos
+
+
+def _parse_referencia(referencia: str) -> Optional[BlocoVersiculos]:
+    m = _REFERENCIA.match(referencia)
+    if not m:
+        return None
+    slug = _SLUGS.get(_chave_livro(m.group("livro")))
+    if slug is None:
+        return None
+    v1, v2 = m.group("v1"), m.group("v2")
+    return BlocoVersiculos(referencia.strip(), slug, m.group("cap"), int(v1) if v1 else None,
+                           int(v2) if v2 else None, 0, 0, "")
+
+
+@contextmanager
+def _cache_padrao() -> Iterator[None]:
+    """Liga o cache padrão durante a validação se a ferramenta estiver sem cache."""
+    if BibleLookupTool._cache is not None:
+        yield
+        return
+    BibleLookupTool.usar_cache(ChapterCache(diretorio_padrao()))
+    try:
+        yield
+    finally:
+        BibleLookupTool.usar_cache(None)
+
+
+def _resolver_capitulos(urls: List[str], paralelismo: int) -> Dict[str, object]:
+    """URL -> versículos do capítulo, ou a exceção da busca."""
+
+    def buscar(url):
+        try:
+            return url, BibleLookupTool._fetch_chapter(url)
+        except Exception as e:
+            return url, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(paralelismo, len(urls)))) as pool:
+        return dict(pool.map(buscar, urls))
+
+
+def validar_roteiro(roteiro: RoteiroBiblico, corrigir: bool = False, paralelismo: int = 4) -> ResultadoValidacao:
+    """
+    Confere as referências e o texto citado do roteiro com a NTLH.
+
+    Args:
+        corrigir: Se True, ``roteiro_corrigido`` recebe uma cópia do roteiro com o texto
+            dos blocos divergentes trocado pelo da tradução (o original não é alterado).
+        paralelismo: Downloads simultâneos de capítulos que não estão em cache.
+    """
+    resultado = ResultadoValidacao(blocos=extrair_blocos(roteiro.roteiro or ""))
+    citadas = []
+    for referencia in roteiro.versiculos_utilizados:
+        bloco = _parse_referencia(referencia)
+        if bloco is None:
+            resultado.referencias_invalidas.append(referencia)
+        else:
+            citadas.append(bloco)
+
+    urls = list(dict.fromkeys(b.url for b in resultado.blocos + citadas))
+    capitulos = {}
+    if urls:
+        with _cache_padrao():
+            capitulos = _resolver_capitulos(urls, paralelismo)
+
+    for bloco in citadas:
+        capitulo = capitulos[bloco.url]
+        if not isinstance(capitulo, Exception) and not BibleLookupTool._filter_verses(capitulo, bloco.v_ini, bloco.v_fim):
+            resultado.referencias_invalidas.append(bloco.referencia)
+
+    for bloco in resultado.blocos:
+        capitulo = capitulos[bloco.url]
+        if isinstance(capitulo, Exception):
+            bloco.status = ERRO
+            logger.warning("Não foi possível buscar {}: {}", bloco.referencia, capitulo)
+            continue
+        versiculos = BibleLookupTool._filter_verses(capitulo, bloco.v_ini, bloco.v_fim)
+        if not versiculos:
+            bloco.status, bloco.similaridade = INEXISTENTE, 0.0
+            continue
+        bloco.esperado = " ".join(v["text"] for v in versiculos)
+        obtido, esperado = normalizar_texto(bloco.texto), normalizar_texto(bloco.esperado)
+        if obtido != esperado:
+            bloco.status = DIVERGENTE
+            bloco.similaridade = difflib.SequenceMatcher(None, obtido, esperado, autojunk=False).ratio()
+
+    if corrigir:
+        texto = roteiro.roteiro
+        # Do fim para o começo, para as posições dos blocos anteriores continuarem válidas
+        for bloco in sorted((b for b in resultado.blocos if b.status == DIVERGENTE), key=lambda b: -b.inicio):
+            texto = texto[:bloco.inicio] + bloco.esperado + texto[bloco.fim:]
+        resultado.roteiro_corrigido = roteiro.model_copy(update={"roteiro": texto})
+
+    divergentes = resultado.divergentes
+    if divergentes or resultado.referencias_invalidas:
+        logger.warning("Validação de '{}': {}/{} blocos com problema, referências inválidas: {}",
+                       roteiro.tema, len(divergentes), len(resultado.blocos), resultado.referencias_invalidas)
+    else:
+        logger.info("Validação de '{}': {} blocos conferidos", roteiro.tema, len(resultado.blocos))
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confere os versículos de um roteiro gravado com a NTLH")
+    parser.add_argument("id", type=int)
+    parser.add_argument("--corrigir", action="store_true", help="Grava no banco o texto com os blocos corrigidos")
+    args = parser.parse_args()
+
+    roteiro = utils.get_roteiro(args.id)
+    if roteiro is None:
+        raise SystemExit(f"Roteiro {args.id} não encontrado")
+    r = validar_roteiro(roteiro, corrigir=args.corrigir)
+    for b in r.blocos:
+        print(f"{b.status:<12} {b.similaridade:5.2f}  {b.referencia}")
+    for referencia in r.referencias_invalidas:
+        print(f"{'inválida':<12} {'':5}  {referencia}")
+    if args.corrigir and r.roteiro_corrigido is not None and r.divergentes:
+        utils.update_roteiro_texto(args.id, r.roteiro_corrigido.roteiro)
+        print(f"Roteiro {args.id} corrigido")
@@ -74,3 +74,22 @@ def temp_json_dir():
         shutil.rmtree(temp_dir)
     except FileNotFoundError:
         pass
+
+
+@pytest.fixture(autouse=True)
+def isolar_banco(tmp_path, monkeypatch):
+    """Redireciona o banco SQLite padrão para um diretório temporário em todos os testes."""
+    monkeypatch.setattr("src.utils.DB_PATH", tmp_path / "roteiros.sqlite3")
+    yield
+    # Grava as execuções pendentes enquanto o diretório do teste ainda é o destino
+    from src.accounting import registrador
+    registrador.flush()
+
+
+@pytest.fixture(autouse=True)
+def resetar_disjuntor():
+    """Fecha o disjuntor da Bíblia Online entre os testes (vários simulam falhas de rede)."""
+    from src.bible_tool import BibleLookupTool
+    BibleLookupTool._disjuntor.resetar()
+    yield
+    BibleLookupTool._disjuntor.resetar()
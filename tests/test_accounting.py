@@ -0,0 +1,106 @@
+"""
+Testes para a contabilidade de tokens e custo por execução.
+"""
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from agno.models.message import MessageMetrics
+from agno.models.response import ToolExecution
+from agno.run.response import RunResponse
+from loguru import logger
+
+from src.accounting import (
+    ExecucaoGeracao, RegistradorExecucoes, calcular_custo, extrair_execucao, registrador, custo_por_tema,
+    custo_por_tipo, custo_por_dia
+)
+from src.agents.roteiro_agent import gerar_roteiro
+from src.models import TipoRoteiro
+from src.utils import save_roteiro_sqlite
+
+
+def _run_response(input_tokens, output_tokens, cached=0, tools=0):
+    return RunResponse(
+        content="ok",
+        model="gpt-4o-mini",
+        metrics={"input_tokens": input_tokens, "output_tokens": output_tokens, "cached_tokens": [cached]},
+        tools=[ToolExecution(tool_name="lookup_verse", metrics=MessageMetrics(time=0.5)) for _ in range(tools)],
+    )
+
+
+class TestCalculoDeCusto:
+    """Testes do cálculo de custo e da extração de métricas."""
+
+    def test_calcular_custo_com_cache(self):
+        """Testa se tokens em cache são cobrados pelo preço reduzido."""
+        custo = calcular_custo("gpt-4o-mini", 1_000_000, 1_000_000, cached_tokens=500_000)
+        assert custo == pytest.approx(0.5 * 0.15 + 0.5 * 0.075 + 0.60)
+
+    def test_modelo_desconhecido_custa_zero(self):
+        """Testa modelos sem preço cadastrado."""
+        assert calcular_custo("modelo-local", 1000, 1000) == 0.0
+
+    def test_extrair_execucao(self):
+        """Testa a soma das métricas por mensagem e das ferramentas."""
+        execucao = extrair_execucao(_run_response([100, 300], [20, 500], cached=50, tools=3), "roteiro", 7, 2.0,
+                                    "gpt-4o-mini")
+        assert execucao.prompt_tokens == 400
+        assert execucao.completion_tokens == 520
+        assert execucao.cached_tokens == 50
+        assert execucao.tool_calls == 3
+        assert execucao.tool_time == 1.5
+        assert execucao.custo_usd > 0
+
+
+class TestRegistroEmLote:
+    """Testes da gravação em lote e das consultas agregadas."""
+
+    def test_consultas_agregadas(self, sample_roteiro, sample_short_roteiro):
+        """Testa custo por tema, tipo e dia."""
+        id_longo = save_roteiro_sqlite(sample_roteiro)
+        id_short = save_roteiro_sqlite(sample_short_roteiro)
+        for roteiro_id, etapa in ((id_longo, "roteiro"), (id_longo, "detalhes"), (id_short, "roteiro")):
+            registrador.registrar(extrair_execucao(_run_response([1000], [500]), etapa, roteiro_id, 1.0,
+                                                   "gpt-4o-mini"))
+
+        por_tema = {linha["chave"]: linha for linha in custo_por_tema()}
+        assert por_tema["Ansiedade"]["execucoes"] == 2
+        assert por_tema["Gratidão"]["execucoes"] == 1
+        assert por_tema["Ansiedade"]["custo_usd"] > por_tema["Gratidão"]["custo_usd"]
+
+        por_tipo = {linha["chave"]: linha for linha in custo_por_tipo()}
+        assert set(por_tipo) == {"Video", "Short"}
+
+        por_dia = custo_por_dia()
+        assert len(por_dia) == 1
+        assert por_dia[0]["prompt_tokens"] == 3000
+
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_gerar_roteiro_registra_execucao(self, mock_save_json, mock_agent, sample_roteiro, tmp_path):
+        """Testa se gerar_roteiro registra a execução ligada ao roteiro salvo."""
+        mock_agent.run.return_value = _run_response([1200], [800], tools=2)
+        mock_agent.run.return_value.content = sample_roteiro
+
+        _, roteiro_id = gerar_roteiro("Ansiedade", TipoRoteiro.LONGO)
+        registrador.flush()
+
+        conn = sqlite3.connect(str(tmp_path / "roteiros.sqlite3"))
+        row = conn.execute("SELECT roteiro_id, etapa, prompt_tokens, tool_calls FROM generation_runs").fetchone()
+        conn.close()
+        assert row == (roteiro_id, "roteiro", 1200, 2)
+
+    def test_banco_inexistente_conta_descartes(self, tmp_path):
+        """Testa que registros sem banco onde gravar aparecem no log como descartados."""
+        mensagens = []
+        handler = logger.add(mensagens.append, level="ERROR", format="{message}")
+        registrador_local = RegistradorExecucoes()
+        try:
+            for _ in range(3):
+                registrador_local.registrar(ExecucaoGeracao(None, "roteiro", "m"),
+                                            str(tmp_path / "apagado" / "roteiros.sqlite3"))
+            assert registrador_local.flush() == 0
+        finally:
+            logger.remove(handler)
+        assert any("3 execuções descartadas" in m for m in mensagens)
@@ -1,6 +1,8 @@
 """
 Testes para os agentes do projeto.
 """
+import subprocess
+import sys
 from unittest.mock import patch
 
 import pytest
@@ -156,3 +158,23 @@ class TestYouTubeDetailAgent:
         # Verifica se os versículos estão no prompt
         for versiculo in sample_roteiro.versiculos_utilizados:
             assert versiculo in call_args
+
+
+class TestAgentesPreguicosos:
+    """Testes da criação dos agentes do módulo no primeiro uso."""
+
+    def test_importacao_nao_cria_agentes(self):
+        """Testa que importar os módulos não constrói agentes nem storages."""
+        codigo = ("from unittest.mock import patch\n"
+                  "with patch('agno.agent.Agent.__init__', side_effect=AssertionError('criado na importação')):\n"
+                  "    import src.agents.roteiro_agent, src.agents.youtube_detail_agent\n")
+        subprocess.run([sys.executable, "-c", codigo], check=True)
+
+    @patch('src.agents.youtube_detail_agent.agent', None)
+    @patch('src.agents.youtube_detail_agent.criar_agente')
+    def test_agente_padrao_criado_uma_vez(self, mock_criar):
+        """Testa que o agente do módulo é construído só no primeiro uso."""
+        from src.agents import youtube_detail_agent
+
+        assert youtube_detail_agent.agente_padrao() is youtube_detail_agent.agente_padrao()
+        mock_criar.assert_called_once_with()
@@ -0,0 +1,100 @@
+"""
+Testes para o arquivamento de roteiros_json.
+"""
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src import archive, utils
+from src.archive import ArquivoRoteiros, carregar_roteiro_json, compactar
+from src.models import RoteiroBiblico, TipoRoteiro
+
+
+@pytest.fixture
+def out_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "OUT_DIR", tmp_path / "roteiros_json")
+    (tmp_path / "roteiros_json").mkdir()
+    return tmp_path / "roteiros_json"
+
+
+def _salvar(tema, data_criacao):
+    """Salva como gerar_roteiro faz (banco e JSON) e renomeia o JSON para a data desejada."""
+    roteiro = RoteiroBiblico(tema=tema, roteiro=f"Texto de {tema}", versiculos_utilizados=["Salmos 23:1"],
+                             tipo=TipoRoteiro.SHORT, data_criacao=data_criacao)
+    roteiro_id = utils.save_roteiro_sqlite(roteiro)
+    caminho = utils.save_roteiro_json(roteiro)
+    nome = f"{data_criacao.strftime('%Y%m%dT%H%M%SZ')}_Short_{tema}.json"
+    caminho.rename(caminho.parent / nome)
+    return nome, roteiro_id
+
+
+class TestArquivo:
+    """Testes de compactação e leitura aleatória."""
+
+    def test_compacta_por_mes_e_le_por_nome_e_id(self, out_dir):
+        """Testa se os JSONs antigos vão para zips mensais e podem ser lidos individualmente."""
+        antigos = [_salvar(f"Tema{i}", datetime(2025, 1 + i % 2, 10 + i)) for i in range(4)]
+        recente, _ = _salvar("Recente", datetime(2025, 6, 1))
+
+        arquivados = compactar(dias=30, agora=datetime(2025, 6, 15))
+
+        assert arquivados == 4
+        assert sorted(p.name for p in out_dir.glob("*.json")) == [recente]
+        assert sorted(p.name for p in (out_dir / "arquivo").glob("*.zip")) == \
+               ["roteiros_2025-01.zip", "roteiros_2025-02.zip"]
+
+        arquivo = ArquivoRoteiros()
+        try:
+            for nome, roteiro_id in antigos:
+                por_nome = arquivo.ler(nome=nome)
+                por_id = arquivo.ler(roteiro_id=roteiro_id)
+                assert por_nome == por_id
+                assert por_nome.roteiro == f"Texto de {por_nome.tema}"
+            assert arquivo.ler(nome="inexistente.json") is None
+            assert arquivo.ler(roteiro_id=999) is None
+        finally:
+            arquivo.fechar()
+
+    def test_compactacao_incremental(self, out_dir):
+        """Testa se uma segunda compactação acrescenta ao zip do mês e mantém o índice."""
+        primeiro, _ = _salvar("Um", datetime(2025, 1, 5))
+        compactar(dias=30, agora=datetime(2025, 6, 1))
+        segundo, segundo_id = _salvar("Dois", datetime(2025, 1, 20))
+        compactar(dias=30, agora=datetime(2025, 6, 1))
+
+        assert carregar_roteiro_json(primeiro).tema == "Um"
+        assert carregar_roteiro_json(roteiro_id=segundo_id).tema == "Dois"
+        assert list(out_dir.glob("*.json")) == []
+
+    def test_json_invalido_fica_de_fora(self, out_dir):
+        """Testa que um JSON malformado é ignorado antes de entrar no zip, sem parar os demais."""
+        nome, roteiro_id = _salvar("Bom", datetime(2025, 1, 5))
+        (out_dir / "20250106T000000Z_Short_Ruim.json").write_text("{quebrado", encoding="utf-8")
+
+        assert compactar(dias=30, agora=datetime(2025, 6, 1)) == 1
+
+        assert [p.name for p in out_dir.glob("*.json")] == ["20250106T000000Z_Short_Ruim.json"]
+        with zipfile.ZipFile(out_dir / "arquivo" / "roteiros_2025-01.zip") as zf:
+            assert zf.namelist() == [nome]
+        assert carregar_roteiro_json(roteiro_id=roteiro_id).tema == "Bom"
+
+    def test_retomada_nao_duplica_membros(self, out_dir):
+        """Testa a retomada de uma compactação que parou depois do zip e antes dos índices."""
+        nome, roteiro_id = _salvar("Um", datetime(2025, 1, 5))
+        with patch.object(archive, "_gravar_indices", side_effect=OSError("disco cheio")), \
+                pytest.raises(OSError):
+            compactar(dias=30, agora=datetime(2025, 6, 1))
+
+        assert compactar(dias=30, agora=datetime(2025, 6, 1)) == 1
+
+        with zipfile.ZipFile(out_dir / "arquivo" / "roteiros_2025-01.zip") as zf:
+            assert zf.namelist() == [nome]
+        assert len(list(ArquivoRoteiros().registros())) == 1
+        assert carregar_roteiro_json(roteiro_id=roteiro_id).tema == "Um"
+
+    def test_carrega_do_diretorio_vivo(self, out_dir):
+        """Testa se um JSON ainda não arquivado é lido direto do diretório."""
+        nome, _ = _salvar("Vivo", datetime.now())
+        assert carregar_roteiro_json(nome).tema == "Vivo"
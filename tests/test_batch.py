@@ -0,0 +1,130 @@
+"""
+Testes para a geração em lote com pool de processos.
+"""
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src import utils
+from src.batch import Pedido, executar_lote
+from src.bible_tool import BibleLookupTool, Pagina
+from src.chapter_cache import ChapterCache
+from src.mock_openai import MockOpenAIServer
+from src.models import TipoRoteiro
+
+HTML_CAPITULO = '<span class="v">1</span><span class="t">No princípio.</span>'
+
+
+class TestChapterCache:
+    """Testes do cache de capítulos em disco."""
+
+    def test_get_put(self, tmp_path):
+        """Testa gravação e leitura de um capítulo."""
+        cache = ChapterCache(tmp_path)
+        assert cache.get("u") is None
+        cache.put("u", [{"number": 1, "text": "a"}])
+        assert ChapterCache(tmp_path).get("u") == [{"number": 1, "text": "a"}]
+
+    @patch.object(BibleLookupTool, '_download_condicional', return_value=Pagina(HTML_CAPITULO))
+    def test_tool_usa_cache(self, mock_download, tmp_path):
+        """Testa se a ferramenta só baixa o capítulo uma vez com o cache ligado."""
+        BibleLookupTool.usar_cache(ChapterCache(tmp_path))
+        try:
+            tool = BibleLookupTool()
+            tool.lookup_verse("gn 1:1")
+            resultado = tool.lookup_verse("gn 1:1")
+        finally:
+            BibleLookupTool.usar_cache(None)
+        assert resultado["text"] == "No princípio."
+        assert mock_download.call_count == 1
+
+
+def _resposta(status=200, html=HTML_CAPITULO, etag='"v2"'):
+    resp = MagicMock(status_code=status, text=html, headers={"ETag": etag})
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+class TestRevalidacaoCache:
+    """Testes da revalidação condicional de capítulos vencidos."""
+
+    URL = "https://www.bibliaonline.com.br/ntlh/gn/1"
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = ChapterCache(tmp_path, ttl=0)
+        with patch("requests.get", return_value=_resposta(etag='"v1"')):
+            BibleLookupTool.usar_cache(cache)
+            BibleLookupTool._load_chapter(self.URL)
+        yield cache
+        BibleLookupTool.usar_cache(None)
+
+    def test_primeiro_download_guarda_validadores(self, cache):
+        """Testa que o ETag do download inicial (cache vazio) já fica na entrada."""
+        assert cache.entrada(self.URL)["etag"] == '"v1"'
+
+    @patch("requests.get", return_value=_resposta(status=304))
+    def test_304_renova_sem_extrair(self, mock_get, cache):
+        """Testa o If-None-Match e a renovação da entrada sem novo parsing."""
+        antes = cache.entrada(self.URL)["validado_em"]
+        with patch.object(BibleLookupTool, "_extract_verses", side_effect=AssertionError("não deveria extrair")):
+            assert BibleLookupTool._load_chapter(self.URL) == [{"number": 1, "text": "No princípio."}]
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert cache.entrada(self.URL)["validado_em"] >= antes
+
+    @patch("requests.get", return_value=_resposta())
+    def test_html_igual_nao_extrai(self, mock_get, cache):
+        """Testa o hash do HTML: página reenviada sem mudanças não é extraída de novo."""
+        with patch.object(BibleLookupTool, "_extract_verses", side_effect=AssertionError("não deveria extrair")):
+            BibleLookupTool._load_chapter(self.URL)
+        assert cache.entrada(self.URL)["etag"] == '"v2"'
+
+    @patch("requests.get", return_value=_resposta(html='<span class="v">1</span><span class="t">No começo.</span>'))
+    def test_html_alterado_extrai(self, mock_get, cache):
+        """Testa a troca dos versículos quando a página mudou."""
+        assert BibleLookupTool._load_chapter(self.URL)[0]["text"] == "No começo."
+        assert cache.get(self.URL)[0]["text"] == "No começo."
+
+    @patch("requests.get", side_effect=requests.exceptions.ConnectionError("Falha"))
+    def test_falha_na_revalidacao_usa_copia(self, mock_get, cache):
+        """Testa que uma entrada vencida ainda serve se a revalidação falhar."""
+        assert BibleLookupTool._load_chapter(self.URL)[0]["text"] == "No princípio."
+
+
+class TestExecutarLote:
+    """Testes do pool de processos contra o servidor OpenAI local."""
+
+    @pytest.fixture
+    def servidor(self, tmp_path, monkeypatch):
+        server = MockOpenAIServer(turnos_ferramenta=0)
+        server.iniciar_em_thread()
+        # Herdado pelos processos do pool
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "mock")
+        monkeypatch.setenv("DB_NAME", str(tmp_path / "sessoes"))
+        monkeypatch.setattr(utils, "OUT_DIR", tmp_path)
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def test_lote_grava_pelo_escritor_unico(self, servidor, tmp_path):
+        """Testa se todos os pedidos são gerados nos workers e gravados no processo principal."""
+        pedidos = [Pedido("Fé", TipoRoteiro.SHORT), Pedido("Paz", TipoRoteiro.LONGO), Pedido("Amor", TipoRoteiro.SHORT)]
+
+        resultados = executar_lote(pedidos, processos=2, cache_dir=str(tmp_path / "cache"), nivel_log="WARNING")
+
+        assert [r.erro for r in resultados] == [None, None, None]
+        assert [r.roteiro.tema for r in resultados] == ["Fé", "Paz", "Amor"]
+        assert len({r.roteiro_id for r in resultados}) == 3
+        conn = sqlite3.connect(utils.DB_PATH)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM roteiros_biblicos").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM info_videos_youtube").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM generation_runs WHERE roteiro_id IS NOT NULL").fetchone()[0] == 6
+        finally:
+            conn.close()
+        assert len(list(tmp_path.glob("*.json"))) == 3
+        # Os workers não gravam sessões de agente no SQLite compartilhado
+        assert not (tmp_path / "sessoes.sqlite3").exists()
@@ -1,11 +1,19 @@
 """
 Testes para a ferramenta de busca bíblica.
 """
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
+import pytest
 import requests
 
-from src.bible_tool import BibleLookupTool
+from src.bible_tool import BibleLookupTool, CircuitoAberto, Disjuntor, Pagina
+from src.chapter_cache import ChapterCache
 
 
 class TestBibleLookupTool:
@@ -105,3 +113,234 @@ class TestBibleLookupTool:
         result = tool.lookup_verse("rm5:3")
         assert "error" in result
         assert "erro" in result["error"].lower() or "não encontrado" in result["error"].lower()
+
+
+HTML_ROMANOS_8 = ''.join(f'<span class="v">{i}</span><span class="t">Versículo {i}.</span>' for i in range(1, 40))
+
+
+def _download_lento(url):
+    time.sleep(0.2)
+    return Pagina(HTML_ROMANOS_8)
+
+
+class TestSingleFlight:
+    """Testes da deduplicação de buscas concorrentes do mesmo capítulo."""
+
+    @patch.object(BibleLookupTool, '_download_condicional', side_effect=_download_lento)
+    def test_threads_compartilham_download(self, mock_download):
+        """Testa se buscas simultâneas do mesmo capítulo fazem um único download."""
+        tool = BibleLookupTool()
+        refs = ["rm8:28", "rm8:31-39", "rm 8", "rm8:1"] * 2
+        with ThreadPoolExecutor(max_workers=len(refs)) as pool:
+            resultados = list(pool.map(tool.lookup_verse, refs))
+
+        assert mock_download.call_count == 1
+        assert all("error" not in r for r in resultados)
+        assert resultados[1]["reference"] == "Romanos 8:31-39 (NTLH)"
+        assert len(resultados[2]["verses"]) == 39
+
+    @patch.object(BibleLookupTool, '_download_condicional', side_effect=_download_lento)
+    def test_capitulos_diferentes_nao_sao_coalescidos(self, mock_download):
+        """Testa se URLs diferentes continuam com downloads próprios."""
+        tool = BibleLookupTool()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(tool.lookup_verse, ["rm8:28", "sl23:1"]))
+        assert mock_download.call_count == 2
+
+    @patch.object(BibleLookupTool, '_download_condicional', side_effect=requests.exceptions.ConnectionError("Falha"))
+    def test_erro_propagado_para_todos(self, mock_download):
+        """Testa se a falha do download é entregue a todos os chamadores."""
+        tool = BibleLookupTool()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            resultados = list(pool.map(tool.lookup_verse, ["rm8:28"] * 4))
+        assert all("erro de rede" in r["error"].lower() for r in resultados)
+
+    @patch.object(BibleLookupTool, '_download_condicional', side_effect=_download_lento)
+    def test_asyncio_compartilha_download(self, mock_download):
+        """Testa a deduplicação no caminho assíncrono."""
+        tool = BibleLookupTool()
+
+        async def buscar():
+            return await asyncio.gather(*(tool.alookup_verse(r) for r in ["rm8:28", "rm8:38-39", "rm8"]))
+
+        resultados = asyncio.run(buscar())
+        assert mock_download.call_count == 1
+        assert resultados[0]["reference"] == "Romanos 8:28 (NTLH)"
+        assert len(resultados[2]["verses"]) == 39
+
+
+HTML_JOAO = '<span class="v">16</span><span class="t">Porque Deus amou o mundo.</span>'
+
+
+class TestDisjuntor:
+    """Testes do circuit breaker da Bíblia Online."""
+
+    @patch('requests.get', side_effect=requests.exceptions.Timeout("Timeout"))
+    def test_abre_e_falha_rapido(self, mock_get):
+        """Testa que, aberto, a ferramenta responde sem tocar na rede."""
+        tool = BibleLookupTool()
+        for _ in range(BibleLookupTool._disjuntor.falhas_para_abrir):
+            assert "error" in tool.lookup_verse("jo 3:16")
+        chamadas = mock_get.call_count
+
+        resultado = tool.lookup_verse("jo 3:16")
+
+        assert "indisponível" in resultado["error"]
+        assert mock_get.call_count == chamadas
+
+    def test_meio_aberto_fecha_apos_sucesso(self):
+        """Testa a tentativa única após o tempo aberto e o fechamento quando ela funciona."""
+        agora = [0.0]
+        disjuntor = Disjuntor(falhas_para_abrir=2, segundos_aberto=10, relogio=lambda: agora[0])
+        falha = MagicMock(side_effect=requests.exceptions.ConnectionError("Falha"))
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                disjuntor.chamar(falha)
+        with pytest.raises(CircuitoAberto):
+            disjuntor.chamar(lambda: "ok")
+
+        agora[0] = 11
+        assert disjuntor.chamar(lambda: "ok") == "ok"
+        assert not disjuntor.aberto and disjuntor.falhas == 0
+
+    def test_erro_inesperado_libera_tentativa(self):
+        """Testa que uma exceção que não é de rede na tentativa meio-aberta não trava o disjuntor."""
+        agora = [0.0]
+        disjuntor = Disjuntor(falhas_para_abrir=1, segundos_aberto=10, relogio=lambda: agora[0])
+        with pytest.raises(requests.exceptions.ConnectionError):
+            disjuntor.chamar(MagicMock(side_effect=requests.exceptions.ConnectionError("Falha")))
+        agora[0] = 11
+        with pytest.raises(ValueError):
+            disjuntor.chamar(MagicMock(side_effect=ValueError("HTML inesperado")))
+
+        assert disjuntor.chamar(lambda: "ok") == "ok"
+        assert not disjuntor.aberto
+
+    def test_erro_4xx_nao_conta(self):
+        """Testa que respostas 4xx (site no ar) não abrem o disjuntor."""
+        disjuntor = Disjuntor(falhas_para_abrir=1)
+        erro = requests.exceptions.HTTPError("404", response=MagicMock(status_code=404))
+        with pytest.raises(requests.exceptions.HTTPError):
+            disjuntor.chamar(MagicMock(side_effect=erro))
+        assert not disjuntor.aberto
+
+    def test_aberto_serve_cache_vencido(self, tmp_path):
+        """Testa que capítulos em cache continuam servidos com o disjuntor aberto."""
+        cache = ChapterCache(tmp_path, ttl=0)
+        url = "https://www.bibliaonline.com.br/ntlh/jo/3"
+        cache.put(url, [{"number": 16, "text": "Porque Deus amou o mundo."}])
+        BibleLookupTool.usar_cache(cache)
+        try:
+            for _ in range(BibleLookupTool._disjuntor.falhas_para_abrir):
+                BibleLookupTool._disjuntor._registrar(True)
+            with patch('requests.get') as mock_get:
+                resultado = BibleLookupTool().lookup_verse("jo 3:16")
+        finally:
+            BibleLookupTool.usar_cache(None)
+        assert resultado["text"] == "Porque Deus amou o mundo."
+        mock_get.assert_not_called()
+
+
+class TestOrcamentoConsultas:
+    """Testes do orçamento de chamadas da ferramenta por execução."""
+
+    @patch.object(BibleLookupTool, '_download_condicional', return_value=Pagina(HTML_JOAO))
+    def test_limite_de_chamadas(self, mock_download):
+        """Testa o erro da ferramenta depois de max_chamadas consultas."""
+        tool = BibleLookupTool()
+        with BibleLookupTool.orcamento(max_chamadas=2) as orcamento:
+            assert "text" in tool.lookup_verse("jo 3:16")
+            assert "text" in tool.lookup_verse("jo 3:16")
+            resultado = tool.lookup_verse("jo 3:16")
+        assert "Limite de consultas" in resultado["error"]
+        assert orcamento.chamadas == 2
+        assert "text" in tool.lookup_verse("jo 3:16")  # fora do bloco não há limite
+
+    @patch.object(BibleLookupTool, '_download_condicional', side_effect=_download_lento)
+    def test_chamadas_simultaneas_respeitam_limite(self, mock_download):
+        """Testa que consultas concorrentes reservam a vaga antes de baixar e não estouram o limite."""
+        tool = BibleLookupTool()
+
+        async def consultar():
+            with BibleLookupTool.orcamento(max_chamadas=2) as orcamento:
+                resultados = await asyncio.gather(*(tool.alookup_verse(f"rm8:{v}") for v in range(1, 6)))
+            return orcamento, resultados
+
+        orcamento, resultados = asyncio.run(consultar())
+        assert sum("text" in r for r in resultados) == 2
+        assert sum("Limite de consultas" in r.get("error", "") for r in resultados) == 3
+        assert orcamento.chamadas == 2
+
+    @patch.object(BibleLookupTool, '_download_condicional', return_value=Pagina(HTML_JOAO))
+    def test_limite_de_tempo_no_async(self, mock_download):
+        """Testa o limite de tempo total também na versão assíncrona."""
+        tool = BibleLookupTool()
+
+        async def consultar():
+            with BibleLookupTool.orcamento(max_segundos=0.0):
+                return await tool.alookup_verse("jo 3:16")
+
+        assert "Limite de consultas" in asyncio.run(consultar())["error"]
+
+
+class TestTraducoes:
+    """Testes das consultas em várias traduções."""
+
+    HTML = {
+        "ntlh": '<span class="v">16</span><span class="t">Porque Deus amou o mundo.</span>',
+        "ara": '<span class="v">16</span><span class="t">Porque Deus amou ao mundo de tal maneira.</span>',
+    }
+
+    def _download(self, url):
+        traducao = url.split("/")[3]
+        if traducao not in self.HTML:
+            raise requests.exceptions.HTTPError("404", response=MagicMock(status_code=404))
+        time.sleep(0.1)
+        return Pagina(self.HTML[traducao])
+
+    def test_rotulo_da_traducao(self):
+        """Testa que a referência leva a tradução consultada, não sempre NTLH."""
+        with patch.object(BibleLookupTool, '_download_condicional', return_value=Pagina(self.HTML["ara"])):
+            resultado = BibleLookupTool().lookup_verse("jo 3:16", translation="ara")
+        assert resultado["reference"] == "João 3:16 (ARA)"
+
+    def test_mesmo_intervalo_em_paralelo(self):
+        """Testa o recorte do mesmo versículo em cada tradução, com downloads simultâneos."""
+        tool = BibleLookupTool(traducoes=["ntlh", "ara"])
+        with patch.object(BibleLookupTool, '_download_condicional', side_effect=self._download) as mock_download:
+            inicio = time.perf_counter()
+            resultado = tool.lookup_verse_translations("jo 3:16")
+            duracao = time.perf_counter() - inicio
+
+        assert resultado["reference"] == "João 3:16"
+        assert resultado["translations"]["ntlh"]["text"] == "Porque Deus amou o mundo."
+        assert resultado["translations"]["ara"]["reference"] == "João 3:16 (ARA)"
+        assert mock_download.call_count == 2
+        assert duracao < 0.19
+
+    def test_erro_por_traducao(self):
+        """Testa que a falha de uma tradução não derruba as outras."""
+        with patch.object(BibleLookupTool, '_download_condicional', side_effect=self._download):
+            resultado = BibleLookupTool().lookup_verse_translations("jo 3:16", "ntlh, xyz")
+        assert "text" in resultado["translations"]["ntlh"]
+        assert "error" in resultado["translations"]["xyz"]
+
+    def test_bible_traducoes_vazia_usa_padrao(self):
+        """Testa que BIBLE_TRADUCOES vazia (ou só vírgulas) cai na NTLH em vez de uma lista vazia."""
+        codigo = ("from src.bible_tool import TRADUCOES, BibleLookupTool; "
+                  "assert TRADUCOES == ['ntlh'], TRADUCOES; "
+                  "assert BibleLookupTool(traducoes=[]).traducoes == ['ntlh']")
+        subprocess.run([sys.executable, "-c", codigo], check=True, env={**os.environ, "BIBLE_TRADUCOES": " , "})
+
+    def test_downloads_simultaneos_limitados(self):
+        """Testa o teto de workers quando o agente pede muitas traduções de uma vez."""
+        with patch.object(BibleLookupTool, '_download_condicional', side_effect=self._download), \
+                patch("src.bible_tool.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool:
+            resultado = BibleLookupTool().lookup_verse_translations("jo 3:16", "ntlh,ara,nvi,acf,kjv,arc")
+        assert mock_pool.call_args.kwargs["max_workers"] == 4
+        assert len(resultado["translations"]) == 6
+
+    def test_ferramenta_so_com_varias_traducoes(self):
+        """Testa que lookup_verse_translations só é oferecida ao agente com mais de uma tradução."""
+        assert "lookup_verse_translations" not in BibleLookupTool(traducoes=["ntlh"]).functions
+        assert "lookup_verse_translations" in BibleLookupTool(traducoes=["ntlh", "nvi"]).functions
@@ -0,0 +1,95 @@
+"""
+Testes para a exportação em massa.
+"""
+import csv
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from src import export, utils
+from src.export import exportar, ler_watermark
+from src.utils import save_roteiro_sqlite, save_info_video_sqlite
+
+
+def _ler_jsonl(caminho):
+    with gzip.open(caminho, "rt", encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+
+class TestExportar:
+    """Testes da exportação JSONL/colunar e da marca d'água."""
+
+    def test_exporta_juncao_em_lotes(self, tmp_path, sample_roteiro, sample_detail_video):
+        """Testa se roteiros e vídeos saem juntos, com listas decodificadas, atravessando lotes."""
+        ids = [save_roteiro_sqlite(sample_roteiro) for _ in range(3)]
+        save_info_video_sqlite(sample_detail_video, ids[0])
+
+        resultado = exportar(tmp_path / "out", formatos=("jsonl",), tamanho_lote=2)
+
+        linhas = _ler_jsonl(resultado.arquivos[0])
+        assert [r["id"] for r in linhas] == ids
+        assert linhas[0]["tags"] == sample_detail_video.tags
+        assert linhas[0]["versiculos_utilizados"] == sample_roteiro.versiculos_utilizados
+        assert linhas[1]["titulo"] is None
+        assert resultado.watermark["id"] == ids[-1]
+
+    def test_incremental(self, tmp_path, sample_roteiro):
+        """Testa se a segunda exportação só leva as linhas novas."""
+        save_roteiro_sqlite(sample_roteiro)
+        exportar(tmp_path / "out", formatos=("jsonl",))
+        assert exportar(tmp_path / "out", formatos=("jsonl",)).linhas == 0
+
+        novo_id = save_roteiro_sqlite(sample_roteiro)
+        resultado = exportar(tmp_path / "out", formatos=("jsonl",))
+
+        assert [r["id"] for r in _ler_jsonl(resultado.arquivos[0])] == [novo_id]
+        assert ler_watermark(tmp_path / "out")["id"] == novo_id
+        assert len(list((tmp_path / "out").glob("*.jsonl.gz"))) == 2
+
+    def test_reemite_roteiro_com_detalhes_posteriores(self, tmp_path, sample_roteiro, sample_detail_video):
+        """Testa se um roteiro exportado antes dos detalhes volta a sair quando eles chegam."""
+        roteiro_id = save_roteiro_sqlite(sample_roteiro)
+        assert _ler_jsonl(exportar(tmp_path / "out", formatos=("jsonl",)).arquivos[0])[0]["titulo"] is None
+
+        save_info_video_sqlite(sample_detail_video, roteiro_id)
+        resultado = exportar(tmp_path / "out", formatos=("jsonl",))
+
+        linhas = _ler_jsonl(resultado.arquivos[0])
+        assert [(r["id"], r["titulo"]) for r in linhas] == [(roteiro_id, sample_detail_video.titulo)]
+        assert resultado.watermark == {"id": roteiro_id, "video_id": 1}
+        assert exportar(tmp_path / "out", formatos=("jsonl",)).linhas == 0
+
+    def test_nao_altera_o_banco_de_origem(self, tmp_path, sample_roteiro):
+        """Testa que a exportação só lê o banco (sem criar tabelas nem índices)."""
+        save_roteiro_sqlite(sample_roteiro)
+        assert exportar(tmp_path / "out", formatos=("jsonl",)).linhas == 1
+        conn = sqlite3.connect(utils.DB_PATH)
+        try:
+            assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'info_videos%' "
+                                "OR name LIKE 'idx_%'").fetchall() == []
+        finally:
+            conn.close()
+
+    def test_colunar_sem_pyarrow_usa_csv(self, tmp_path, monkeypatch, sample_roteiro):
+        """Testa o fallback para CSV comprimido."""
+        monkeypatch.setattr(export, "pq", None)
+        save_roteiro_sqlite(sample_roteiro)
+
+        resultado = exportar(tmp_path / "out", formatos=("colunar",))
+
+        assert resultado.arquivos[0].name.endswith(".csv.gz")
+        with gzip.open(resultado.arquivos[0], "rt", encoding="utf-8") as f:
+            linhas = list(csv.DictReader(f))
+        assert json.loads(linhas[0]["versiculos_utilizados"]) == sample_roteiro.versiculos_utilizados
+
+    def test_colunar_parquet(self, tmp_path, sample_roteiro):
+        """Testa a saída Parquet quando o pyarrow está disponível."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        save_roteiro_sqlite(sample_roteiro)
+
+        resultado = exportar(tmp_path / "out", formatos=("colunar",))
+
+        tabela = pq.read_table(resultado.arquivos[0])
+        assert tabela.column("tema").to_pylist() == [sample_roteiro.tema]
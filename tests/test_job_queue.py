@@ -0,0 +1,108 @@
+"""
+Testes para a fila de jobs persistida no SQLite.
+"""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.job_queue import FilaJobs, Worker, CONCLUIDO, EXECUTANDO, MORTO, PENDENTE
+from src.models import TipoRoteiro
+from src.utils import save_roteiro_sqlite
+
+
+@pytest.fixture
+def fila():
+    return FilaJobs(backoff_base=0.0)
+
+
+class TestFilaJobs:
+    """Testes das operações da fila."""
+
+    def test_enfileirar_idempotente(self, fila):
+        """Testa se o mesmo pedido não gera dois jobs."""
+        a = fila.enfileirar("Fé", TipoRoteiro.SHORT, ["Hebreus 11:1"])
+        b = fila.enfileirar("Fé", TipoRoteiro.SHORT, ["Hebreus 11:1"])
+        c = fila.enfileirar("Fé", TipoRoteiro.LONGO, ["Hebreus 11:1"])
+        assert a == b
+        assert c != a
+        assert fila.contar_por_status() == {PENDENTE: 2}
+
+    def test_reserva_exclusiva(self, fila):
+        """Testa se um job reservado não é entregue a outro worker enquanto o lease vale."""
+        job_id = fila.enfileirar("Paz", TipoRoteiro.SHORT)
+        job = fila.reservar("w1")
+        assert job.id == job_id
+        assert job.tentativas == 1
+        assert fila.reservar("w2") is None
+        assert fila.obter(job_id)["status"] == EXECUTANDO
+
+    def test_lease_expirado_volta_para_a_fila(self, fila):
+        """Testa se um job de um worker que morreu é retomado por outro."""
+        job_id = fila.enfileirar("Paz", TipoRoteiro.SHORT)
+        antigo = fila.reservar("w1", visibilidade=0.01)
+        time.sleep(0.02)
+        novo = fila.reservar("w2")
+        assert novo.id == job_id
+        assert novo.tentativas == 2
+        # O worker antigo não consegue mais concluir
+        assert fila.concluir(antigo) is False
+        assert fila.concluir(novo) is True
+        assert fila.obter(job_id)["status"] == CONCLUIDO
+
+    def test_retentativa_com_backoff(self):
+        """Testa se uma falha devolve o job à fila só depois do backoff."""
+        fila = FilaJobs(backoff_base=60.0)
+        job_id = fila.enfileirar("Paz", TipoRoteiro.SHORT)
+        assert fila.falhar(fila.reservar("w1"), "erro") == PENDENTE
+        registro = fila.obter(job_id)
+        assert registro["disponivel_em"] >= time.time() + 29
+        assert registro["erro"] == "erro"
+        assert fila.reservar("w1") is None
+
+    def test_dead_letter(self, fila):
+        """Testa se o job vai para 'morto' ao esgotar as tentativas."""
+        job_id = fila.enfileirar("Paz", TipoRoteiro.SHORT, max_tentativas=2)
+        assert fila.falhar(fila.reservar("w1"), "erro 1") == PENDENTE
+        assert fila.falhar(fila.reservar("w1"), "erro 2") == MORTO
+        assert fila.reservar("w1") is None
+        assert fila.obter(job_id)["status"] == MORTO
+
+
+class TestWorker:
+    """Testes do worker que executa os agentes."""
+
+    @patch('src.agents.youtube_detail_agent.gerar_detail_video_youtube')
+    @patch('src.agents.roteiro_agent.gerar_roteiro')
+    @patch.object(Worker, '_agentes', return_value=(None, None))
+    def test_processa_jobs_concorrentes(self, mock_agentes, mock_roteiro, mock_detalhes, fila, sample_roteiro,
+                                        sample_detail_video):
+        """Testa se o worker processa todos os jobs e registra o roteiro de cada um."""
+        mock_roteiro.side_effect = lambda tema, tipo, refs, agente: (sample_roteiro, save_roteiro_sqlite(sample_roteiro))
+        mock_detalhes.return_value = sample_detail_video
+        ids = [fila.enfileirar(f"Tema {i}", TipoRoteiro.SHORT) for i in range(5)]
+
+        concluidos = Worker(fila, concorrencia=3).executar(parar_quando_vazio=True)
+
+        assert concluidos == 5
+        assert mock_roteiro.call_count == 5
+        assert all(fila.obter(i)["status"] == CONCLUIDO for i in ids)
+        assert len({fila.obter(i)["roteiro_id"] for i in ids}) == 5
+
+    @patch('src.agents.youtube_detail_agent.gerar_detail_video_youtube')
+    @patch('src.agents.roteiro_agent.gerar_roteiro')
+    @patch.object(Worker, '_agentes', return_value=(None, None))
+    def test_retentativa_nao_repete_o_roteiro(self, mock_agentes, mock_roteiro, mock_detalhes, fila, sample_roteiro,
+                                              sample_detail_video):
+        """Testa se, falhando na etapa de detalhes, a nova tentativa reaproveita o roteiro salvo."""
+        mock_roteiro.side_effect = lambda tema, tipo, refs, agente: (sample_roteiro, save_roteiro_sqlite(sample_roteiro))
+        mock_detalhes.side_effect = [RuntimeError("timeout"), sample_detail_video]
+        job_id = fila.enfileirar("Ansiedade", TipoRoteiro.LONGO)
+
+        Worker(fila, concorrencia=1).executar(parar_quando_vazio=True)
+
+        assert mock_roteiro.call_count == 1
+        assert mock_detalhes.call_count == 2
+        roteiro_recarregado = mock_detalhes.call_args[0][0]
+        assert roteiro_recarregado.tema == sample_roteiro.tema
+        assert fila.obter(job_id)["status"] == CONCLUIDO
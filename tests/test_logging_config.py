@@ -0,0 +1,61 @@
+"""
+Testes para a configuração de logging.
+"""
+import io
+import json
+import sys
+
+import pytest
+from loguru import logger
+
+from src.logging_config import configurar_logging, logger_amostrado
+
+
+@pytest.fixture
+def saida():
+    destino = io.StringIO()
+    yield destino
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+class TestLogging:
+    """Testes do sink configurado, da amostragem e da formatação preguiçosa."""
+
+    def test_amostragem_so_nas_mensagens_marcadas(self, saida):
+        """Testa 1 a cada N mensagens amostradas, sem tocar nas normais nem nos avisos."""
+        configurar_logging("INFO", amostragem=5, destino=saida, enqueue=False)
+        for i in range(10):
+            logger_amostrado.info("versículo {}", i)
+            logger.info("normal {}", i)
+        logger_amostrado.warning("aviso")
+
+        linhas = saida.getvalue().splitlines()
+        assert sum("versículo" in l for l in linhas) == 2
+        assert sum("normal" in l for l in linhas) == 10
+        assert any("aviso" in l for l in linhas)
+
+    def test_json_com_enqueue(self, saida):
+        """Testa uma linha JSON por registro, gravada pela thread em segundo plano."""
+        configurar_logging("INFO", json=True, destino=saida)
+        logger.info("Roteiro {} salvo", 42)
+        logger.complete()
+
+        registro = json.loads(saida.getvalue().splitlines()[0])
+        assert registro["record"]["message"] == "Roteiro 42 salvo"
+        assert registro["record"]["level"]["name"] == "INFO"
+
+    def test_abaixo_do_nivel_nao_renderiza(self, saida):
+        """Testa que argumentos de mensagens descartadas não são convertidos em texto."""
+        class Caro:
+            renderizado = False
+
+            def __str__(self):
+                Caro.renderizado = True
+                return "caro"
+
+        configurar_logging("INFO", destino=saida, enqueue=False)
+        logger.debug("Roteiro gerado: {}", Caro())
+        assert not Caro.renderizado
+        logger.info("Roteiro gerado: {}", Caro())
+        assert Caro.renderizado
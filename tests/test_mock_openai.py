@@ -0,0 +1,139 @@
+"""
+Testes para o servidor local compatível com a OpenAI.
+"""
+import json
+from unittest.mock import patch
+
+import openai
+import pytest
+from agno.models.openai import OpenAIChat
+from agno.utils.models.schema_utils import get_response_schema_for_provider
+
+from src.agents.roteiro_agent import agente_padrao, gerar_roteiro
+from src.bible_tool import BibleLookupTool, Pagina
+from src.mock_openai import MockOpenAIServer, chave_requisicao
+from src.models import RoteiroBiblico, DetailVideoYouTube, TipoRoteiro
+
+HTML_CAPITULO = ''.join(f'<span class="v">{i}</span><span class="t">Texto do versículo {i}.</span>'
+                        for i in range(1, 177))
+
+
+def _response_format(modelo):
+    return {"type": "json_schema", "json_schema": {
+        "name": modelo.__name__, "schema": get_response_schema_for_provider(modelo, "openai"), "strict": True}}
+
+
+@pytest.fixture
+def servidor():
+    """Fixture que sobe o servidor em uma porta livre."""
+    server = MockOpenAIServer(semente=1)
+    server.iniciar_em_thread()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _cliente(server):
+    return openai.OpenAI(base_url=server.url, api_key="mock", max_retries=0)
+
+
+class TestMockOpenAIServer:
+    """Testes do servidor de chat completions simulado."""
+
+    def test_saida_estruturada_roteiro(self, servidor):
+        """Testa se a resposta valida contra RoteiroBiblico."""
+        resp = _cliente(servidor).chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Gere um roteiro Short sobre o tema 'Esperança'"}],
+            response_format=_response_format(RoteiroBiblico),
+        )
+        roteiro = RoteiroBiblico.model_validate_json(resp.choices[0].message.content)
+        assert roteiro.tema == "Esperança"
+        assert roteiro.tipo == TipoRoteiro.SHORT
+        assert resp.usage.total_tokens > 0
+
+    def test_turno_de_ferramenta(self, servidor):
+        """Testa se o primeiro turno chama lookup_verse quando a ferramenta é oferecida."""
+        tools = [{"type": "function", "function": {"name": "lookup_verse", "parameters": {"type": "object"}}}]
+        resp = _cliente(servidor).chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "tema 'Fé'"}], tools=tools,
+        )
+        choice = resp.choices[0]
+        assert choice.finish_reason == "tool_calls"
+        assert choice.message.tool_calls[0].function.name == "lookup_verse"
+        assert "referencia" in json.loads(choice.message.tool_calls[0].function.arguments)
+
+    def test_streaming(self, servidor):
+        """Testa se o streaming remonta uma saída válida."""
+        stream = _cliente(servidor).chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "TEMA: Gratidão"}],
+            response_format=_response_format(DetailVideoYouTube),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        partes, uso = [], None
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                partes.append(chunk.choices[0].delta.content)
+            uso = chunk.usage or uso
+        info = DetailVideoYouTube.model_validate_json("".join(partes))
+        assert "Gratidão" in info.titulo
+        assert uso is not None
+
+    def test_erro_429_injetado(self):
+        """Testa a injeção de erros de rate limit."""
+        server = MockOpenAIServer(taxa_429=1.0)
+        server.iniciar_em_thread()
+        try:
+            with pytest.raises(openai.RateLimitError):
+                _cliente(server).chat.completions.create(model="m", messages=[{"role": "user", "content": "oi"}])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_limite_rpm(self):
+        """Testa se o limite de requisições por minuto gera 429."""
+        server = MockOpenAIServer(rpm=2)
+        server.iniciar_em_thread()
+        try:
+            cliente = _cliente(server)
+            for _ in range(2):
+                cliente.chat.completions.create(model="m", messages=[{"role": "user", "content": "oi"}])
+            with pytest.raises(openai.RateLimitError):
+                cliente.chat.completions.create(model="m", messages=[{"role": "user", "content": "oi"}])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_reproduz_resposta_gravada(self, tmp_path):
+        """Testa se respostas gravadas têm prioridade sobre a síntese."""
+        corpo = {"model": "m", "messages": [{"role": "user", "content": "oi"}]}
+        gravada = {"id": "gravada", "object": "chat.completion", "created": 0, "model": "m",
+                   "choices": [{"index": 0, "finish_reason": "stop",
+                                "message": {"role": "assistant", "content": "resposta gravada"}}]}
+        (tmp_path / f"{chave_requisicao(corpo)}.json").write_text(json.dumps(gravada), encoding="utf-8")
+
+        server = MockOpenAIServer(gravacoes=tmp_path)
+        server.iniciar_em_thread()
+        try:
+            resp = _cliente(server).chat.completions.create(**corpo)
+            assert resp.choices[0].message.content == "resposta gravada"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    @patch('src.agents.roteiro_agent.save_roteiro_sqlite')
+    @patch.object(BibleLookupTool, '_download_condicional', return_value=Pagina(HTML_CAPITULO))
+    def test_agente_apontado_para_o_servidor(self, mock_download, mock_save_sqlite, mock_save_json, servidor):
+        """Testa o agente de roteiro completo (com chamadas de ferramenta) contra o servidor."""
+        mock_save_sqlite.return_value = 1
+        modelo = OpenAIChat(id="gpt-4o-mini", base_url=servidor.url, api_key="mock")
+        with patch.object(agente_padrao(), 'model', modelo), patch.object(agente_padrao(), 'storage', None):
+            roteiro, roteiro_id = gerar_roteiro("Paz", TipoRoteiro.LONGO)
+
+        assert isinstance(roteiro, RoteiroBiblico)
+        assert mock_download.call_count == 3
+        assert len(roteiro.versiculos_utilizados) == 3
+        assert "Texto do versículo" in roteiro.roteiro
@@ -0,0 +1,132 @@
+"""
+Testes para o roteamento de modelos, a cadeia de fallback e as requisições de cobertura.
+"""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from agno.exceptions import ModelProviderError, ModelRateLimitError
+
+from src import utils
+from src.accounting import ExecucaoGeracao, gravar_execucoes
+from src.model_router import MIN_AMOSTRAS_HEDGE, Roteador, ler_rotas
+from src.models import TipoRoteiro
+
+
+def _agente(conteudo="ok", erro=None):
+    agente = MagicMock()
+    agente.run.side_effect = erro
+    agente.run.return_value.content = conteudo
+    return agente
+
+
+class TestRotas:
+    """Testes da configuração e da escolha da cadeia."""
+
+    def test_ler_rotas(self):
+        """Testa o formato de ROTAS_MODELOS e a recusa de rotas vazias."""
+        assert ler_rotas("roteiro.short=a, b; detalhes=c") == {("roteiro", "short"): ["a", "b"],
+                                                               ("detalhes", None): ["c"]}
+        assert ler_rotas("") == {}
+        with pytest.raises(ValueError):
+            ler_rotas("roteiro=")
+
+    def test_cadeia_por_tipo(self):
+        """Testa a precedência: tipo, etapa, modelo padrão."""
+        roteador = Roteador(ler_rotas("roteiro.short=nano,mini;roteiro=mini,4o"))
+        assert roteador.cadeia("roteiro", TipoRoteiro.SHORT, "padrao") == ["nano", "mini"]
+        assert roteador.cadeia("roteiro", TipoRoteiro.LONGO, "padrao") == ["mini", "4o"]
+        assert roteador.cadeia("detalhes", TipoRoteiro.SHORT, "padrao") == ["padrao"]
+
+
+class TestFallback:
+    """Testes da troca de modelo em falhas."""
+
+    def test_sem_rota_uma_chamada(self):
+        """Testa que sem configuração o agente recebido roda uma única vez."""
+        agente, fabrica = _agente(), MagicMock()
+        resposta, _ = Roteador().executar("roteiro", "prompt", fabrica, "padrao", agente=agente)
+        agente.run.assert_called_once_with("prompt")
+        fabrica.assert_not_called()
+        assert resposta.model == "padrao"
+
+    def test_troca_em_5xx(self):
+        """Testa a passagem para o próximo modelo da cadeia em erro do servidor."""
+        falha = _agente(erro=ModelProviderError("timeout", status_code=502))
+        reserva = _agente("reserva")
+        fabrica = MagicMock(side_effect=lambda modelo: {"a": falha, "b": reserva}[modelo])
+
+        resposta, _ = Roteador(ler_rotas("detalhes=a,b")).executar("detalhes", "p", fabrica, "a")
+
+        assert resposta.content == "reserva" and resposta.model == "b"
+        assert [c.args[0] for c in fabrica.call_args_list] == ["a", "b"]
+
+    @pytest.mark.parametrize("erro", [ModelRateLimitError("429"), ModelProviderError("400", status_code=400)])
+    def test_nao_troca_em_429_ou_4xx(self, erro):
+        """Testa que limites de taxa e erros do pedido são propagados sem fallback."""
+        fabrica = MagicMock(side_effect=[_agente(erro=erro), _agente()])
+        with pytest.raises(ModelProviderError):
+            Roteador(ler_rotas("detalhes=a,b")).executar("detalhes", "p", fabrica, "a")
+        assert fabrica.call_count == 1
+
+
+class TestHedge:
+    """Testes da requisição de cobertura."""
+
+    def test_atraso_semeado_pelo_historico(self):
+        """Testa o p95 a partir de generation_runs e a ausência de hedge sem amostras."""
+        gravar_execucoes(str(utils.DB_PATH), [ExecucaoGeracao(None, "roteiro", "m", wall_time=float(i))
+                                              for i in range(1, 101)])
+        roteador = Roteador()
+        assert 94 <= roteador.atraso_hedge("roteiro", "m") <= 96
+        assert roteador.atraso_hedge("roteiro", "outro") is None
+
+    def test_vence_a_mais_rapida(self):
+        """Testa que a segunda requisição responde quando a primeira passa do p95."""
+        liberar = threading.Event()
+        lenta = _agente("lenta")
+        lenta.run.side_effect = lambda prompt: (liberar.wait(5), lenta.run.return_value)[1]
+        rapida = _agente("rápida")
+        roteador = Roteador(hedge=True)
+        for _ in range(MIN_AMOSTRAS_HEDGE):
+            roteador.registrar_duracao("detalhes", "m", 0.01)
+
+        agentes = iter([lenta, rapida])
+
+        with patch("src.model_router.registrar_execucao") as registrar:
+            resposta, _ = roteador.executar("detalhes", "p", lambda modelo: next(agentes), "m")
+            assert resposta.content == "rápida"
+            liberar.set()
+            for _ in range(50):
+                if registrar.called:
+                    break
+                time.sleep(0.05)
+        assert registrar.call_args[0][1] == "detalhes:descartada"
+
+    def test_perdedora_nao_compartilha_agente(self):
+        """Testa que a requisição perdedora, ainda rodando, não fica no agente usado pelas chamadas seguintes."""
+        liberar = threading.Event()
+        compartilhado = _agente("compartilhado")
+        criados = []
+
+        def fabrica(modelo):
+            agente = _agente(f"agente {len(criados)}")
+            if not criados:  # a primeira requisição só termina no fim do teste
+                agente.run.side_effect = lambda prompt: (liberar.wait(5), agente.run.return_value)[1]
+            criados.append(agente)
+            return agente
+
+        roteador = Roteador(hedge=True)
+        for _ in range(MIN_AMOSTRAS_HEDGE):
+            roteador.registrar_duracao("detalhes", "m", 0.01)
+        try:
+            with patch("src.model_router.registrar_execucao"):
+                roteador.executar("detalhes", "p", fabrica, "m", agente=compartilhado)
+                roteador.executar("detalhes", "p", fabrica, "m", agente=compartilhado)
+        finally:
+            liberar.set()
+
+        compartilhado.run.assert_not_called()
+        assert criados[0].run.call_count == 1
+        assert len({id(agente) for agente in criados}) == len(criados) == 3
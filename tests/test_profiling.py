@@ -0,0 +1,57 @@
+"""
+Testes para o perfilamento opcional das gerações.
+"""
+import pstats
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src import profiling
+from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+
+
+@pytest.fixture
+def ligado(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "ATIVO", True)
+    # Subdiretório próprio: tmp_path também recebe o banco (e o -journal) da contabilidade
+    diretorio = tmp_path / "profiles"
+    monkeypatch.setattr(profiling, "PROFILES_DIR", diretorio)
+    return diretorio
+
+
+class TestPerfilamento:
+    """Testes do context manager, do decorador e do resumo."""
+
+    def test_desligado_nao_grava(self, tmp_path, monkeypatch):
+        """Testa que sem PROFILE_GERACAO nada é medido nem gravado."""
+        monkeypatch.setattr(profiling, "ATIVO", False)
+        with profiling.perfilar("x", diretorio=tmp_path) as caminho:
+            pass
+        assert caminho is None and not list(tmp_path.iterdir())
+
+    def test_resumo_com_cpu_e_alocacoes(self, ligado):
+        """Testa os arquivos .prof/.txt e as alocações do BeautifulSoup no resumo."""
+        html = "<p>" + "<span class='t'>Deus é amor</span>" * 2000 + "</p>"
+        with profiling.perfilar("sopa") as caminho:
+            with profiling.perfilar("aninhado") as interno:
+                arvore = BeautifulSoup(html, "html.parser")
+
+        assert interno is None
+        assert len(arvore.find_all("span")) == 2000
+        texto = caminho.read_text(encoding="utf-8")
+        assert "CPU por tempo acumulado" in texto and "Alocações" in texto
+        assert "bs4" in texto
+        assert pstats.Stats(str(caminho.with_suffix(".prof"))).total_calls > 0
+        assert not tracemalloc.is_tracing()
+
+    def test_decorador_nas_geracoes(self, ligado, sample_roteiro, sample_detail_video):
+        """Testa o perfil de gerar_detail_video_youtube, nomeado pelo tema."""
+        with patch("src.agents.youtube_detail_agent.agent") as agente:
+            agente.run.return_value.content = sample_detail_video
+            assert gerar_detail_video_youtube(sample_roteiro) == sample_detail_video
+
+        perfis = [p.name for p in ligado.glob("*.prof")]
+        assert len(perfis) == 1
+        assert perfis[0].endswith("_detalhes_Ansiedade.prof")
@@ -0,0 +1,96 @@
+"""
+Testes para o limitador de taxa compartilhado entre processos.
+"""
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.rate_limiter import LimitadorTaxa, estimar_tokens
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste; dormir apenas avança o tempo."""
+
+    def __init__(self):
+        self.agora = 1000.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(round(segundos, 6))
+        self.agora += segundos
+
+
+def _adquirir_varias(db_path, vezes, fila):
+    limitador = LimitadorTaxa(rpm=1200, db_path=db_path, rajada_segundos=0.05)
+    for _ in range(vezes):
+        limitador.adquirir("m", tokens=10)
+        fila.put(time.time())
+
+
+@pytest.fixture
+def relogio():
+    return RelogioFalso()
+
+
+class TestLimitadorTaxa:
+    """Testes dos baldes RPM/TPM."""
+
+    def test_inativo_sem_limites(self, tmp_path):
+        """Testa se sem RPM/TPM o limitador não toca no banco nem espera."""
+        limitador = LimitadorTaxa(db_path=str(tmp_path / "rl.sqlite3"))
+        reserva = limitador.adquirir("m", tokens=10_000)
+        assert reserva.espera == 0
+        assert not (tmp_path / "rl.sqlite3").exists()
+
+    def test_espaca_requisicoes_no_limite_rpm(self, tmp_path, relogio):
+        """Testa se, esgotada a rajada, cada requisição espera exatamente a sua vez."""
+        limitador = LimitadorTaxa(rpm=60, db_path=str(tmp_path / "rl.sqlite3"), rajada_segundos=1,
+                                  relogio=relogio, dormir=relogio.dormir)
+        for _ in range(4):
+            limitador.adquirir("m", tokens=1)
+        assert relogio.esperas == [1.0, 1.0, 1.0]
+
+    def test_limite_tpm(self, tmp_path, relogio):
+        """Testa se o balde de tokens limita requisições grandes."""
+        limitador = LimitadorTaxa(tpm=6000, db_path=str(tmp_path / "rl.sqlite3"), rajada_segundos=10,
+                                  relogio=relogio, dormir=relogio.dormir)
+        limitador.adquirir("m", tokens=1000)
+        reserva = limitador.adquirir("m", tokens=500)
+        assert reserva.espera == pytest.approx(5.0)
+
+    def test_ajuste_pelo_uso_real(self, tmp_path, relogio):
+        """Testa se o uso acima do estimado é descontado das próximas reservas."""
+        limitador = LimitadorTaxa(tpm=6000, db_path=str(tmp_path / "rl.sqlite3"), rajada_segundos=10,
+                                  relogio=relogio, dormir=relogio.dormir)
+        resposta = SimpleNamespace(metrics={"input_tokens": [400, 500], "output_tokens": [50, 50]})
+        with limitador.limitar("m", tokens=100) as reserva:
+            reserva.registrar_uso(resposta)
+        assert reserva.tokens_reais == 1000
+        assert reserva.requisicoes_reais == 2
+        assert limitador.adquirir("m", tokens=100).espera == pytest.approx(1.0)
+
+    def test_estimar_tokens(self):
+        """Testa a estimativa de tokens pelo tamanho do texto."""
+        assert estimar_tokens("a" * 400, "b" * 400) == 201
+
+    def test_compartilhado_entre_processos(self, tmp_path):
+        """Testa se dois processos dividem o mesmo limite (20 req/s, sem rajada)."""
+        db_path = str(tmp_path / "rl.sqlite3")
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        processos = [contexto.Process(target=_adquirir_varias, args=(db_path, 5, fila)) for _ in range(2)]
+        for p in processos:
+            p.start()
+        instantes = sorted(fila.get(timeout=30) for _ in range(10))
+        for p in processos:
+            p.join(30)
+        assert all(p.exitcode == 0 for p in processos)
+        # Em qualquer janela, no máximo 1 (rajada) + 20/s * duração requisições liberadas
+        for i in range(len(instantes)):
+            for j in range(i + 1, len(instantes)):
+                assert j - i <= 1 + 20 * (instantes[j] - instantes[i]) + 0.2
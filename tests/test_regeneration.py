@@ -0,0 +1,68 @@
+"""
+Testes para a regeneração de um campo.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import utils
+from src.regeneration import modelo_campo, regenerar_campo
+
+
+def _agente(campo, valor):
+    agente = MagicMock()
+    agente.run.return_value.content = modelo_campo(campo)(**{campo: valor})
+    return agente
+
+
+@pytest.fixture
+def gravado(tmp_path, monkeypatch, sample_roteiro, sample_detail_video):
+    monkeypatch.setattr(utils, "OUT_DIR", tmp_path)
+    roteiro_id = utils.save_roteiro_sqlite(sample_roteiro)
+    caminho = utils.save_roteiro_json(sample_roteiro)
+    utils.save_info_video_sqlite(sample_detail_video, roteiro_id)
+    return roteiro_id, caminho
+
+
+class TestRegenerarCampo:
+    """Testes da regeneração de campos isolados."""
+
+    def test_modelo_de_um_campo(self):
+        """Testa se o modelo de saída herda tipo e descrição do campo original."""
+        modelo = modelo_campo("tags")
+        assert list(modelo.model_fields) == ["tags"]
+        assert modelo.model_fields["tags"].description == "Tags relevantes para SEO do YouTube"
+        with pytest.raises(ValueError):
+            modelo_campo("roteiro")
+
+    def test_regenera_titulo(self, gravado, sample_roteiro, sample_detail_video):
+        """Testa se só o título muda e se o prompt leva um contexto mínimo."""
+        roteiro_id, _ = gravado
+        agente = _agente("titulo", "Novo título")
+
+        assert regenerar_campo(roteiro_id, "titulo", "mais curto", agente=agente) == "Novo título"
+
+        prompt = agente.run.call_args[0][0]
+        assert sample_detail_video.titulo in prompt and "mais curto" in prompt
+        assert sample_roteiro.roteiro not in prompt
+        info = utils.get_info_video(roteiro_id)
+        assert info.titulo == "Novo título"
+        assert info.model_dump(exclude={"titulo"}) == sample_detail_video.model_dump(exclude={"titulo"})
+
+    def test_regenera_postagem_no_banco_e_no_json(self, gravado, sample_roteiro):
+        """Testa a atualização da coluna e do arquivo JSON do roteiro."""
+        roteiro_id, caminho = gravado
+
+        regenerar_campo(roteiro_id, "postagem_comunidade", agente=_agente("postagem_comunidade", "Nova postagem ✨"))
+
+        assert utils.get_roteiro(roteiro_id).postagem_comunidade == "Nova postagem ✨"
+        salvo = json.loads(caminho.read_text(encoding="utf-8"))
+        assert salvo["postagem_comunidade"] == "Nova postagem ✨"
+        assert salvo["roteiro"] == sample_roteiro.roteiro
+
+    def test_sem_informacoes_de_video(self, sample_roteiro):
+        """Testa o erro quando o roteiro ainda não tem informações de vídeo."""
+        roteiro_id = utils.save_roteiro_sqlite(sample_roteiro)
+        with pytest.raises(ValueError, match="informações de vídeo"):
+            regenerar_campo(roteiro_id, "thumbnail_prompt", agente=_agente("thumbnail_prompt", "x"))
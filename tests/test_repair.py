@@ -0,0 +1,105 @@
+"""
+Testes para o reparo local de saídas estruturadas.
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models import DetailVideoYouTube, RoteiroBiblico, TipoRoteiro
+from src.repair import derivar_detalhes, derivar_roteiro, garantir_modelo, ler_json_parcial, reparar
+
+ROTEIRO = {
+    "tema": "Cuidado",
+    "roteiro": "Deus cuida de você.\n\nSalmos 23:1 (NTLH)\nO SENHOR é o meu pastor.\n\nAmém.",
+    "versiculos_utilizados": ["Salmos 23:1"],
+    "tipo": "Short",
+    "postagem_comunidade": "Como Deus cuidou de você hoje? ✨",
+}
+
+
+class TestJsonParcial:
+    """Testes da leitura tolerante de JSON."""
+
+    def test_cercas_e_texto_em_volta(self):
+        """Testa se o JSON é achado dentro de cercas de código e texto solto."""
+        texto = "Aqui está:\n```json\n" + json.dumps(ROTEIRO) + "\n```\nEspero ter ajudado!"
+        assert ler_json_parcial(texto) == ROTEIRO
+
+    def test_truncado_no_meio_de_uma_string(self):
+        """Testa se a string longa cortada é fechada em vez de descartada."""
+        completo = json.dumps(ROTEIRO, ensure_ascii=False)
+        dados = ler_json_parcial(completo[:completo.index("Amém")])
+        assert dados["roteiro"].endswith("O SENHOR é o meu pastor.\n\n")
+        assert dados["tema"] == "Cuidado"
+
+    def test_truncado_numa_chave(self):
+        """Testa se o último membro incompleto é descartado."""
+        assert ler_json_parcial('{"titulo": "Paz", "tags": ["fé", "paz"], "hasht') == {"titulo": "Paz",
+                                                                                     "tags": ["fé", "paz"]}
+        assert ler_json_parcial("sem json nenhum") is None
+
+
+class TestReparar:
+    """Testes da coerção e dos campos derivados."""
+
+    def test_tags_como_texto_e_hashtags_derivadas(self):
+        """Testa a conversão de texto em lista e as hashtags geradas das tags."""
+        bruto = json.dumps({"titulo": "Paz", "descricao": "Descrição", "tags": "fé, paz interior; oração",
+                            "thumbnail_prompt": "Luz dourada"})
+        info, erro = reparar(bruto, DetailVideoYouTube, derivar=derivar_detalhes)
+        assert erro == ""
+        assert info.tags == ["fé", "paz interior", "oração"]
+        assert info.hashtags == ["#fé", "#pazinterior", "#oração"]
+
+    def test_versiculos_derivados_do_texto_e_padroes(self):
+        """Testa versiculos_utilizados tirado dos blocos e o tema vindo do chamador."""
+        dados = {k: v for k, v in ROTEIRO.items() if k not in ("versiculos_utilizados", "tema")}
+        dados["tipo"] = "short"
+        roteiro, erro = reparar(dados, RoteiroBiblico, padroes={"tema": "Cuidado"}, derivar=derivar_roteiro)
+        assert erro == ""
+        assert roteiro.tema == "Cuidado" and roteiro.tipo is TipoRoteiro.SHORT
+        assert roteiro.versiculos_utilizados == ["Salmos 23:1"]
+
+    def test_erro_descreve_os_campos(self):
+        """Testa a mensagem quando falta um campo que não dá para derivar."""
+        roteiro, erro = reparar({"tema": "Cuidado"}, RoteiroBiblico)
+        assert roteiro is None and "roteiro" in erro
+
+
+class TestGarantirModelo:
+    """Testes da ordem: instância, reparo local, pedido ao modelo."""
+
+    def test_instancia_passa_direto(self, sample_roteiro):
+        """Testa que um modelo já válido não é tocado nem gera chamada."""
+        agente = MagicMock()
+        assert garantir_modelo(sample_roteiro, RoteiroBiblico, agente=agente) is sample_roteiro
+        agente.run.assert_not_called()
+
+    def test_reparo_local_evita_chamada(self):
+        """Testa que JSON truncado reparável não chega ao modelo."""
+        agente = MagicMock()
+        completo = json.dumps(ROTEIRO, ensure_ascii=False)
+        roteiro = garantir_modelo(completo[:-5], RoteiroBiblico, agente=agente)
+        assert roteiro.tipo is TipoRoteiro.SHORT
+        agente.run.assert_not_called()
+
+    def test_pedido_de_correcao(self, sample_detail_video):
+        """Testa o pedido curto ao modelo quando o reparo local não basta."""
+        agente = MagicMock()
+        agente.run.return_value.content = sample_detail_video
+
+        info = garantir_modelo('{"titulo": "Paz"}', DetailVideoYouTube, agente=agente)
+
+        assert info is sample_detail_video
+        prompt = agente.run.call_args[0][0]
+        assert "DetailVideoYouTube" in prompt and "descricao" in prompt and '{"titulo": "Paz"}' in prompt
+
+    def test_falha_definitiva(self):
+        """Testa o ValueError quando nem o pedido de correção resolve."""
+        agente = MagicMock()
+        agente.run.return_value.content = "ainda inválido"
+        with pytest.raises(ValueError, match="DetailVideoYouTube"):
+            garantir_modelo('{"titulo": "Paz"}', DetailVideoYouTube, agente=agente)
+        with pytest.raises(ValueError):
+            garantir_modelo(None, DetailVideoYouTube, agente=agente)
@@ -0,0 +1,83 @@
+"""
+Testes para a medição de extensão e a continuação de roteiros curtos.
+"""
+from unittest.mock import MagicMock, patch
+
+from src.agents.roteiro_agent import completar_extensao, gerar_roteiro
+from src.models import ContinuacaoRoteiro, RoteiroBiblico, TipoRoteiro
+from src.script_length import anexar, contar_palavras, medir
+
+TEXTO_SHORT = ("Salmos 23:1\nO SENHOR é o meu pastor: nada me faltará.\n\n"
+               "Inscreva-se no canal!")
+
+
+def _short(texto=TEXTO_SHORT):
+    return RoteiroBiblico(tema="Cuidado", roteiro=texto, versiculos_utilizados=["Salmos 23:1"], tipo=TipoRoteiro.SHORT)
+
+
+def _continuacao(palavras, referencia="Isaías 41:10"):
+    return ContinuacaoRoteiro(blocos=f"{referencia}\n" + " ".join(["palavra"] * palavras),
+                              versiculos_utilizados=[referencia])
+
+
+class TestExtensao:
+    """Testes da contagem local."""
+
+    def test_contar_e_medir(self):
+        """Testa a contagem de palavras, o tempo de leitura e o quanto falta para o mínimo."""
+        assert contar_palavras("Inscreva-se no canal, irmão!") == 4
+        extensao = medir(_short())
+        assert extensao.palavras == contar_palavras(TEXTO_SHORT)
+        assert extensao.faltam == 150 - extensao.palavras
+        assert extensao.minutos == extensao.palavras / 150
+
+    def test_anexar_antes_do_convite(self):
+        """Testa se os novos blocos entram depois do último bloco e antes do convite final."""
+        roteiro = _short()
+
+        anexar(roteiro, _continuacao(3))
+
+        assert roteiro.roteiro == ("Salmos 23:1\nO SENHOR é o meu pastor: nada me faltará.\n\n"
+                                   "Isaías 41:10\npalavra palavra palavra\n\nInscreva-se no canal!")
+        assert roteiro.versiculos_utilizados == ["Salmos 23:1", "Isaías 41:10"]
+
+
+class TestCompletarExtensao:
+    """Testes dos pedidos de continuação."""
+
+    def test_pede_so_o_que_falta_com_resumo(self):
+        """Testa se o pedido leva o resumo (sem o texto) e para ao atingir o mínimo."""
+        roteiro = _short()
+        agente = MagicMock()
+        agente.run.side_effect = [MagicMock(content=_continuacao(60)), MagicMock(content=_continuacao(200, "Mateus 6:34"))]
+
+        execucoes = completar_extensao(roteiro, agente=agente, max_rodadas=3)
+
+        assert len(execucoes) == 2
+        primeiro_prompt = agente.run.call_args_list[0][0][0]
+        assert "Salmos 23:1" in primeiro_prompt and "meu pastor" not in primeiro_prompt
+        assert "Isaías 41:10" in agente.run.call_args_list[1][0][0]
+        assert medir(roteiro).faltam == 0
+
+    def test_roteiro_na_extensao_nao_chama_agente(self):
+        """Testa que nada é pedido quando o roteiro já tem a extensão mínima."""
+        agente = MagicMock()
+        assert completar_extensao(_short(TEXTO_SHORT + " amém" * 200), agente=agente) == []
+        agente.run.assert_not_called()
+
+    @patch('src.agents.roteiro_agent.criar_agente_continuacao')
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_gerar_roteiro_completa(self, mock_save_json, mock_agent, mock_criar, monkeypatch):
+        """Testa a continuação dentro de gerar_roteiro, gravando o roteiro já completo."""
+        from src.agents import roteiro_agent
+        from src.utils import get_roteiro
+
+        monkeypatch.setattr(roteiro_agent, "COMPLETAR_EXTENSAO", 1)
+        mock_agent.run.return_value.content = _short()
+        mock_criar.return_value.run.return_value.content = _continuacao(200)
+
+        roteiro, roteiro_id = gerar_roteiro("Cuidado", TipoRoteiro.SHORT, ["sl 23"])
+
+        mock_agent.run.assert_called_once()
+        assert "Isaías 41:10" in get_roteiro(roteiro_id).roteiro
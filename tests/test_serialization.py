@@ -0,0 +1,64 @@
+"""
+Testes para a serialização JSON dos modelos.
+"""
+import json
+from unittest.mock import patch
+
+from src import serialization, utils
+from src.serialization import colunas_lista, para_json
+
+
+class TestSerializacao:
+    """Testes do cache de serialização e dos modos compacto/indentado."""
+
+    def test_mesmo_conteudo_do_model_dump(self, sample_roteiro):
+        """Testa se os bytes equivalem ao caminho antigo, com acentos sem escape."""
+        esperado = sample_roteiro.model_dump(mode="json")
+
+        assert json.loads(para_json(sample_roteiro)) == esperado
+        assert para_json(sample_roteiro, compacto=False) == \
+               json.dumps(esperado, ensure_ascii=False, indent=2).encode("utf-8")
+        assert "Isaías".encode("utf-8") in para_json(sample_roteiro)
+
+    def test_serializa_uma_vez(self, sample_roteiro):
+        """Testa se gravações seguidas do mesmo modelo reaproveitam os bytes."""
+        with patch.object(type(sample_roteiro), "model_dump_json", autospec=True,
+                          side_effect=type(sample_roteiro).model_dump_json) as dump:
+            primeiro = para_json(sample_roteiro)
+            assert para_json(sample_roteiro) is primeiro
+            assert colunas_lista(sample_roteiro, "referencias") == {"referencias": '["Salmo 23","Isaías 41:10"]'}
+        assert dump.call_count == 1
+
+    def test_so_a_forma_pedida(self, sample_roteiro, tmp_path, monkeypatch):
+        """Testa que o caminho padrão (arquivo indentado + colunas) não gera o JSON compacto."""
+        monkeypatch.setattr(utils, "OUT_DIR", tmp_path)
+        with patch.object(type(sample_roteiro), "model_dump_json", autospec=True,
+                          side_effect=type(sample_roteiro).model_dump_json) as dump:
+            utils.save_roteiro_sqlite(sample_roteiro)
+            utils.save_roteiro_json(sample_roteiro)
+            utils.save_roteiro_json(sample_roteiro)
+        assert [c.kwargs for c in dump.call_args_list] == [{"indent": 2}]
+
+    def test_reatribuicao_invalida_cache(self, sample_roteiro):
+        """Testa se reatribuir um campo gera bytes novos."""
+        antes = para_json(sample_roteiro)
+        colunas_lista(sample_roteiro, "referencias")
+
+        sample_roteiro.referencias = ["Isaías 40:31"]
+
+        assert json.loads(para_json(sample_roteiro))["referencias"] == ["Isaías 40:31"]
+        assert para_json(sample_roteiro) != antes
+        assert colunas_lista(sample_roteiro, "referencias") == {"referencias": '["Isaías 40:31"]'}
+
+    def test_save_roteiro_json_compacto(self, sample_roteiro, tmp_path, monkeypatch):
+        """Testa o modo compacto por parâmetro e por variável de ambiente."""
+        monkeypatch.setattr(utils, "OUT_DIR", tmp_path)
+
+        indentado = utils.save_roteiro_json(sample_roteiro).read_text(encoding="utf-8")
+        compacto = utils.save_roteiro_json(sample_roteiro, compacto=True).read_text(encoding="utf-8")
+        monkeypatch.setattr(serialization, "JSON_COMPACTO", True)
+        padrao = utils.save_roteiro_json(sample_roteiro).read_text(encoding="utf-8")
+
+        assert "\n" in indentado and "\n" not in compacto
+        assert compacto == padrao
+        assert json.loads(indentado) == json.loads(compacto)
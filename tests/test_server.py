@@ -0,0 +1,109 @@
+"""
+Testes para o serviço HTTP de geração de roteiros.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from src.server import ServicoGeracao, ServidorRoteiros, CANCELADO, CONCLUIDO
+
+
+def _post(url, dados):
+    req = urllib.request.Request(f"{url}/roteiros", data=json.dumps(dados).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _get(url, caminho):
+    with urllib.request.urlopen(f"{url}{caminho}", timeout=5) as resp:
+        return resp.read().decode("utf-8")
+
+
+@pytest.fixture
+def liberar():
+    """Evento que segura a geração do roteiro até o teste liberar."""
+    return threading.Event()
+
+
+@pytest.fixture
+def servidor(liberar, sample_roteiro, sample_detail_video):
+    def gerar_roteiro(tema, tipo, referencias, agente):
+        assert liberar.wait(5)
+        return sample_roteiro, 7
+
+    with patch('src.agents.roteiro_agent.gerar_roteiro', side_effect=gerar_roteiro), \
+            patch('src.agents.youtube_detail_agent.gerar_detail_video_youtube', return_value=sample_detail_video), \
+            patch.object(ServicoGeracao, '_agentes', return_value=(None, None)):
+        servico = ServicoGeracao(tamanho_fila=1, max_roteiro=1, max_detalhes=1)
+        servico.iniciar()
+        server = ServidorRoteiros(("127.0.0.1", 0), servico)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield server
+        liberar.set()
+        server.shutdown()
+        servico.encerrar(5)
+        server.server_close()
+
+
+class TestServidorRoteiros:
+    """Testes dos endpoints HTTP."""
+
+    def test_fluxo_completo_com_eventos(self, servidor, liberar):
+        """Testa POST, progresso por SSE e GET do resultado."""
+        status, corpo = _post(servidor.url, {"tema": "Ansiedade", "tipo": "Video"})
+        assert status == 202
+        liberar.set()
+
+        eventos = _get(servidor.url, f"/roteiros/{corpo['id']}/eventos")
+        assert [linha.split(": ")[1] for linha in eventos.splitlines() if linha.startswith("event:")] == \
+               ["na_fila", "gerando_roteiro", "gerando_detalhes", "concluido"]
+
+        tarefa = json.loads(_get(servidor.url, f"/roteiros/{corpo['id']}"))
+        assert tarefa["status"] == CONCLUIDO
+        assert tarefa["roteiro_id"] == 7
+        assert tarefa["info_video"]["titulo"].startswith("Como Vencer")
+
+    def test_fila_cheia_retorna_429(self, servidor):
+        """Testa a contrapressão: com um pedido em execução e um na fila, o próximo recebe 429."""
+        assert _post(servidor.url, {"tema": "A"})[0] == 202
+        # Espera o primeiro sair da fila para a etapa de roteiro
+        for _ in range(50):
+            if servidor.servico.em_andamento:
+                break
+            threading.Event().wait(0.05)
+        assert _post(servidor.url, {"tema": "B"})[0] == 202
+        status, _ = _post(servidor.url, {"tema": "C"})
+        assert status == 429
+
+    def test_pedido_invalido(self, servidor):
+        """Testa validação do corpo do pedido."""
+        assert _post(servidor.url, {"tipo": "Video"})[0] == 400
+        assert _post(servidor.url, {"tema": "A", "tipo": "Podcast"})[0] == 400
+
+    def test_encerramento_drena_em_andamento(self, servidor, liberar):
+        """Testa se o encerramento espera a tarefa em andamento e cancela a que está na fila."""
+        servico = servidor.servico
+        primeira = servico.enviar("A", "Video")
+        for _ in range(50):
+            if servico.em_andamento:
+                break
+            threading.Event().wait(0.05)
+        segunda = servico.enviar("B", "Video")
+
+        encerramento = threading.Thread(target=servico.encerrar, args=(5,))
+        encerramento.start()
+        threading.Event().wait(0.1)
+        assert _post(servidor.url, {"tema": "C"})[0] == 503
+        liberar.set()
+        encerramento.join(5)
+
+        assert primeira.status == CONCLUIDO
+        assert segunda.status == CANCELADO
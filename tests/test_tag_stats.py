@@ -0,0 +1,121 @@
+"""
+Testes para as estatísticas de tags e hashtags.
+"""
+import sqlite3
+from unittest.mock import patch
+
+from src import tag_stats, utils
+from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+from src.models import DetailVideoYouTube, RoteiroBiblico, TipoRoteiro
+from src.utils import save_info_video_sqlite, save_roteiro_sqlite
+
+
+def _publicar(tema, tags, hashtags=("#fe",)):
+    roteiro_id = save_roteiro_sqlite(RoteiroBiblico(tema=tema, roteiro="...", versiculos_utilizados=[],
+                                                    tipo=TipoRoteiro.SHORT))
+    save_info_video_sqlite(DetailVideoYouTube(titulo=tema, descricao="...", tags=list(tags),
+                                              hashtags=list(hashtags), thumbnail_prompt="..."), roteiro_id)
+    return roteiro_id
+
+
+def _usos(tabela, onde, *args):
+    conn = sqlite3.connect(utils.DB_PATH)
+    try:
+        return conn.execute(f"SELECT usos FROM {tabela} WHERE {onde}", args).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestTagStats:
+    """Testes da manutenção incremental e da consulta das estatísticas."""
+
+    def test_agregados_atualizados_a_cada_video(self):
+        """Testa frequência, coocorrência e uso por palavra do tema após cada gravação."""
+        _publicar("Ansiedade", ["ansiedade", "paz", "oração"])
+        _publicar("Paz na ansiedade", ["ansiedade", "paz "])
+
+        assert _usos("tags_frequencia", "tipo = 'tag' AND tag = ?", "paz") == 2
+        assert _usos("tags_coocorrencia", "tag_a = ? AND tag_b = ?", "paz", "ansiedade") == 2
+        assert _usos("tags_coocorrencia", "tag_a = ? AND tag_b = ?", "oração", "paz") == 1
+        assert _usos("tags_tema", "palavra = ? AND tag = ?", "ansiedade", "paz") == 2
+        assert _usos("tags_frequencia", "tipo = 'hashtag' AND tag = ?", "#fe") == 2
+
+    def test_preenche_com_videos_anteriores(self):
+        """Testa o preenchimento inicial a partir de info_videos_youtube, sem contar o vídeo novo duas vezes."""
+        _publicar("Gratidão", ["gratidão", "louvor"])
+        conn = sqlite3.connect(utils.DB_PATH)
+        with conn:
+            for tabela in ("tags_frequencia", "tags_coocorrencia", "tags_tema"):
+                conn.execute(f"DROP TABLE {tabela}")
+        conn.close()
+
+        _publicar("Gratidão em tudo", ["gratidão"])
+
+        assert _usos("tags_frequencia", "tag = ?", "gratidão") == 2
+        assert _usos("tags_tema", "palavra = ? AND tag = ?", "gratidao", "louvor") == 1
+
+    def test_regeneracao_troca_as_tags_nos_agregados(self):
+        """Testa que reescrever as tags de um vídeo tira as antigas e soma as novas, sem mexer nas hashtags."""
+        _publicar("Paz", ["paz", "calma"])
+        roteiro_id = _publicar("Paz interior", ["paz", "calma", "oração"])
+
+        utils.update_info_video_campo(roteiro_id, "tags", ["paz", "silêncio"])
+
+        assert _usos("tags_frequencia", "tipo = 'tag' AND tag = ?", "paz") == 2
+        assert _usos("tags_frequencia", "tipo = 'tag' AND tag = ?", "calma") == 1
+        assert _usos("tags_frequencia", "tipo = 'tag' AND tag = ?", "silêncio") == 1
+        assert _usos("tags_coocorrencia", "tag_a = ? AND tag_b = ?", "paz", "calma") == 1
+        assert _usos("tags_tema", "palavra = ? AND tag = ?", "interior", "silêncio") == 1
+        assert _usos("tags_frequencia", "tipo = 'hashtag' AND tag = ?", "#fe") == 2
+        conn = sqlite3.connect(utils.DB_PATH)
+        try:
+            contagens = [conn.execute(f"SELECT COUNT(*) FROM {consulta}").fetchone()[0] for consulta in (
+                "tags_frequencia WHERE tag = 'oração'",
+                "tags_coocorrencia WHERE 'oração' IN (tag_a, tag_b)",
+                "tags_tema WHERE tag = 'calma' AND palavra = 'interior'")]
+        finally:
+            conn.close()
+        assert contagens == [0, 0, 0]
+
+    def test_regeneracao_antes_do_preenchimento(self):
+        """Testa a troca de hashtags quando as tabelas agregadas ainda não existiam."""
+        roteiro_id = _publicar("Esperança", ["esperança"], ["#fe", "#esperanca"])
+        conn = sqlite3.connect(utils.DB_PATH)
+        with conn:
+            for tabela in ("tags_frequencia", "tags_coocorrencia", "tags_tema"):
+                conn.execute(f"DROP TABLE {tabela}")
+        conn.close()
+
+        utils.update_info_video_campo(roteiro_id, "hashtags", ["#esperanca"])
+
+        assert _usos("tags_frequencia", "tipo = 'hashtag' AND tag = ?", "#esperanca") == 1
+        assert tag_stats.sugerir("Esperança", tag_stats.HASHTAG, k=5) == ["#esperanca"]
+
+    def test_sugere_pelo_tema_e_completa_com_as_mais_usadas(self):
+        """Testa a ordem por relevância no tema, a coocorrência e o preenchimento com as do canal."""
+        _publicar("Ansiedade", ["ansiedade", "paz", "calma"])
+        _publicar("Ansiedade e medo", ["ansiedade", "medo", "paz"])
+        _publicar("Amor de Deus", ["amor", "graça"])
+        _publicar("Amor ao próximo", ["amor"])
+
+        assert tag_stats.sugerir("Ansiedade", k=2) == ["ansiedade", "paz"]
+        assert tag_stats.sugerir("Ansiedade", k=5)[-1] == "amor"
+        assert tag_stats.sugerir("Tema novo", k=1) == ["amor"]
+        assert tag_stats.sugerir("Ansiedade", tag_stats.HASHTAG, k=3) == ["#fe"]
+
+    def test_sem_estatisticas(self):
+        """Testa o banco sem vídeos gravados."""
+        assert tag_stats.sugerir("Ansiedade") == []
+
+    @patch('src.agents.youtube_detail_agent.agent')
+    def test_tags_no_prompt_de_detalhes(self, mock_agent, sample_roteiro, sample_detail_video):
+        """Testa se as tags do canal para o tema entram no prompt do agente de detalhes."""
+        _publicar("Ansiedade", ["ansiedade cristã", "paz"], ["#ansiedade"])
+        mock_agent.run.return_value.content = sample_detail_video
+
+        gerar_detail_video_youtube(sample_roteiro)
+
+        prompt = mock_agent.run.call_args[0][0]
+        assert "TAGS JÁ USADAS NO CANAL" in prompt
+        assert "Tags: ansiedade cristã, paz" in prompt
+        assert "Hashtags: #ansiedade" in prompt
@@ -0,0 +1,68 @@
+"""
+Testes para os candidatos de título e o ranking local.
+"""
+import sqlite3
+from unittest.mock import MagicMock
+
+from src import utils
+from src.agents.youtube_detail_agent import gerar_detail_video_youtube
+from src.models import CandidatoTitulo, DetailVideoYouTubeCandidatos
+from src.title_ranking import pontuar, ranquear
+
+
+def _candidato(titulo):
+    return CandidatoTitulo(titulo=titulo, thumbnail_prompt=f"Thumbnail para {titulo}")
+
+
+class TestRanking:
+    """Testes da pontuação local."""
+
+    def test_regras_de_pontuacao(self):
+        """Testa cobertura do tema, comprimento, emojis, caixa alta e repetição."""
+        bom = "Ansiedade? Deus cuida de você em cada detalhe 🙏"
+        assert pontuar(bom, "Ansiedade") > pontuar("Deus cuida de você em cada detalhe do dia 🙏", "Ansiedade")
+        assert pontuar(bom, "Ansiedade") > pontuar("Ansiedade 🙏", "Ansiedade")
+        assert pontuar(bom, "Ansiedade") > pontuar("Ansiedade? Deus cuida de você 🙏🔥✨😭💖", "Ansiedade")
+        assert pontuar(bom, "Ansiedade") > pontuar("ANSIEDADE? DEUS CUIDA DE VOCÊ EM CADA DETALHE 🙏", "Ansiedade")
+        assert pontuar(bom, "Ansiedade", existentes=["ansiedade deus cuida voce cada detalhe"]) < pontuar(bom, "Ansiedade")
+
+    def test_ranquear_mantem_todos_e_afasta_repeticoes(self):
+        """Testa se nenhum candidato some e se quase repetições vão para o fim."""
+        candidatos = [_candidato("Ansiedade? Deus cuida de você em cada detalhe 🙏"),
+                      _candidato("Ansiedade? Deus cuida de você em cada detalhe! 🙏"),
+                      _candidato("Paz para a ansiedade: 5 versículos que acalmam 🕊️")]
+
+        ranking = ranquear(candidatos, "Ansiedade", ["versículos", "paz"])
+
+        assert len(ranking) == 3
+        assert ranking[-1][0].titulo in {candidatos[0].titulo, candidatos[1].titulo}
+        assert [p for _, p in ranking] == sorted((p for _, p in ranking), reverse=True)
+
+
+class TestCandidatos:
+    """Testes do modo de vários candidatos numa chamada."""
+
+    def test_uma_chamada_escolhe_e_guarda_todos(self, sample_roteiro, sample_detail_video):
+        """Testa se o melhor candidato vai para info_videos_youtube e todos para candidatos_titulo."""
+        roteiro_id = utils.save_roteiro_sqlite(sample_roteiro)
+        repetido = "Ansiedade: Deus cuida de você em cada detalhe 🙏"
+        utils.save_info_video_sqlite(sample_detail_video.model_copy(update={"titulo": repetido}), roteiro_id)
+        agente = MagicMock(response_model=DetailVideoYouTubeCandidatos)
+        agente.run.return_value.content = DetailVideoYouTubeCandidatos(
+            candidatos=[_candidato(repetido), _candidato("Ansiedade tem cura? O que a Bíblia diz sobre paz 🕊️"),
+                        _candidato("VÍDEO NOVO")],
+            descricao="Descrição", tags=["ansiedade", "paz"], hashtags=["#fé"])
+
+        info = gerar_detail_video_youtube(sample_roteiro, roteiro_id, agente=agente, candidatos=3)
+
+        agente.run.assert_called_once()
+        assert "3 variações" in agente.run.call_args[0][0]
+        assert info.titulo == "Ansiedade tem cura? O que a Bíblia diz sobre paz 🕊️"
+        assert utils.get_info_video(roteiro_id).titulo == info.titulo
+        conn = sqlite3.connect(utils.DB_PATH)
+        linhas = conn.execute("SELECT posicao, titulo, escolhido FROM candidatos_titulo WHERE roteiro_id = ? "
+                              "ORDER BY posicao", (roteiro_id,)).fetchall()
+        conn.close()
+        assert len(linhas) == 3
+        assert linhas[0][1:] == (info.titulo, 1)
+        assert [e for _, _, e in linhas[1:]] == [0, 0]
@@ -0,0 +1,112 @@
+"""
+Testes para o índice de temas.
+"""
+import time
+from unittest.mock import patch
+
+from src import topic_index
+from src.agents.roteiro_agent import gerar_roteiro
+from src.chapter_cache import ChapterCache
+from src.models import RoteiroBiblico, TipoRoteiro
+from src.topic_index import IndiceTopicos, palavras
+from src.utils import get_roteiro, save_roteiro_sqlite
+
+
+def _salvar(tema, versiculos):
+    save_roteiro_sqlite(RoteiroBiblico(tema=tema, roteiro="...", versiculos_utilizados=versiculos,
+                                       tipo=TipoRoteiro.SHORT))
+
+
+class TestIndiceTopicos:
+    """Testes de construção e consulta do índice."""
+
+    def test_palavras_normalizadas(self):
+        """Testa acentos, stopwords e plural simples."""
+        assert palavras("A Paz de Deus nas Promessas") == ["paz", "deus", "promessa"]
+        assert palavras("Ansiedade") == palavras("ansiedade")
+
+    def test_plural_preserva_nomes(self):
+        """Testa que nomes e palavras terminadas em 's' não perdem a letra final."""
+        assert palavras("Jesus, Moisés e Lucas") == ["jesus", "moises", "lucas"]
+        assert palavras("Lírios dos campos") == ["lirio", "campo"]
+
+    def test_sugere_pelos_roteiros_gravados(self):
+        """Testa se as referências mais usadas no tema vêm primeiro e palavras comuns pesam menos."""
+        _salvar("Ansiedade", ["Filipenses 4:6-7 (NTLH)", "Mateus 6:25-34"])
+        _salvar("Ansiedade e medo", ["Filipenses 4:6-7", "Salmos 23"])
+        _salvar("Medo da morte", ["João 11:25-26"])
+        _salvar("Amor de Deus", ["João 3:16"])
+
+        indice = IndiceTopicos.construir()
+
+        assert len(indice) == 4
+        assert indice.sugerir("ansiedade", 2)[0] == "Filipenses 4:6-7"
+        assert set(indice.sugerir("Ansiedade", 3)) == {"Filipenses 4:6-7", "Mateus 6:25-34", "Salmos 23"}
+        assert indice.sugerir("tema desconhecido") == []
+
+    def test_texto_do_cache_de_capitulos(self, tmp_path):
+        """Testa a indexação do texto dos capítulos em cache."""
+        cache = ChapterCache(tmp_path / "capitulos")
+        cache.put("https://www.bibliaonline.com.br/ntlh/sl/23", [
+            {"number": 1, "text": "O Senhor é o meu pastor: nada me faltará."},
+            {"number": 4, "text": "Ainda que eu ande por um vale escuro, não terei medo."},
+        ])
+
+        indice = IndiceTopicos.construir(cache_dir=tmp_path / "capitulos")
+
+        assert indice.sugerir("Medo", 1) == ["Salmos 23:4"]
+        assert indice.sugerir("O bom pastor", 1) == ["Salmos 23:1"]
+
+    def test_consulta_rapida(self):
+        """Testa se uma consulta num índice com milhares de roteiros fica abaixo de um milissegundo."""
+        indice = IndiceTopicos()
+        for i in range(3000):
+            indice.adicionar(f"Tema{i % 300} fé esperança", [f"Salmos {i % 150}:{i % 20 + 1}", f"João {i % 21}:1"])
+        indice.sugerir("fé e esperança")  # monta as listas ordenadas
+
+        inicio = time.perf_counter()
+        for _ in range(200):
+            indice.sugerir("fé e esperança", 5)
+        assert (time.perf_counter() - inicio) / 200 < 0.001
+
+
+class TestReferenciasAutomaticas:
+    """Testes do preenchimento de referências em gerar_roteiro."""
+
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_sugestoes_so_no_prompt(self, mock_save_json, mock_agent, sample_roteiro, monkeypatch):
+        """Testa se, sem referências, o prompt recebe as sugestões, mas o roteiro não as guarda como do chamador."""
+        monkeypatch.setattr(topic_index, "SUGESTOES_PADRAO", 5)
+        _salvar("Ansiedade", ["Filipenses 4:6-7"])
+        mock_agent.run.return_value.content = sample_roteiro
+
+        roteiro, roteiro_id = gerar_roteiro("Ansiedade", TipoRoteiro.LONGO)
+
+        assert "Filipenses 4:6-7" in mock_agent.run.call_args[0][0]
+        assert roteiro.referencias == []
+        assert get_roteiro(roteiro_id).referencias == []
+        # sample_roteiro usa Mateus 6:25-34, agora registrado sem reconstruir o índice
+        assert "Mateus 6:25-34" in topic_index.sugerir_referencias("Ansiedade")
+
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_desligado_por_padrao(self, mock_save_json, mock_agent, sample_roteiro):
+        """Testa que sem REFERENCIAS_AUTOMATICAS o prompt continua sem sugestões do índice."""
+        _salvar("Ansiedade", ["Filipenses 4:6-7"])
+        mock_agent.run.return_value.content = sample_roteiro
+
+        gerar_roteiro("Ansiedade", TipoRoteiro.LONGO)
+
+        assert "Filipenses 4:6-7" not in mock_agent.run.call_args[0][0]
+
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_referencias_explicitas_prevalecem(self, mock_save_json, mock_agent, sample_roteiro):
+        """Testa se referências passadas pelo chamador não são substituídas."""
+        _salvar("Ansiedade", ["Filipenses 4:6-7"])
+        mock_agent.run.return_value.content = sample_roteiro
+
+        roteiro, _ = gerar_roteiro("Ansiedade", TipoRoteiro.LONGO, ["Salmo 23"])
+
+        assert roteiro.referencias == ["Salmo 23"]
@@ -5,8 +5,10 @@ import json
 import sqlite3
 from unittest.mock import patch
 
+import pytest
+
 from src.models import RoteiroBiblico, DetailVideoYouTube, TipoRoteiro
-from src.utils import save_roteiro_json, save_roteiro_sqlite, save_info_video_sqlite
+from src.utils import save_roteiro_json, save_roteiro_sqlite, save_info_video_sqlite, iter_roteiros, get_roteiro
 
 
 class TestSaveRoteiroJson:
@@ -184,3 +186,67 @@ class TestSaveInfoVideoSqlite:
         conn.close()
 
         assert table_exists
+
+
+class TestLeituraRoteiros:
+    """Testes para iter_roteiros e get_roteiro."""
+
+    def _popular(self, db_path, quantidade=5):
+        ids = []
+        for i in range(quantidade):
+            roteiro = RoteiroBiblico(
+                tema=f"Tema {i}",
+                roteiro="Texto longo " * 50,
+                versiculos_utilizados=[f"Salmos {i + 1}:1"],
+                tipo=TipoRoteiro.SHORT if i % 2 else TipoRoteiro.LONGO,
+                referencias=["Salmo 23"]
+            )
+            ids.append(save_roteiro_sqlite(roteiro, str(db_path)))
+        return ids
+
+    def test_iter_roteiros_paginado(self, tmp_path):
+        """Testa se todos os roteiros vêm em ordem, atravessando vários lotes."""
+        db_path = tmp_path / "test_roteiros.sqlite3"
+        ids = self._popular(db_path)
+
+        resultado = list(iter_roteiros(batch_size=2, db_path=str(db_path)))
+
+        assert [roteiro_id for _, roteiro_id in resultado] == ids
+        roteiro = resultado[0][0]
+        assert roteiro.versiculos_utilizados == ["Salmos 1:1"]
+        assert roteiro.tipo == TipoRoteiro.LONGO
+        assert roteiro.referencias == ["Salmo 23"]
+
+    def test_iter_roteiros_projecao_e_filtros(self, tmp_path):
+        """Testa se só as colunas pedidas são lidas e se os filtros se aplicam."""
+        db_path = tmp_path / "test_roteiros.sqlite3"
+        self._popular(db_path)
+
+        resultado = list(iter_roteiros({"tipo": TipoRoteiro.SHORT}, columns=["tema", "tipo"], db_path=str(db_path)))
+
+        assert [r.tema for r, _ in resultado] == ["Tema 1", "Tema 3"]
+        assert "roteiro" not in resultado[0][0].model_fields_set
+        with pytest.raises(ValueError):
+            list(iter_roteiros(columns=["senha"], db_path=str(db_path)))
+        with pytest.raises(ValueError):
+            list(iter_roteiros({"autor": "x"}, db_path=str(db_path)))
+
+    def test_iter_roteiros_validado(self, tmp_path):
+        """Testa o caminho com validação completa."""
+        db_path = tmp_path / "test_roteiros.sqlite3"
+        self._popular(db_path, 1)
+        roteiro, _ = next(iter_roteiros(db_path=str(db_path), validar=True))
+        assert isinstance(roteiro, RoteiroBiblico)
+        assert roteiro.tema == "Tema 0"
+
+    def test_iter_roteiros_banco_vazio(self, tmp_path):
+        """Testa se um banco sem a tabela não gera erro."""
+        assert list(iter_roteiros(db_path=str(tmp_path / "vazio.sqlite3"))) == []
+
+    def test_get_roteiro(self, tmp_path, sample_roteiro):
+        """Testa leitura de um roteiro pelo ID."""
+        db_path = tmp_path / "test_roteiros.sqlite3"
+        roteiro_id = save_roteiro_sqlite(sample_roteiro, str(db_path))
+
+        assert get_roteiro(roteiro_id, str(db_path)) == sample_roteiro
+        assert get_roteiro(roteiro_id + 1, str(db_path)) is None
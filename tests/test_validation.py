@@ -0,0 +1,99 @@
+"""
+Testes para a validação dos versículos de um roteiro.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from src.bible_tool import BibleLookupTool
+from src.chapter_cache import ChapterCache, diretorio_padrao
+from src.models import RoteiroBiblico, TipoRoteiro
+from src.validation import DIVERGENTE, INEXISTENTE, OK, extrair_blocos, validar_roteiro
+
+SALMO_23 = [
+    {"number": 1, "text": "O SENHOR é o meu pastor: nada me faltará."},
+    {"number": 2, "text": "Ele me faz descansar em pastos verdes e me leva a águas tranquilas."},
+    {"number": 3, "text": "O SENHOR renova as minhas forças."},
+]
+JOAO_3 = [{"number": 16, "text": "Porque Deus amou o mundo tanto, que deu o seu único Filho."}]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ChapterCache(tmp_path / "capitulos")
+    cache.put("https://www.bibliaonline.com.br/ntlh/sl/23", SALMO_23)
+    cache.put("https://www.bibliaonline.com.br/ntlh/jo/3", JOAO_3)
+    monkeypatch.setattr(BibleLookupTool, "_cache", cache)
+    return cache
+
+
+def _roteiro(texto, versiculos):
+    return RoteiroBiblico(tema="Cuidado", roteiro=texto, versiculos_utilizados=versiculos, tipo=TipoRoteiro.SHORT)
+
+
+class TestValidacao:
+    """Testes do scanner, da comparação e da correção."""
+
+    def test_extrai_blocos(self):
+        """Testa a extração de referência e texto, ignorando linhas que não são de livros."""
+        texto = ("1 Coríntios 13:4-7 (NTLH)\nQuem ama é paciente\ne bondoso.\n\n"
+                 "Salmos 23\nO SENHOR é o meu pastor.\n\nCapítulo 3\nInscreva-se no canal!")
+
+        blocos = extrair_blocos(texto)
+
+        assert [(b.slug, b.capitulo, b.v_ini, b.v_fim) for b in blocos] == [("1co", "13", 4, 7), ("sl", "23", None, None)]
+        assert texto[blocos[0].inicio:blocos[0].fim] == "Quem ama é paciente\ne bondoso."
+
+    def test_roteiro_correto(self, cache):
+        """Testa um roteiro fiel ao texto, sem nenhum download."""
+        roteiro = _roteiro(f"Salmos 23:1-2\n{SALMO_23[0]['text']} {SALMO_23[1]['text']}\n\n"
+                           f"João 3:16\n{JOAO_3[0]['text']}", ["Salmos 23:1-2", "João 3:16"])
+
+        with patch.object(BibleLookupTool, "_download_condicional", side_effect=AssertionError("não deveria baixar")):
+            resultado = validar_roteiro(roteiro)
+
+        assert resultado.valido
+        assert [b.status for b in resultado.blocos] == [OK, OK]
+
+    def test_cache_padrao_sem_bible_cache_dir(self):
+        """Testa que, sem cache configurado, a validação lê o cache padrão antes de ir à rede."""
+        padrao = ChapterCache(diretorio_padrao())
+        padrao.put("https://www.bibliaonline.com.br/ntlh/jo/3", JOAO_3)
+        roteiro = _roteiro(f"João 3:16\n{JOAO_3[0]['text']}", ["João 3:16"])
+
+        with patch.object(BibleLookupTool, "_cache", None), \
+                patch.object(BibleLookupTool, "_download_condicional", side_effect=AssertionError("não deveria baixar")):
+            resultado = validar_roteiro(roteiro)
+            assert BibleLookupTool._cache is None
+
+        assert resultado.valido
+
+    def test_aponta_e_corrige_divergencias(self, cache):
+        """Testa a correção dos blocos divergentes e o apontamento de referências inexistentes."""
+        texto = ("Salmos 23:3\nO Senhor renova minhas forças.\n\n"
+                 f"João 3:16\n{JOAO_3[0]['text']}\n\n"
+                 "Salmos 23:40\nVersículo que não existe.\n\nInscreva-se!")
+        roteiro = _roteiro(texto, ["Salmos 23:3", "Salmos 23:40", "Livro 1:1"])
+
+        resultado = validar_roteiro(roteiro, corrigir=True)
+
+        assert [b.status for b in resultado.blocos] == [DIVERGENTE, OK, INEXISTENTE]
+        assert 0.5 < resultado.blocos[0].similaridade < 1
+        assert resultado.referencias_invalidas == ["Livro 1:1", "Salmos 23:40"]
+        assert resultado.roteiro_corrigido.roteiro == texto.replace("O Senhor renova minhas forças.", SALMO_23[2]["text"])
+        assert roteiro.roteiro == texto
+
+    @patch('src.agents.roteiro_agent.agent')
+    @patch('src.agents.roteiro_agent.save_roteiro_json')
+    def test_gerar_roteiro_corrige(self, mock_save_json, mock_agent, cache, monkeypatch):
+        """Testa a correção logo após a geração, antes de gravar."""
+        from src.agents import roteiro_agent
+        from src.utils import get_roteiro
+
+        monkeypatch.setattr(roteiro_agent, "VALIDAR_VERSICULOS", "corrigir")
+        mock_agent.run.return_value.content = _roteiro("João 3:16\nPorque Deus amou o mundo.", ["João 3:16"])
+
+        roteiro, roteiro_id = roteiro_agent.gerar_roteiro("Amor", TipoRoteiro.SHORT, ["jo 3:16"])
+
+        assert roteiro.roteiro == f"João 3:16\n{JOAO_3[0]['text']}"
+        assert get_roteiro(roteiro_id).roteiro == roteiro.roteiro